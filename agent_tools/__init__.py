@@ -0,0 +1,5 @@
+# Every profile that uses a class or tool of agent_tools imports this package first, once per process
+# (auto_import_tools does not re-execute it), whatever its class_qualname: warm agent server workers from here.
+from agent_tools.prewarm import start_worker_prewarm
+
+start_worker_prewarm()
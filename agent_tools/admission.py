@@ -0,0 +1,455 @@
+import asyncio
+import heapq
+import itertools
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, Generator, Iterable, List, Optional
+
+from pydantic import Field
+
+from just_agents.just_bus import JustLogBus
+from just_agents.protocols.sse_streaming import ServerSentEventsStream as SSE
+
+from agent_tools.log_sink import get_log_sink
+from agent_tools.tools_config import get_tools_config
+from agent_tools.tracing import TracedChatUIAgent, span
+
+
+# Initialize the singleton logger
+log_bus = JustLogBus()
+get_log_sink()
+
+SHED_MESSAGE = "⏳ The model is busy right now, please send your message again in a few seconds."
+
+
+class AdmissionRejected(RuntimeError):
+    """A completion was not admitted: the model's queue is full, the wait would exceed max_wait or it could not wait."""
+
+    def __init__(self, model: str, reason: str, retry_after: float):
+        super().__init__(f"{model} is overloaded ({reason}), retry in {retry_after:.0f}s")
+        self.model = model
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class TokenBucket:
+    """Refills `rate` tokens per second up to `capacity`. Callers hold the scheduler lock.
+
+    A request larger than the capacity only waits for a full bucket. Tokens go negative when a
+    request takes more than there is (or used more than was estimated), the debt is paid back
+    by the refill before the next request is admitted.
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        self.refill(now)
+        missing = min(amount, self.capacity) - self.tokens
+        return missing / self.rate if missing > 0 else 0.0
+
+    def take(self, amount: float) -> None:
+        self.tokens -= amount
+
+    def adjust(self, amount: float) -> None:
+        self.tokens = min(self.capacity, self.tokens - amount)
+
+
+class _Waiter:
+    __slots__ = ("priority", "seq", "tokens", "rejected")
+
+    def __init__(self, priority: int, seq: int, tokens: int):
+        self.priority = priority
+        self.seq = seq
+        self.tokens = tokens
+        self.rejected: Optional[str] = None
+
+    def __lt__(self, other: "_Waiter") -> bool:
+        return (self.priority, self.seq) < (other.priority, other.seq)
+
+
+class Ticket:
+    __slots__ = ("tokens", "priority", "waited")
+
+    def __init__(self, tokens: int, priority: int, waited: float):
+        self.tokens = tokens
+        self.priority = priority
+        self.waited = waited
+
+
+class ModelScheduler:
+    """Admission control of the completions of one model.
+
+    A completion is admitted when it is at the head of the priority queue (lower priority value
+    first, FIFO within a priority), a request and its estimated tokens are available in the rpm
+    and tpm buckets, and fewer than max_parallel completions are running. Otherwise it waits,
+    up to max_wait seconds. It is shed (AdmissionRejected) when the queue is full and it does not
+    outrank the worst waiter, when a better waiter takes its place in a full queue, or when the
+    buckets cannot admit it before its deadline. A max_wait of 0 never blocks: the completion is
+    admitted right away or shed as "busy".
+    """
+
+    def __init__(
+        self,
+        model: str,
+        rpm: float = 0,
+        tpm: float = 0,
+        max_parallel: int = 0,
+        burst: float = 0.1,
+        max_queue: int = 256,
+        max_wait: float = 30.0
+    ):
+        self.model = model
+        self.rpm = rpm
+        self.tpm = tpm
+        self.max_parallel = max_parallel
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+        self._requests = TokenBucket(rpm / 60, max(1.0, rpm * burst)) if rpm > 0 else None
+        self._tokens = TokenBucket(tpm / 60, max(1.0, tpm * burst)) if tpm > 0 else None
+        self._cond = threading.Condition()
+        self._queue: List[_Waiter] = []
+        self._seq = itertools.count()
+        self._paused_until = 0.0
+        self.in_flight = 0
+        self.admitted = 0
+        self.rate_limited = 0
+        self.tokens_estimated = 0
+        self.tokens_used = 0
+        self.max_wait_ms = 0.0
+        self.shed: Dict[str, int] = {"queue_full": 0, "evicted": 0, "timeout": 0, "busy": 0}
+        self.by_priority: Dict[int, Dict[str, float]] = {}
+
+    def _delay(self, tokens: int, now: float) -> float:
+        """Seconds until a completion of `tokens` can start, inf while all parallel slots are busy."""
+        if self.max_parallel and self.in_flight >= self.max_parallel:
+            return float("inf")
+        delay = max(0.0, self._paused_until - now)
+        if self._requests is not None:
+            delay = max(delay, self._requests.wait_time(1, now))
+        if self._tokens is not None:
+            delay = max(delay, self._tokens.wait_time(tokens, now))
+        return delay
+
+    def _priority_stats(self, priority: int) -> Dict[str, float]:
+        stats = self.by_priority.get(priority)
+        if stats is None:
+            stats = self.by_priority[priority] = {"admitted": 0, "shed": 0, "wait_ms": 0.0}
+        return stats
+
+    def _reject(self, waiter: _Waiter, reason: str, retry_after: float) -> AdmissionRejected:
+        self.shed[reason] += 1
+        self._priority_stats(waiter.priority)["shed"] += 1
+        return AdmissionRejected(self.model, reason, retry_after)
+
+    def acquire(self, tokens: int, priority: int = 0, max_wait: Optional[float] = None) -> Ticket:
+        """Wait for admission of a completion with an estimated `tokens` (prompt and completion)."""
+        max_wait = self.max_wait if max_wait is None else max_wait
+        start = time.monotonic()
+        deadline = start + max_wait
+        with self._cond:
+            waiter = _Waiter(priority, next(self._seq), tokens)
+            if len(self._queue) >= self.max_queue:
+                worst = max(self._queue)
+                if not waiter < worst:
+                    raise self._reject(waiter, "queue_full", max_wait)
+                worst.rejected = "evicted"
+                self._queue.remove(worst)
+                heapq.heapify(self._queue)
+                self._cond.notify_all()
+            heapq.heappush(self._queue, waiter)
+            while True:
+                if waiter.rejected:
+                    raise self._reject(waiter, waiter.rejected, max_wait)
+                now = time.monotonic()
+                remaining = deadline - now
+                delay = self._delay(tokens, now) if self._queue[0] is waiter else float("inf")
+                if delay == 0:
+                    heapq.heappop(self._queue)
+                    if self._requests is not None:
+                        self._requests.take(1)
+                    if self._tokens is not None:
+                        self._tokens.take(tokens)
+                    self.in_flight += 1
+                    self.admitted += 1
+                    self.tokens_estimated += tokens
+                    waited = now - start
+                    self.max_wait_ms = max(self.max_wait_ms, waited * 1000)
+                    stats = self._priority_stats(priority)
+                    stats["admitted"] += 1
+                    stats["wait_ms"] += waited * 1000
+                    self._cond.notify_all()  # the next waiter may be admissible as well
+                    return Ticket(tokens, priority, waited)
+                # shed right away when the buckets will not refill in time, instead of holding the caller
+                if remaining <= 0 or (delay != float("inf") and delay > remaining):
+                    self._queue.remove(waiter)
+                    heapq.heapify(self._queue)
+                    self._cond.notify_all()
+                    reason = "busy" if max_wait <= 0 else "timeout"
+                    raise self._reject(waiter, reason, delay if delay != float("inf") else max(max_wait, 1.0))
+                self._cond.wait(min(remaining, delay))
+
+    def release(self, ticket: Ticket, used_tokens: Optional[int] = None) -> None:
+        """Free the parallel slot of a finished completion and charge the difference to the estimate."""
+        with self._cond:
+            self.in_flight -= 1
+            if used_tokens is not None:
+                self.tokens_used += used_tokens
+                if self._tokens is not None:
+                    self._tokens.adjust(used_tokens - ticket.tokens)
+            self._cond.notify_all()
+
+    def pause(self, seconds: float) -> None:
+        """Stop admitting for `seconds` after the provider answered 429, so queued calls don't retry into it."""
+        with self._cond:
+            self.rate_limited += 1
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+            self._cond.notify_all()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            return {
+                "rpm": self.rpm,
+                "tpm": self.tpm,
+                "max_parallel": self.max_parallel,
+                "in_flight": self.in_flight,
+                "queued": len(self._queue),
+                "admitted": self.admitted,
+                "shed": dict(self.shed),
+                "rate_limited": self.rate_limited,
+                "tokens_estimated": self.tokens_estimated,
+                "tokens_used": self.tokens_used,
+                "max_wait_ms": round(self.max_wait_ms, 1),
+                "by_priority": {
+                    priority: {
+                        "admitted": int(s["admitted"]),
+                        "shed": int(s["shed"]),
+                        "mean_wait_ms": round(s["wait_ms"] / s["admitted"], 1) if s["admitted"] else 0.0,
+                    }
+                    for priority, s in sorted(self.by_priority.items())
+                },
+            }
+
+
+class AdmissionController:
+    """Per-model schedulers created on first use from the `models` limits of the configuration."""
+
+    def __init__(self, config: Dict[str, Any]):
+        self.config = config
+        self.chars_per_token = float(config.get("chars_per_token", 4))
+        self.completion_tokens = int(config.get("completion_tokens", 512))
+        self.tool_tokens = int(config.get("tool_tokens", 150))
+        self.rate_limit_pause = float(config.get("rate_limit_pause", 5.0))
+        # limits are per deployment, every agent worker process gets an equal share
+        self.workers = max(1, int(os.getenv("AGENT_WORKERS", "1"))) if config.get("split_across_workers", True) else 1
+        self._schedulers: Dict[str, ModelScheduler] = {}
+        self._lock = threading.Lock()
+
+    def scheduler(self, model: str) -> ModelScheduler:
+        scheduler = self._schedulers.get(model)
+        if scheduler is None:
+            with self._lock:
+                scheduler = self._schedulers.get(model)
+                if scheduler is None:
+                    models = self.config.get("models") or {}
+                    limits = {**(models.get("default") or {}), **(models.get(model) or {})}
+                    rpm = float(limits.get("rpm", 0)) / self.workers
+                    tpm = float(limits.get("tpm", 0)) / self.workers
+                    max_parallel = limits.get("max_parallel_requests")
+                    if max_parallel is None and rpm > 0:
+                        max_parallel = rpm  # as in the LiteLLM proxy: no parallel limit given, the rpm is used
+                    scheduler = self._schedulers[model] = ModelScheduler(
+                        model,
+                        rpm=rpm,
+                        tpm=tpm,
+                        max_parallel=max(1, int(max_parallel)) if max_parallel else 0,
+                        burst=float(limits.get("burst", self.config.get("burst", 0.1))),
+                        max_queue=int(limits.get("max_queue", self.config.get("max_queue", 256))),
+                        max_wait=float(limits.get("max_wait", self.config.get("max_wait", 30.0))),
+                    )
+        return scheduler
+
+    def estimate_tokens(self, messages: Any, options: Dict[str, Any], tool_count: int = 0) -> int:
+        """Prompt tokens from the size of the messages, plus tool schemas and the expected completion."""
+        text = json.dumps(messages, default=str, ensure_ascii=False)
+        completion = options.get("max_completion_tokens") or options.get("max_tokens") or self.completion_tokens
+        return int(len(text) / self.chars_per_token) + tool_count * self.tool_tokens + int(completion)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            schedulers = dict(self._schedulers)
+        return {"workers": self.workers, "models": {model: s.stats() for model, s in schedulers.items()}}
+
+
+_controller: Optional[AdmissionController] = None
+_controller_lock = threading.Lock()
+
+
+def get_admission_controller() -> Optional[AdmissionController]:
+    """Process-wide admission controller configured from `tools_config.admission_control`.
+
+    Returns None if admission control is disabled.
+    """
+    global _controller
+    if _controller is None:
+        with _controller_lock:
+            if _controller is None:
+                config = get_tools_config("admission_control")
+                if not config.get("enabled", False):
+                    return None
+                _controller = AdmissionController(config)
+    return _controller
+
+
+def admission_stats() -> Dict[str, Any]:
+    """Report LLM admission control metrics per model (admitted, queued, shed, waits per priority, 429s).
+
+    Returns:
+        Dict[str, Any]: Admission statistics, or {"enabled": False} if admission control is disabled
+    """
+    controller = get_admission_controller()
+    if controller is None:
+        return {"enabled": False}
+    return {"enabled": True, **controller.stats()}
+
+
+def _on_event_loop() -> bool:
+    """True when called from a thread that runs an asyncio event loop, where blocking stalls every request."""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return False
+    return True
+
+
+def _usage_tokens(response: Any) -> Optional[int]:
+    usage = response.get("usage") if isinstance(response, dict) else getattr(response, "usage", None)
+    if usage is None:
+        return None
+    total = usage.get("total_tokens") if isinstance(usage, dict) else getattr(usage, "total_tokens", None)
+    return int(total) if total else None
+
+
+def _retry_after(error: Exception, default: float) -> float:
+    headers = getattr(getattr(error, "response", None), "headers", None) or {}
+    try:
+        return float(headers.get("retry-after") or default)
+    except (TypeError, ValueError):
+        return default
+
+
+class AdmissionControlledAgent(TracedChatUIAgent):
+    """ChatUIAgent whose completions go through per-model admission control (and are traced, see TracedChatUIAgent).
+
+    Every LLM call (including each step of a tool loop) waits for its model's token buckets and
+    parallel slots in a priority queue, see ModelScheduler. Lower `admission_priority` values are
+    served first, so user-facing profiles keep 0 and background ones like chat naming use more.
+    A shed request is answered with `admission_shed_message` instead of an error, and a 429 from
+    the provider (raised with raise_on_completion_status_errors) pauses the model's queue.
+
+    The agent server calls query() and iterates stream() on its event loop, where a wait would
+    freeze every other request of the worker (including the streams that would free the slots).
+    There a completion never waits: it is admitted right away or shed. Queueing by priority only
+    applies to callers running the agent in their own threads.
+    """
+
+    admission_control: bool = Field(
+        default=True,
+        description="Wait for the model's rate limits in tools_config.admission_control before each completion")
+    admission_priority: int = Field(
+        default=0, ge=0,
+        description="Queue priority of this profile's completions, lower values are admitted first")
+    admission_max_wait: Optional[float] = Field(
+        default=None, ge=0.0,
+        description="Seconds a completion may wait for admission before it is shed (default from tools_config)")
+    admission_shed_message: str = Field(
+        default=SHED_MESSAGE,
+        description="Answer sent instead of the completion when it is shed")
+
+    def _execute_completion(self, messages: Any, stream: bool, active_options_for_this_call: Any, **kwargs) -> Any:
+        controller = get_admission_controller() if self.admission_control else None
+        if controller is None:
+            return super()._execute_completion(messages, stream, active_options_for_this_call, **kwargs)
+        options = {**active_options_for_this_call, **kwargs}
+        model = options.get("model") or self.shortname
+        scheduler = controller.scheduler(model)
+        max_wait = 0.0 if _on_event_loop() else self.admission_max_wait
+        with span("admission", model=model, priority=self.admission_priority):
+            ticket = scheduler.acquire(
+                controller.estimate_tokens(messages, options, len(self.tools or ())),
+                priority=self.admission_priority,
+                max_wait=max_wait,
+            )
+        try:
+            response = super()._execute_completion(messages, stream, active_options_for_this_call, **kwargs)
+        except Exception as e:
+            scheduler.release(ticket)
+            if getattr(e, "status_code", None) == 429:
+                scheduler.pause(_retry_after(e, controller.rate_limit_pause))
+                log_bus.log_message(
+                    f"{model} answered 429, admission paused",
+                    source="admission.AdmissionControlledAgent",
+                    action="rate_limited",
+                    model=model,
+                    agent=self.shortname,
+                )
+            raise
+        if not stream:
+            scheduler.release(ticket, _usage_tokens(response))
+            return response
+        return self._release_after(response, scheduler, ticket)
+
+    def _release_after(self, response: Iterable[Any], scheduler: ModelScheduler, ticket: Ticket) -> Generator[Any, None, None]:
+        """Hold the parallel slot until the stream is consumed (or abandoned by the client)."""
+        used = None
+        try:
+            for part in response:
+                used = _usage_tokens(part) or used
+                yield part
+        finally:
+            scheduler.release(ticket, used)
+
+    def _shed_reply(self, query_input: Any, error: AdmissionRejected) -> str:
+        log_bus.log_message(
+            f"Completion shed for {self.shortname}: {error}",
+            source="admission.AdmissionControlledAgent",
+            action="shed",
+            model=error.model,
+            reason=error.reason,
+            agent=self.shortname,
+            priority=self.admission_priority,
+        )
+        return self.admission_shed_message
+
+    def query(self, query_input: Any, **kwargs) -> str:
+        try:
+            return super().query(query_input, **kwargs)
+        except AdmissionRejected as e:
+            return self._shed_reply(query_input, e)
+
+    def stream(self, query_input: Any, **kwargs) -> Generator[Any, None, None]:
+        return self._stream_admitted(super().stream(query_input, **kwargs), query_input, kwargs.get("model", self.shortname))
+
+    def _stream_admitted(self, chunks: Iterable[Any], query_input: Any, model: str) -> Generator[Any, None, None]:
+        try:
+            yield from chunks
+        except AdmissionRejected as e:
+            yield from self._stream_text(self._shed_reply(query_input, e), model)
+
+    def _stream_text(self, text: str, model: str) -> Generator[str, None, None]:
+        yield SSE.sse_wrap(
+            self._protocol.create_chunk_from_content(text, model, role="assistant").model_dump(mode="json")
+        )
+        yield SSE.sse_wrap(
+            self._protocol.create_chunk_from_content("", model, finish_reason="stop").model_dump(mode="json")
+        )
+        yield SSE.sse_wrap(self._protocol.stop)
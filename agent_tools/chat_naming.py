@@ -0,0 +1,201 @@
+import re
+import threading
+from functools import lru_cache
+from typing import Any, Dict, Generator, List, Optional, Tuple
+
+from pydantic import Field
+
+from just_agents.just_bus import JustLogBus
+
+from agent_tools.admission import AdmissionControlledAgent, AdmissionRejected
+from agent_tools.log_sink import get_log_sink
+
+
+# Initialize the singleton logger
+log_bus = JustLogBus()
+get_log_sink()
+
+STOPWORDS = frozenset("""
+a about above after again against all also am an and any are as at be because been before being below between
+both but by can could did do does doing down during each few for from further had has have having he her here
+hers him his how i if in into is it its just me more most my no nor not now of off on once only or other our
+out over own please same she should so some such than that the their them then there these they this those
+through to too under until up very was we were what when where which while who whom why will with would you
+your yours hi hello hey thanks thank tell explain describe show give get make let know want need like help
+something anything everything things thing kind way really well much many use used using can't don't i'm
+""".split())
+
+# Keywords and the emoji they map to, checked in order: keys of 5+ characters match as prefixes,
+# shorter ones only as whole words (optionally plural) so that "gene" does not match "generate"
+EMOJI_KEYWORDS: List[Tuple[str, str]] = [
+    ("glucose", "🩸"), ("blood", "🩸"), ("insulin", "💉"), ("diabet", "🩸"), ("cgm", "📟"), ("sugar", "🍬"),
+    ("gluformer", "📈"), ("predict", "📈"), ("forecast", "📈"), ("trend", "📈"),
+    ("machine", "🤖"), ("model", "🤖"), ("neural", "🧠"), ("learn", "🧠"), ("transformer", "🤖"), ("llm", "🤖"),
+    ("dataframe", "📊"), ("table", "📊"), ("csv", "📊"), ("data", "📊"), ("statist", "📊"), ("matrix", "🔢"),
+    ("random", "🎲"), ("summar", "📝"), ("annotat", "📝"), ("abstract", "📝"),
+    ("paper", "📄"), ("article", "📄"), ("document", "📄"), ("research", "🔬"), ("study", "🔬"),
+    ("gene", "🧬"), ("genetic", "🧬"), ("genom", "🧬"), ("dna", "🧬"), ("protein", "🧬"), ("aging", "⏳"), ("ageing", "⏳"), ("longevity", "⏳"),
+    ("health", "🩺"), ("doctor", "🩺"), ("disease", "🩺"), ("drug", "💊"), ("medic", "💊"),
+    ("food", "🍽️"), ("diet", "🥗"), ("meal", "🍽️"), ("exercise", "🏃"), ("sport", "🏃"), ("sleep", "😴"),
+    ("dao", "🏛️"), ("community", "🤝"), ("founder", "👥"), ("mission", "🎯"), ("goal", "🎯"),
+    ("open", "🔓"), ("source", "🔓"), ("code", "💻"), ("python", "🐍"), ("search", "🔍"), ("index", "🔍"),
+    ("money", "💰"), ("price", "💰"), ("weather", "🌦️"), ("travel", "✈️"), ("music", "🎵"),
+]
+DEFAULT_EMOJI = "💬"
+
+_WORD_RE = re.compile(r"[^\W\d_][\w'\-]*|\d+[\w\-]*", re.UNICODE)
+
+_stats_lock = threading.Lock()
+_stats = {"local_titles": 0, "llm_fallbacks": 0}
+
+
+def _emoji_for(words: List[str]) -> Optional[str]:
+    for word in words:
+        lower = word.lower()
+        for key, emoji in EMOJI_KEYWORDS:
+            if lower.startswith(key) if len(key) >= 5 else lower in (key, f"{key}s"):
+                return emoji
+    return None
+
+
+@lru_cache(maxsize=4096)
+def _cached_title(text: str, max_words: int) -> Tuple[str, float]:
+    tokens = _WORD_RE.findall(text)
+    seen = set()
+    candidates: List[Tuple[float, int, str]] = []
+    for position, token in enumerate(tokens):
+        lower = token.lower().strip("'-")
+        if lower in STOPWORDS or lower in seen or (len(lower) < 3 and not (token.isupper() and len(token) > 1)):
+            continue
+        seen.add(lower)
+        score = min(len(lower), 10) / 10
+        if token.isupper() and len(token) > 1:
+            score += 1.0  # acronyms (CGM, DAO) are almost always the topic
+        elif token[0].isupper() and position > 0:
+            score += 0.7  # proper nouns (GlucoseDAO, Gluformer)
+        candidates.append((score, position, token))
+
+    if not candidates:
+        return f"{DEFAULT_EMOJI} New Chat", 0.0
+
+    top = sorted(candidates, key=lambda c: (-c[0], c[1]))[:max_words]
+    words = [token if token.isupper() or any(ch.isupper() for ch in token[1:]) else token.capitalize()
+             for _, _, token in sorted(top, key=lambda c: c[1])]
+    emoji = _emoji_for(words) or _emoji_for([token for _, _, token in candidates])
+
+    confidence = 0.3 + 0.15 * min(len(candidates), 4)
+    if emoji is not None:
+        confidence += 0.1
+    if top[0][0] >= 1.0:
+        confidence += 0.1  # a proper noun or acronym names the topic
+    if len(text) > 400 or "```" in text:
+        confidence -= 0.3  # long or code-heavy requests are better summarized by the LLM
+    if len(tokens) and len(candidates) / len(tokens) < 0.2:
+        confidence -= 0.2  # mostly filler words, keywords are likely not the topic
+    return f"{emoji or DEFAULT_EMOJI} {' '.join(words)}", round(max(0.0, min(1.0, confidence)), 2)
+
+
+def heuristic_title(text: str, max_words: int = 4) -> Tuple[str, float]:
+    """Build a short chat title from the keywords of a user request without calling an LLM.
+
+    Args:
+        text: The user request to name the chat after
+        max_words: Maximum number of keywords in the title
+
+    Returns:
+        Tuple[str, float]: The title starting with an emoji, and a confidence between 0 and 1
+    """
+    text = (text or "").strip()
+    return _cached_title(" ".join(text.split()), max_words)
+
+
+def chat_naming_stats() -> Dict[str, Any]:
+    """Report how many chat titles were made locally and how many fell back to the LLM.
+
+    Returns:
+        Dict[str, Any]: Counters, the share of upstream calls saved and title cache info
+    """
+    with _stats_lock:
+        total = _stats["local_titles"] + _stats["llm_fallbacks"]
+        cache = _cached_title.cache_info()
+        return {
+            **_stats,
+            "upstream_calls_saved": _stats["local_titles"] / total if total else 0.0,
+            "cache_hits": cache.hits,
+            "cache_misses": cache.misses,
+        }
+
+
+def _last_user_text(query_input: Any) -> str:
+    if isinstance(query_input, str):
+        return query_input
+    messages = query_input if isinstance(query_input, list) else [query_input]
+    for message in reversed(messages):
+        if isinstance(message, dict):
+            role, content = message.get("role"), message.get("content")
+        else:
+            role, content = getattr(message, "role", None), getattr(message, "content", None)
+        if getattr(role, "value", role) != "user":
+            continue
+        if isinstance(content, list):
+            content = " ".join(str(part.get("text", "")) if isinstance(part, dict) else str(getattr(part, "text", ""))
+                               for part in content)
+        return content or ""
+    return ""
+
+
+class HeuristicChatNamingAgent(AdmissionControlledAgent):
+    """Chat naming agent that titles chats locally and only asks the LLM when unsure.
+
+    Titles are keyword/emoji extractions of the last user message (see heuristic_title). If the
+    confidence is below `local_titling_min_confidence`, or `local_titling` is off, the request is
+    answered by the configured LLM like a plain ChatUIAgent. Its LLM calls queue behind the
+    user-facing profiles, and a shed call falls back to the heuristic title.
+    """
+
+    admission_priority: int = Field(
+        default=10, ge=0,
+        description="Queue priority of this profile's completions, lower values are admitted first")
+
+    local_titling: bool = Field(
+        default=True,
+        description="Title chats from keywords of the user message without an LLM call when confident")
+    local_titling_min_confidence: float = Field(
+        default=0.6, ge=0.0, le=1.0,
+        description="Minimum heuristic confidence to skip the LLM call")
+    local_titling_max_words: int = Field(
+        default=4, ge=1,
+        description="Maximum number of keywords in a local title")
+
+    def _local_title(self, query_input: Any) -> Optional[str]:
+        if not self.local_titling:
+            return None
+        text = _last_user_text(query_input)
+        title, confidence = heuristic_title(text, self.local_titling_max_words)
+        local = confidence >= self.local_titling_min_confidence
+        with _stats_lock:
+            _stats["local_titles" if local else "llm_fallbacks"] += 1
+        log_bus.log_message(
+            f"Chat title {'made locally' if local else 'delegated to LLM'}: {title}",
+            source="chat_naming.HeuristicChatNamingAgent",
+            action="local_title" if local else "llm_fallback",
+            confidence=confidence,
+            min_confidence=self.local_titling_min_confidence,
+        )
+        return title if local else None
+
+    def query(self, query_input: Any, **kwargs) -> str:
+        title = self._local_title(query_input)
+        if title is None:
+            return super().query(query_input, **kwargs)
+        return title
+
+    def stream(self, query_input: Any, **kwargs) -> Generator[Any, None, None]:
+        title = self._local_title(query_input)
+        if title is None:
+            return super().stream(query_input, **kwargs)
+        return self._stream_text(title, kwargs.get("model", self.shortname))
+
+    def _shed_reply(self, query_input: Any, error: AdmissionRejected) -> str:
+        super()._shed_reply(query_input, error)
+        return heuristic_title(_last_user_text(query_input), self.local_titling_max_words)[0]
@@ -0,0 +1,231 @@
+import hashlib
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import pyarrow as pa
+import pyarrow.csv as csv
+import pyarrow.dataset as ds
+import pyarrow.fs as pafs
+import pyarrow.ipc as ipc
+from just_agents.just_bus import JustLogBus
+
+from agent_tools.log_sink import get_log_sink
+from agent_tools.tools_config import get_tmp_dir, get_tools_config
+
+# Initialize the singleton logger
+log_bus = JustLogBus()
+get_log_sink()
+
+# Text table formats that are converted, with the delimiter used to parse them
+CONVERTIBLE = {".csv": ",", ".tsv": "\t"}
+# Binary table formats that are read as they are, with their pyarrow dataset format
+NATIVE_FORMATS = {".parquet": "parquet", ".pq": "parquet", ".arrow": "arrow", ".feather": "feather"}
+
+
+class ColumnarCache:
+    """Arrow IPC copies of CSV/TSV data files, converted in the background.
+
+    A copy is keyed by the resolved path, size and mtime of the source file, so an edited file
+    simply misses and gets converted again. Copies are memory-mapped on read (numeric columns
+    are used zero-copy) and evicted least recently used first once the cache exceeds max_bytes.
+    Conversion writes to a temporary file and renames it, so workers sharing TMP_DIR never see
+    a partial copy. A failed conversion is logged once and not retried until the source changes.
+    """
+
+    def __init__(self, directory: str, max_bytes: int = 1024 ** 3, min_file_bytes: int = 1024 ** 2):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.min_file_bytes = min_file_bytes
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._filesystem = pafs.LocalFileSystem(use_mmap=True)
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="columnar_cache")
+        self._pending: Dict[str, Future] = {}
+        self._failed: Dict[str, str] = {}  # cache key (path, size, mtime) -> error of the failed conversion
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.conversions = 0
+        self.evictions = 0
+        self.errors = 0
+
+    def cache_path(self, source: Path) -> Path:
+        stat = source.stat()
+        key = hashlib.sha256(f"{source.resolve()}\x00{stat.st_size}\x00{stat.st_mtime_ns}".encode("utf-8")).hexdigest()
+        return self.directory / f"{key[:32]}.arrow"
+
+    def lookup(self, source: Path) -> Optional[Path]:
+        """Path of the up-to-date copy (marked as recently used), or None if there is none yet."""
+        target = self.cache_path(source)
+        if not target.exists():
+            return None
+        try:
+            os.utime(target)
+        except OSError:
+            pass
+        return target
+
+    def convert(self, source: Path) -> Path:
+        """Convert a CSV/TSV file to an Arrow IPC copy batch by batch, then enforce the size limit."""
+        target = self.cache_path(source)
+        if target.exists():
+            return target
+        partial = target.with_suffix(f".arrow.tmp-{os.getpid()}-{threading.get_ident()}")
+        delimiter = CONVERTIBLE[source.suffix.lower()]
+        try:
+            reader = csv.open_csv(str(source), parse_options=csv.ParseOptions(delimiter=delimiter))
+            with pa.OSFile(str(partial), "wb") as sink, ipc.new_file(sink, reader.schema) as writer:
+                for batch in reader:
+                    writer.write_batch(batch)
+            os.replace(partial, target)
+        finally:
+            if partial.exists():
+                partial.unlink()
+        with self._lock:
+            self.conversions += 1
+        self.evict()
+        return target
+
+    def schedule(self, source: Path) -> Optional[Future]:
+        """Queue a background conversion unless the file is too small, already queued or failed to convert."""
+        if source.suffix.lower() not in CONVERTIBLE or source.stat().st_size < self.min_file_bytes:
+            return None
+        key = str(self.cache_path(source))
+        with self._lock:
+            if key in self._failed:
+                return None
+            future = self._pending.get(key)
+            if future is not None:
+                return future
+            future = self._executor.submit(self._convert_in_background, source, key)
+            self._pending[key] = future
+            return future
+
+    def _convert_in_background(self, source: Path, key: str) -> Optional[Path]:
+        try:
+            return self.convert(source)
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+            with self._lock:
+                self.errors += 1
+                self._failed[key] = error
+            log_bus.log_message(
+                f"Columnar cache conversion of {source} failed, reading it as text until it changes: {error}",
+                source="columnar_cache.convert",
+                action="conversion_error",
+                path=str(source),
+                error=error,
+            )
+            return None
+        finally:
+            with self._lock:
+                self._pending.pop(key, None)
+
+    def evict(self) -> None:
+        """Delete least recently used copies until the cache fits in max_bytes."""
+        entries = []
+        for path in self.directory.glob("*.arrow"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+            total -= size
+            with self._lock:
+                self.evictions += 1
+
+    def dataset(self, source: Path) -> ds.Dataset:
+        """Dataset over the cached copy if there is one, else over the source (queuing its conversion)."""
+        if source.suffix.lower() in CONVERTIBLE:
+            cached = self.lookup(source)
+            with self._lock:
+                if cached is not None:
+                    self.hits += 1
+                else:
+                    self.misses += 1
+            if cached is not None:
+                return ds.dataset(str(cached), format="arrow", filesystem=self._filesystem)
+            self.schedule(source)
+        return _source_dataset(source)
+
+    def stats(self) -> Dict[str, Any]:
+        files = list(self.directory.glob("*.arrow"))
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "lookups": lookups,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "conversions": self.conversions,
+                "evictions": self.evictions,
+                "errors": self.errors,
+                "failed": len(self._failed),
+                "pending": len(self._pending),
+                "files": len(files),
+                "bytes": sum(f.stat().st_size for f in files if f.exists()),
+                "max_bytes": self.max_bytes,
+            }
+
+
+def _source_dataset(path: Path) -> ds.Dataset:
+    suffix = path.suffix.lower()
+    if suffix in CONVERTIBLE:
+        return ds.dataset(str(path), format=ds.CsvFileFormat(parse_options=csv.ParseOptions(delimiter=CONVERTIBLE[suffix])))
+    if suffix not in NATIVE_FORMATS:
+        raise ValueError(f"Unsupported table format {path.suffix}, expected one of {list(CONVERTIBLE) + list(NATIVE_FORMATS)}")
+    return ds.dataset(str(path), format=NATIVE_FORMATS[suffix])
+
+
+_cache: Optional[ColumnarCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_columnar_cache() -> Optional[ColumnarCache]:
+    """Process-wide cache configured from `tools_config.columnar_cache`, or None if disabled."""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                config = get_tools_config("columnar_cache")
+                if not config.get("enabled", True):
+                    return None
+                _cache = ColumnarCache(
+                    directory=config.get("path") or os.path.join(get_tmp_dir(), "columnar_cache"),
+                    max_bytes=int(float(config.get("max_mb", 1024)) * 1024 ** 2),
+                    min_file_bytes=int(float(config.get("min_file_mb", 1)) * 1024 ** 2),
+                )
+    return _cache
+
+
+def open_table_dataset(path: Path) -> ds.Dataset:
+    """Dataset for a CSV/TSV/Parquet/Arrow file, read from the columnar cache when it is enabled."""
+    cache = get_columnar_cache()
+    return cache.dataset(path) if cache is not None else _source_dataset(path)
+
+
+def read_table(path: Path, columns: Optional[List[str]] = None) -> pa.Table:
+    """Read a whole table (optionally only some columns), memory-mapped when a cached copy exists."""
+    return open_table_dataset(path).to_table(columns=columns)
+
+
+def columnar_cache_stats() -> Dict[str, Any]:
+    """Report columnar cache metrics (hits, misses, conversions, evictions, size on disk).
+
+    Returns:
+        Dict[str, Any]: Cache statistics, or {"enabled": False} if the cache is disabled
+    """
+    cache = get_columnar_cache()
+    if cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **cache.stats()}
@@ -1,12 +1,28 @@
 from pathlib import Path
 from typing import Dict, List, Union, Optional, Any, Literal
+import json
 import os
 from pydantic import BaseModel, Field, RootModel
 from just_agents.just_bus import JustLogBus
 
+from agent_tools.log_sink import get_log_sink
+from agent_tools.tool_cache import get_tool_cache, tool_cache_ttl
+from agent_tools.tools_config import get_data_dir
+
 
 # Initialize the singleton logger
 log_bus = JustLogBus()
+get_log_sink()
+
+# Extensions listed by list_files when show_all is False
+LISTED_EXTENSIONS = ['.txt', '.md', '.csv', '.parquet']
+
+# Table formats supported by query_table
+TABLE_FORMATS = ['.csv', '.tsv', '.parquet', '.pq']
+
+FILTER_OPERATORS = ['==', '!=', '<', '<=', '>', '>=', 'in', 'not in', 'is null', 'is not null', 'contains']
+
+AGGREGATIONS = ['count', 'count_distinct', 'sum', 'mean', 'min', 'max', 'stddev', 'variance', 'approximate_median']
 
 class FileInfo(BaseModel):
     """Information about a file in the filesystem.
@@ -83,7 +99,7 @@ def read_file(file_path: str) -> str:
         ValueError: If the file path is outside the allowed directory
         FileNotFoundError: If the file doesn't exist
     """
-    base_dir = "/app/data"
+    base_dir = get_data_dir()
     
     try:
         # Validate path security
@@ -103,9 +119,8 @@ def read_file(file_path: str) -> str:
             # Raise FileNotFoundError with clear message
             raise FileNotFoundError(f"File not found: {file_path}")
             
-        # Read and return content
-        content = secure_path.read_text(encoding='utf-8')
-        return content
+        # Read and return content (not cached: a tool cache lookup costs more than reading from the page cache)
+        return secure_path.read_text(encoding='utf-8')
         
     except ValueError as e:
         # Re-raise security errors
@@ -128,7 +143,7 @@ def list_files(
     
     Args:
         show_all: If True, returns all files regardless of extension.
-            If False, returns only text files (*.txt, *.md, and *.csv).
+            If False, returns only text and table files (*.txt, *.md, *.csv and *.parquet).
         subdir: Optional subdirectory path to filter results as a string. 
             If provided, only files in this subdirectory will be returned.
         as_json: If True, returns a dictionary with the full directory tree.
@@ -139,10 +154,10 @@ def list_files(
             or a dictionary representing the directory structure.
             
     Raises:
-        ValueError: If the provided subdir attempts to access files outside /app/data.
+        ValueError: If the provided subdir attempts to access files outside /app/data (DATA_DIR).
     """
     # Base directory
-    base_dir = "/app/data"
+    base_dir = get_data_dir()
     base_dir_path = Path(base_dir)
     
     # Handle subdir if provided
@@ -176,40 +191,235 @@ def list_files(
             return [] if not as_json else {"error": str(e)}
     else:
         root_dir = base_dir_path
-    
+
+    # Listings are kept in the tool cache: an entry lives for the "files" TTL and is dropped early when a file
+    # is added, removed or renamed anywhere under the listed folder or the "files" namespace is invalidated
+    cache = get_tool_cache()
+    if cache is None:
+        return _list_files(root_dir, base_dir_path, show_all, as_json)
+    return cache.get_or_compute(
+        "files",
+        ["list_files", str(root_dir), show_all, as_json, *_tree_signature(root_dir)],
+        lambda: _list_files(root_dir, base_dir_path, show_all, as_json),
+        tool_cache_ttl("files"),
+    )
+
+
+def _tree_signature(root_dir: Path) -> List[int]:
+    """Newest st_mtime_ns and number of the folders under root_dir (itself included).
+
+    Adding, removing or renaming a file changes the mtime of its own folder only, so every nested folder
+    is visited; only folders are stat'ed, which is much cheaper than the listing itself.
+    """
+    latest, folders = 0, 0
+    stack = [str(root_dir)]
+    while stack:
+        folder = stack.pop()
+        try:
+            latest = max(latest, os.stat(folder).st_mtime_ns)
+            folders += 1
+            with os.scandir(folder) as entries:
+                stack.extend(entry.path for entry in entries if entry.is_dir(follow_symlinks=False))
+        except OSError:
+            continue
+    return [latest, folders]
+
+
+def _list_files(root_dir: Path, base_dir_path: Path, show_all: bool, as_json: bool) -> Union[List[str], Dict[str, Any]]:
+    """Flat list or tree of the files under root_dir (see list_files)."""
     # If we just want a flat list of files
+    # Results are sorted so that the same files always produce the same output: list_files is used
+    # as a prompt tool and a stable prompt prefix is what makes provider/proxy prompt caching work
     if not as_json:
         if show_all:
             # Return strings instead of Path objects
-            return [str(p) for p in root_dir.glob("**/*") if p.is_file()]
+            return sorted(str(p) for p in root_dir.glob("**/*") if p.is_file())
         else:
-            # Include txt, md, and csv files
+            # Include txt, md, csv and parquet files
             file_list = []
-            file_list.extend([str(p) for p in root_dir.glob("**/*.txt") if p.is_file()])
-            file_list.extend([str(p) for p in root_dir.glob("**/*.md") if p.is_file()])
-            file_list.extend([str(p) for p in root_dir.glob("**/*.csv") if p.is_file()])
+            for extension in LISTED_EXTENSIONS:
+                file_list.extend(sorted(str(p) for p in root_dir.glob(f"**/*{extension}") if p.is_file()))
             return file_list
     
-    # Build a tree structure for JSON output
-    def build_tree(directory: Path) -> Dict[str, Any]:
-        """Helper function to recursively build directory tree."""
-        result = {}
-        
-        for path in directory.iterdir():
-            rel_path = str(path.relative_to(base_dir_path))
-            
-            if path.is_dir():
-                result[path.name] = build_tree(path)
-            elif show_all or path.suffix.lower() in ['.txt', '.md', '.csv']:
-                result[path.name] = {
-                    "type": "file",
-                    "path": rel_path,
-                    "extension": path.suffix,
-                    "size": path.stat().st_size
-                }
+    # Build and return the tree
+    tree = _build_tree(root_dir, base_dir_path, show_all)
+    return tree
+
+
+def query_table(
+    file_path: str,
+    columns: Optional[List[str]] = None,
+    filters: Optional[List[List[Any]]] = None,
+    group_by: Optional[List[str]] = None,
+    aggregations: Optional[Dict[str, List[str]]] = None,
+    order_by: Optional[str] = None,
+    descending: bool = False,
+    limit: int = 50,
+    max_bytes: int = 16000
+) -> Dict[str, Any]:
+    """Query a CSV or Parquet table in the data directory without reading it whole.
+
+    Only the needed columns are read, filters are pushed down to the reader (Parquet row groups
+    whose statistics cannot match are skipped) and aggregation runs on columnar data.
+    Use it instead of read_file for tables: call it first with limit=5 to see the columns.
+
+    Args:
+        file_path: Path to a .csv, .tsv, .parquet or .pq file, relative to the data directory
+        columns: Columns to return. All columns if omitted (ignored when aggregating)
+        filters: Conditions that must all hold, each as [column, operator, value], e.g.
+            [["glucose", ">", 180], ["device", "in", ["dexcom", "libre"]]].
+            Operators: ==, !=, <, <=, >, >=, in, not in, is null, is not null, contains
+        group_by: Columns to group by when aggregating
+        aggregations: Aggregations per column, e.g. {"glucose": ["mean", "max"], "id": ["count"]}.
+            Functions: count, count_distinct, sum, mean, min, max, stddev, variance, approximate_median
+        order_by: Column to sort the result by (aggregated columns are named <column>_<function>)
+        descending: Sort in descending order
+        limit: Maximum number of rows to return
+        max_bytes: Maximum size of the returned rows serialized as JSON
+
+    Returns:
+        Dict[str, Any]: {"columns": [...], "rows": [[...], ...], "schema": {column: type},
+            "returned_rows": int, "truncated": bool}; "truncated" is True if rows were cut by
+            limit or max_bytes
+
+    Raises:
+        ValueError: If the path is outside the data directory, the format, a column, an operator
+            or an aggregation is not supported
+        FileNotFoundError: If the file doesn't exist
+    """
+    # pyarrow is only needed for tables, list_files and read_file keep working without it
+    import pyarrow.compute as pc
+    import pyarrow.dataset as ds
+    from agent_tools.columnar_cache import open_table_dataset
+
+    base_dir = get_data_dir()
+    secure_path = Path(validate_path_security(file_path, base_dir))
+    if not secure_path.is_file():
+        raise FileNotFoundError(f"File not found: {file_path}")
+    if secure_path.suffix.lower() not in TABLE_FORMATS:
+        raise ValueError(f"Unsupported table format {secure_path.suffix}, expected one of {TABLE_FORMATS}")
+
+    # CSV/TSV files are read from their memory-mapped Arrow copy once the columnar cache has one
+    dataset = open_table_dataset(secure_path)
+    schema = dataset.schema
+    filters = filters or []
+    aggregations = aggregations or {}
+    group_by = group_by or []
+
+    referenced = set(columns or []) | set(group_by) | set(aggregations) | {f[0] for f in filters if f}
+    unknown = sorted(c for c in referenced if c not in schema.names)
+    if unknown:
+        raise ValueError(f"Unknown columns {unknown}, available columns: {schema.names}")
+
+    expression = _filter_expression(filters, pc, ds)
+    if aggregations:
+        needed = list(dict.fromkeys(group_by + list(aggregations)))
+        specs = []
+        for column, functions in aggregations.items():
+            for function in functions:
+                if function not in AGGREGATIONS:
+                    raise ValueError(f"Unsupported aggregation {function}, expected one of {AGGREGATIONS}")
+                specs.append((column, function))
+        table = dataset.to_table(columns=needed, filter=expression).group_by(group_by).aggregate(specs)
+        # pyarrow puts the group keys last, show them first
+        table = table.select(group_by + [n for n in table.column_names if n not in group_by])
+    else:
+        needed = columns or schema.names
+        if order_by and order_by not in needed:
+            needed = needed + [order_by]
+        scanner = dataset.scanner(columns=needed, filter=expression)
+        # without sorting, stop reading as soon as enough rows matched
+        table = scanner.to_table() if order_by else scanner.head(limit + 1)
+
+    if order_by:
+        if order_by not in table.column_names:
+            raise ValueError(f"Cannot order by {order_by}, result columns: {table.column_names}")
+        table = table.sort_by([(order_by, "descending" if descending else "ascending")])
+        if columns and not aggregations:
+            table = table.select(columns)
+
+    rows: List[List[Any]] = []
+    size = 0
+    truncated = table.num_rows > limit
+    for row in table.slice(0, limit).to_pylist():
+        values = list(row.values())
+        size += len(json.dumps(values, default=str))
+        if size > max_bytes and rows:
+            truncated = True
+            break
+        rows.append(values)
+
+    log_bus.log_message(
+        f"Table query on {file_path} returned {len(rows)} rows",
+        source="data_tools.query_table",
+        action="query_table",
+        path=file_path,
+        columns=needed,
+        filters=filters,
+        aggregations=aggregations,
+        truncated=truncated
+    )
+    return {
+        "columns": table.column_names,
+        "rows": json.loads(json.dumps(rows, default=str)),
+        "schema": {field.name: str(field.type) for field in table.schema},
+        "returned_rows": len(rows),
+        "truncated": truncated
+    }
+
+
+def _filter_expression(filters: List[List[Any]], pc: Any, ds: Any) -> Any:
+    """AND together [column, operator, value] conditions as a pyarrow dataset expression."""
+    expression = None
+    for condition in filters:
+        if not condition or len(condition) < 2:
+            raise ValueError(f"Filter must be [column, operator, value], got {condition}")
+        column, operator = condition[0], str(condition[1]).lower()
+        value = condition[2] if len(condition) > 2 else None
+        field = ds.field(column)
+        if operator == '==':
+            term = field == value
+        elif operator == '!=':
+            term = field != value
+        elif operator == '<':
+            term = field < value
+        elif operator == '<=':
+            term = field <= value
+        elif operator == '>':
+            term = field > value
+        elif operator == '>=':
+            term = field >= value
+        elif operator == 'in':
+            term = field.isin(value if isinstance(value, list) else [value])
+        elif operator == 'not in':
+            term = ~field.isin(value if isinstance(value, list) else [value])
+        elif operator == 'is null':
+            term = field.is_null()
+        elif operator == 'is not null':
+            term = field.is_valid()
+        elif operator == 'contains':
+            term = pc.match_substring(field, str(value))
+        else:
+            raise ValueError(f"Unsupported filter operator {operator}, expected one of {FILTER_OPERATORS}")
+        expression = term if expression is None else expression & term
+    return expression
+
+
+def _build_tree(directory: Path, base_dir_path: Path, show_all: bool = False) -> Dict[str, Any]:
+    """Recursively build a directory tree with entries sorted by name (independent of filesystem order)."""
+    result = {}
+    
+    for path in sorted(directory.iterdir(), key=lambda p: p.name):
+        rel_path = str(path.relative_to(base_dir_path))
         
-        return result
+        if path.is_dir():
+            result[path.name] = _build_tree(path, base_dir_path, show_all)
+        elif show_all or path.suffix.lower() in LISTED_EXTENSIONS:
+            result[path.name] = {
+                "type": "file",
+                "path": rel_path,
+                "extension": path.suffix,
+                "size": path.stat().st_size
+            }
     
-    # Build and return the tree
-    tree = build_tree(root_dir)
-    return tree
\ No newline at end of file
+    return result
\ No newline at end of file
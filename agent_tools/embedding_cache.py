@@ -0,0 +1,120 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import unicodedata
+from array import array
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional
+
+from agent_tools.tools_config import get_tools_config, get_tmp_dir
+
+
+def normalize_query(query: str) -> str:
+    """Normalise query text for cache keys: NFKC, case-folded, collapsed whitespace."""
+    return " ".join(unicodedata.normalize("NFKC", query).casefold().split())
+
+
+class QueryEmbeddingCache:
+    """Two-tier cache of query embeddings keyed by model and normalised query text.
+
+    The first tier is an in-memory LRU, the second one an optional sqlite file shared by
+    all workers and kept across restarts. Vectors are stored as float32.
+    """
+
+    def __init__(self, memory_size: int = 2048, path: Optional[str] = None):
+        self.memory_size = memory_size
+        self.path = path
+        self._memory: "OrderedDict[str, List[float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self.hits_memory = 0
+        self.hits_disk = 0
+        self.misses = 0
+        if path:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            self._conn = sqlite3.connect(path, check_same_thread=False, timeout=5.0)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute("CREATE TABLE IF NOT EXISTS query_embeddings (key TEXT PRIMARY KEY, vector BLOB)")
+            self._conn.commit()
+
+    @staticmethod
+    def make_key(query: str, model: str) -> str:
+        return hashlib.sha256(f"{model}\x00{normalize_query(query)}".encode("utf-8")).hexdigest()
+
+    def get(self, query: str, model: str) -> Optional[List[float]]:
+        key = self.make_key(query, model)
+        with self._lock:
+            vector = self._memory.get(key)
+            if vector is not None:
+                self._memory.move_to_end(key)
+                self.hits_memory += 1
+                return vector
+            if self._conn is not None:
+                row = self._conn.execute("SELECT vector FROM query_embeddings WHERE key = ?", (key,)).fetchone()
+                if row is not None:
+                    vector = array("f", row[0]).tolist()
+                    self._remember(key, vector)
+                    self.hits_disk += 1
+                    return vector
+            self.misses += 1
+            return None
+
+    def put(self, query: str, model: str, vector: List[float]) -> None:
+        key = self.make_key(query, model)
+        with self._lock:
+            self._remember(key, vector)
+            if self._conn is not None:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO query_embeddings VALUES (?, ?)", (key, array("f", vector).tobytes())
+                )
+                self._conn.commit()
+
+    def get_or_compute(self, query: str, model: str, compute: Callable[[str], List[float]]) -> List[float]:
+        """Return the cached vector or compute, store and return it."""
+        vector = self.get(query, model)
+        if vector is None:
+            vector = list(compute(query))
+            self.put(query, model, vector)
+        return vector
+
+    def _remember(self, key: str, vector: List[float]) -> None:
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_size:
+            self._memory.popitem(last=False)
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            lookups = self.hits_memory + self.hits_disk + self.misses
+            return {
+                "lookups": lookups,
+                "hits_memory": self.hits_memory,
+                "hits_disk": self.hits_disk,
+                "misses": self.misses,
+                "hit_rate": (self.hits_memory + self.hits_disk) / lookups if lookups else 0.0,
+                "memory_entries": len(self._memory),
+                "memory_size": self.memory_size,
+                "persistent": self._conn is not None,
+            }
+
+
+_cache: Optional[QueryEmbeddingCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_embedding_cache() -> Optional[QueryEmbeddingCache]:
+    """Process-wide cache configured from `tools_config.embedding_cache`, or None if disabled."""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                config = get_tools_config("embedding_cache")
+                if not config.get("enabled", True):
+                    return None
+                path = None
+                if config.get("persistent", True):
+                    path = config.get("path") or os.path.join(get_tmp_dir(), "query_embeddings.sqlite")
+                _cache = QueryEmbeddingCache(memory_size=int(config.get("memory_size", 2048)), path=path)
+    return _cache
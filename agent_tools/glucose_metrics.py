@@ -0,0 +1,305 @@
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from just_agents.just_bus import JustLogBus
+
+from agent_tools.data_tools import validate_path_security
+from agent_tools.log_sink import get_log_sink
+from agent_tools.tools_config import get_data_dir
+
+
+# Initialize the singleton logger
+log_bus = JustLogBus()
+get_log_sink()
+
+MMOL_TO_MGDL = 18.0182
+
+
+class GlucoseAccumulator:
+    """Single-pass, chunked CGM statistics.
+
+    Chunks are processed with numpy only: moments and range counts are summed, turning points
+    of the series are found from sign changes of the first difference (carrying the last value
+    and slope across chunk boundaries), and window statistics are reduced per run of equal window
+    ids with reduceat. Only the values of the turning points are kept (float32), because MAGE needs
+    the SD of the whole series to tell excursions from sensor noise.
+    """
+
+    def __init__(self, low: float = 70, high: float = 180, very_low: float = 54, very_high: float = 250):
+        self.lower = (very_low, low)
+        self.upper = (high, very_high)
+        self.count = 0
+        self.total = 0.0
+        self.total_squares = 0.0
+        self.minimum = np.inf
+        self.maximum = -np.inf
+        self.range_counts = np.zeros(5, dtype=np.int64)  # very low, low, in range, high, very high
+        self._first_value: Optional[float] = None
+        self._last_value: Optional[float] = None
+        self._last_slope = 0
+        self._turning_points: List[np.ndarray] = []
+        self.windows: Dict[int, np.ndarray] = {}  # window id -> count, sum, sum of squares, min, max, in range
+
+    def update(self, values: np.ndarray, window_ids: Optional[np.ndarray] = None) -> None:
+        values = np.asarray(values, dtype=np.float64)
+        valid = ~np.isnan(values)
+        if not valid.all():
+            values = values[valid]
+            window_ids = window_ids[valid] if window_ids is not None else None
+        if values.size == 0:
+            return
+
+        self.count += values.size
+        self.total += float(values.sum())
+        self.total_squares += float(np.dot(values, values))
+        self.minimum = min(self.minimum, float(values.min()))
+        self.maximum = max(self.maximum, float(values.max()))
+        # bounds of the target range count as in range: <54, 54-69, 70-180, 181-250, >250 mg/dL by default
+        bands = np.searchsorted(self.lower, values, side="right") + np.searchsorted(self.upper, values, side="left")
+        self.range_counts += np.bincount(bands, minlength=5)
+        self._update_excursions(values)
+        if window_ids is not None:
+            self._update_windows(values, window_ids)
+
+    def _update_excursions(self, values: np.ndarray) -> None:
+        if self._first_value is None:
+            self._first_value = float(values[0])
+        series = values if self._last_value is None else np.concatenate(([self._last_value], values))
+        self._last_value = float(values[-1])
+        if series.size < 2:
+            return
+        slopes = np.sign(np.diff(series)).astype(np.int8)
+        # plateaus keep the previous slope so that a flat top is a single turning point
+        nonzero = np.flatnonzero(slopes)
+        if nonzero.size == 0:
+            return
+        filled_index = np.maximum.accumulate(np.where(slopes != 0, np.arange(slopes.size), -1))
+        filled = np.where(filled_index >= 0, slopes[np.maximum(filled_index, 0)], self._last_slope).astype(np.int8)
+        previous = np.concatenate(([self._last_slope], filled[:-1]))
+        turning = np.flatnonzero((filled != previous) & (previous != 0))
+        self._last_slope = int(filled[-1])
+        if turning.size:
+            self._turning_points.append(series[turning].astype(np.float32))
+
+    def _update_windows(self, values: np.ndarray, window_ids: np.ndarray) -> None:
+        steps = np.diff(window_ids)
+        if (steps < 0).any():
+            # readings out of time order: group them by window first
+            order = np.argsort(window_ids, kind="stable")
+            values, window_ids = values[order], window_ids[order]
+            steps = np.diff(window_ids)
+        starts = np.concatenate(([0], np.flatnonzero(steps) + 1))
+        ids = window_ids[starts]
+        counts = np.diff(np.append(starts, values.size))
+        sums = np.add.reduceat(values, starts)
+        squares = np.add.reduceat(values * values, starts)
+        minimums = np.minimum.reduceat(values, starts)
+        maximums = np.maximum.reduceat(values, starts)
+        in_range = np.add.reduceat(((values >= self.lower[1]) & (values <= self.upper[0])).astype(np.int64), starts)
+        for i, window in enumerate(ids.tolist()):
+            row = self.windows.get(window)
+            if row is None:
+                self.windows[window] = np.array([counts[i], sums[i], squares[i], minimums[i], maximums[i], in_range[i]])
+            else:
+                row[0] += counts[i]
+                row[1] += sums[i]
+                row[2] += squares[i]
+                row[3] = min(row[3], minimums[i])
+                row[4] = max(row[4], maximums[i])
+                row[5] += in_range[i]
+
+    def mean_sd(self) -> Tuple[float, float]:
+        mean = self.total / self.count
+        variance = max(0.0, self.total_squares / self.count - mean * mean) * self.count / max(1, self.count - 1)
+        return mean, float(np.sqrt(variance))
+
+    def mage(self, sd: float) -> Optional[float]:
+        """Mean amplitude of glycemic excursions, peak to nadir and nadir to peak, larger than 1 SD.
+
+        Peaks and nadirs are confirmed with 1 SD hysteresis (Baghurst): a candidate peak becomes a
+        turning point only once the series falls more than 1 SD below it (and a nadir once it rises
+        more than 1 SD above it), so noise within an excursion does not split it. The incomplete
+        excursions at both ends of the series are not counted.
+        """
+        if self._first_value is None:
+            return None
+        points = [self._first_value]
+        for chunk in self._turning_points:
+            points.extend(chunk.tolist())
+        points.append(self._last_value)
+
+        swings: List[float] = []
+        low = high = points[0]
+        anchor = candidate = 0.0
+        direction = 0  # 1 while rising to a peak, -1 while falling to a nadir, 0 before the first excursion
+        for value in points[1:]:
+            if direction == 0:
+                low, high = min(low, value), max(high, value)
+                if value - low > sd:
+                    anchor, candidate, direction = low, value, 1
+                elif high - value > sd:
+                    anchor, candidate, direction = high, value, -1
+            elif direction == 1:
+                if value > candidate:
+                    candidate = value
+                elif candidate - value > sd:
+                    swings.append(candidate - anchor)
+                    anchor, candidate, direction = candidate, value, -1
+            else:
+                if value < candidate:
+                    candidate = value
+                elif value - candidate > sd:
+                    swings.append(anchor - candidate)
+                    anchor, candidate, direction = candidate, value, 1
+        # the first swing starts at the beginning of the series, not at a confirmed peak or nadir
+        swings = swings[1:]
+        return float(np.mean(swings)) if swings else 0.0
+
+
+def glucose_metrics(
+    file_path: Optional[str] = None,
+    readings: Optional[List[float]] = None,
+    glucose_column: str = "glucose",
+    time_column: Optional[str] = None,
+    units: str = "mg/dL",
+    low: float = 70,
+    high: float = 180,
+    very_low: float = 54,
+    very_high: float = 250,
+    window_minutes: int = 1440,
+    window_readings: int = 288,
+    max_windows: int = 14,
+    chunk_rows: int = 1_000_000
+) -> Dict[str, Any]:
+    """Compute standard CGM glucose metrics over a long series without loading it into the prompt.
+
+    The series is read from a CSV/TSV/Parquet file in the data directory in chunks (only the needed
+    columns), or taken from `readings`. Readings are expected in time order.
+
+    Args:
+        file_path: Path of the CGM table relative to the data directory
+        readings: Glucose values to use instead of a file
+        glucose_column: Column with glucose values
+        time_column: Optional timestamp column (datetime, ISO string or unix seconds), used for time windows
+        units: "mg/dL" or "mmol/L" (values are converted to mg/dL, thresholds are always mg/dL)
+        low: Lower bound of the target range, 70 mg/dL by default
+        high: Upper bound of the target range, 180 mg/dL by default
+        very_low: Level 2 hypoglycemia threshold, 54 mg/dL by default
+        very_high: Level 2 hyperglycemia threshold, 250 mg/dL by default
+        window_minutes: Window length for rolling statistics when time_column is given, 1440 (daily) by default
+        window_readings: Window length in readings when there is no time_column, 288 (one day at 5 minutes) by default
+        max_windows: Number of most recent windows to return
+        chunk_rows: Readings processed per chunk
+
+    Returns:
+        Dict[str, Any]: readings, mean, sd, cv (%), gmi (%), min, max, time below/in/above range (%),
+            mage (mean amplitude of glycemic excursions above 1 SD) and the last windows with their
+            mean, sd, min, max and time in range
+
+    Raises:
+        ValueError: If no data is given, a column is missing or the path is outside the data directory
+        FileNotFoundError: If the file doesn't exist
+    """
+    scale = MMOL_TO_MGDL if units.lower().replace(" ", "") in ("mmol/l", "mmol") else 1.0
+    accumulator = GlucoseAccumulator(low=low, high=high, very_low=very_low, very_high=very_high)
+    window_label = "minutes" if time_column else "readings"
+
+    if readings is not None:
+        values = np.asarray(readings, dtype=np.float64) * scale
+        accumulator.update(values, np.arange(values.size) // window_readings)
+    elif file_path:
+        for values, times, offset in _iter_chunks(file_path, glucose_column, time_column, chunk_rows):
+            if times is not None:
+                window_ids = times // (window_minutes * 60)
+            else:
+                window_ids = (offset + np.arange(values.size)) // window_readings
+            accumulator.update(values * scale if scale != 1.0 else values, window_ids)
+    else:
+        raise ValueError("Provide either file_path or readings")
+
+    if accumulator.count == 0:
+        raise ValueError("No glucose readings found")
+
+    mean, sd = accumulator.mean_sd()
+    shares = accumulator.range_counts / accumulator.count * 100
+    windows = []
+    for window in sorted(accumulator.windows)[-max_windows:]:
+        count, total, squares, minimum, maximum, in_range = accumulator.windows[window]
+        window_mean = total / count
+        window_sd = np.sqrt(max(0.0, squares / count - window_mean ** 2) * count / max(1, count - 1))
+        start = (int(window) * window_minutes * 60) if time_column else int(window) * window_readings
+        windows.append({
+            "start": str(np.datetime64(start, "s")) if time_column else start,
+            "readings": int(count),
+            "mean": round(float(window_mean), 1),
+            "sd": round(float(window_sd), 1),
+            "min": round(float(minimum), 1),
+            "max": round(float(maximum), 1),
+            "time_in_range": round(float(in_range / count * 100), 1),
+        })
+
+    mage = accumulator.mage(sd)
+    result = {
+        "readings": accumulator.count,
+        "units": "mg/dL",
+        "mean": round(mean, 1),
+        "sd": round(sd, 1),
+        "cv": round(sd / mean * 100, 1) if mean else None,
+        "gmi": round(3.31 + 0.02392 * mean, 2),
+        "min": round(accumulator.minimum, 1),
+        "max": round(accumulator.maximum, 1),
+        "time_very_low": round(float(shares[0]), 1),
+        "time_low": round(float(shares[1]), 1),
+        "time_in_range": round(float(shares[2]), 1),
+        "time_high": round(float(shares[3]), 1),
+        "time_very_high": round(float(shares[4]), 1),
+        "mage": round(mage, 1) if mage is not None else None,
+        "target_range": [low, high],
+        "windows": windows,
+        "window": f"{window_minutes if time_column else window_readings} {window_label}",
+    }
+    log_bus.log_message(
+        f"Glucose metrics over {accumulator.count} readings",
+        source="glucose_metrics.glucose_metrics",
+        action="glucose_metrics",
+        path=file_path,
+        readings=accumulator.count,
+    )
+    return result
+
+
+def _iter_chunks(file_path: str, glucose_column: str, time_column: Optional[str], chunk_rows: int):
+    """Yield (glucose values, unix seconds or None, offset of the chunk) read column-wise from a data file."""
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    from agent_tools.columnar_cache import open_table_dataset
+
+    path = Path(validate_path_security(file_path, get_data_dir()))
+    if not path.is_file():
+        raise FileNotFoundError(f"File not found: {file_path}")
+    dataset = open_table_dataset(path)
+    columns = [glucose_column] + ([time_column] if time_column else [])
+    missing = [c for c in columns if c not in dataset.schema.names]
+    if missing:
+        raise ValueError(f"Unknown columns {missing}, available columns: {dataset.schema.names}")
+
+    offset = 0
+    for batch in dataset.to_batches(columns=columns, batch_size=chunk_rows):
+        if batch.num_rows == 0:
+            continue
+        glucose = batch.column(0)
+        if not pa.types.is_floating(glucose.type):
+            glucose = pc.cast(glucose, pa.float64())
+        values = glucose.to_numpy(zero_copy_only=False)
+        times = None
+        if time_column:
+            column = batch.column(1)
+            if pa.types.is_string(column.type) or pa.types.is_large_string(column.type):
+                column = pc.cast(column, pa.timestamp("ns"))
+            if pa.types.is_timestamp(column.type) or pa.types.is_date(column.type):
+                # sub-second readings are floored to the second (safe=False truncates instead of raising)
+                column = pc.cast(pc.cast(column, pa.timestamp("s"), safe=False), pa.int64())
+            times = column.to_numpy(zero_copy_only=False).astype(np.int64)
+        yield values, times, offset
+        offset += batch.num_rows
@@ -0,0 +1,253 @@
+import atexit
+import json
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from just_agents.just_bus import JustLogBus
+
+from agent_tools.tools_config import get_log_dir, get_tools_config
+
+DROP_POLICIES = ["drop_oldest", "drop_newest", "block"]
+
+# Log sources of the agent_tools modules, as published with JustLogBus.log_message(source=...)
+DEFAULT_PREFIXES = ["data_tools.*", "rag_tools.*", "glucose_metrics.*", "chat_naming.*", "admission.*", "prewarm.*", "columnar_cache.*"]
+
+
+def rotate_file(path: str, incoming: int, max_bytes: int, backups: int) -> None:
+    """Rename path to path.1 (shifting older backups) if `incoming` more bytes would exceed max_bytes."""
+    try:
+        size = os.path.getsize(path)
+    except FileNotFoundError:
+        return
+    if size + incoming <= max_bytes:
+        return
+    for i in range(backups - 1, 0, -1):
+        if os.path.exists(f"{path}.{i}"):
+            os.replace(f"{path}.{i}", f"{path}.{i + 1}")
+    if backups > 0:
+        os.replace(path, f"{path}.1")
+    else:
+        os.remove(path)
+
+
+class LogSink:
+    """Non-blocking JSON-lines sink for JustLogBus events of the tools layer.
+
+    The bus callback only samples the event and appends a tuple to a bounded deque. A background
+    thread drains it in batches, serializes the events and writes each batch with one write call.
+    When the buffer is full, `drop_oldest` overwrites the oldest events like a ring buffer,
+    `drop_newest` discards the new event, and `block` waits up to block_ms for room.
+
+    The deque itself is lock-free (append and popleft are atomic), but the sampling state and the
+    counters are read-modify-write updates that would lose increments between threads, so producers
+    take a short lock around them. It is held only for these in-memory updates, never across I/O
+    or while waiting for room.
+
+    Repetitive events (same source and action) are sampled: the first `sample_burst` in each
+    `sample_window` seconds are kept, then one in `sample_every`. The next kept event of that kind
+    carries the number of events skipped in `sampled_out`.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        capacity: int = 65536,
+        batch_size: int = 1024,
+        flush_interval: float = 0.5,
+        drop_policy: str = "drop_oldest",
+        block_ms: float = 5.0,
+        sample_burst: int = 50,
+        sample_window: float = 1.0,
+        sample_every: int = 100,
+        max_bytes: int = 100 * 1024 ** 2,
+        backups: int = 3
+    ):
+        if drop_policy not in DROP_POLICIES:
+            raise ValueError(f"Unknown drop policy {drop_policy}, expected one of {DROP_POLICIES}")
+        self.path = path
+        self.capacity = capacity
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.drop_policy = drop_policy
+        self.block_ms = block_ms
+        self.sample_burst = sample_burst
+        self.sample_window = sample_window
+        self.sample_every = sample_every
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self._buffer: Deque[Tuple[float, str, Dict[str, Any]]] = deque(maxlen=capacity if drop_policy == "drop_oldest" else None)
+        # per (source, action): window start, events in window, events sampled out since the last kept one
+        self._samples: Dict[Tuple[str, Any], List[Any]] = {}
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+        self._write_lock = threading.Lock()
+        # guards the sampling state and the counters below, held only for in-memory updates
+        self._count_lock = threading.Lock()
+        self.enqueued = 0
+        self.dropped = 0
+        self.sampled_out = 0
+        self.written = 0
+        self.batches = 0
+        self.write_errors = 0
+        self.max_batch_ms = 0.0
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._thread = threading.Thread(target=self._run, name="log_sink", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def handle(self, event_name: str, *args: Any, **kwargs: Any) -> None:
+        """JustLogBus subscriber: sample and enqueue, never waits on I/O."""
+        now = time.time()
+        key = (event_name, kwargs.get("action"))
+        with self._count_lock:
+            state = self._samples.get(key)
+            if state is None:
+                state = self._samples[key] = [now, 0, 0]
+            if now - state[0] >= self.sample_window:
+                state[0], state[1] = now, 0
+            state[1] += 1
+            if state[1] > self.sample_burst and (state[1] - self.sample_burst) % self.sample_every:
+                state[2] += 1
+                self.sampled_out += 1
+                return
+            if state[2]:
+                kwargs["sampled_out"], state[2] = state[2], 0
+
+        buffer = self._buffer
+        if self.drop_policy != "drop_oldest" and len(buffer) >= self.capacity:
+            if self.drop_policy == "drop_newest" or not self._wait_for_room():
+                with self._count_lock:
+                    self.dropped += 1
+                return
+        dropped = self.drop_policy == "drop_oldest" and len(buffer) >= self.capacity  # the append overwrites the oldest event
+        buffer.append((now, event_name, kwargs))
+        with self._count_lock:
+            self.enqueued += 1
+            self.dropped += dropped
+        if len(buffer) >= self.batch_size and not self._wakeup.is_set():
+            self._wakeup.set()
+
+    def _wait_for_room(self) -> bool:
+        self._wakeup.set()
+        deadline = time.monotonic() + self.block_ms / 1000
+        while len(self._buffer) >= self.capacity:
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(0.0005)
+        return True
+
+    def _run(self) -> None:
+        while not self._stopped.is_set():
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            self.flush()
+
+    def flush(self) -> int:
+        """Write everything buffered so far, batch by batch. Returns the number of events written."""
+        written = 0
+        with self._write_lock:
+            while self._buffer:
+                batch = []
+                try:
+                    for _ in range(self.batch_size):
+                        batch.append(self._buffer.popleft())
+                except IndexError:
+                    pass
+                written += self._write(batch)
+        return written
+
+    def _write(self, batch: List[Tuple[float, str, Dict[str, Any]]]) -> int:
+        start = time.perf_counter()
+        lines = []
+        for timestamp, source, fields in batch:
+            message = fields.pop("log_message", None)
+            record = {"ts": round(timestamp, 6), "source": source, "message": message, **fields}
+            lines.append(json.dumps(record, default=str, ensure_ascii=False))
+        data = ("\n".join(lines) + "\n").encode("utf-8")
+        try:
+            self._rotate(len(data))
+            with open(self.path, "ab") as f:
+                f.write(data)
+        except OSError:
+            self.write_errors += 1
+            return 0
+        self.written += len(batch)
+        self.batches += 1
+        self.max_batch_ms = max(self.max_batch_ms, (time.perf_counter() - start) * 1000)
+        return len(batch)
+
+    def _rotate(self, incoming: int) -> None:
+        rotate_file(self.path, incoming, self.max_bytes, self.backups)
+
+    def close(self) -> None:
+        self._stopped.set()
+        self._wakeup.set()
+        self._thread.join(timeout=5.0)
+        self.flush()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._count_lock:
+            enqueued, dropped, sampled_out = self.enqueued, self.dropped, self.sampled_out
+        return {
+            "path": self.path,
+            "enqueued": enqueued,
+            "written": self.written,
+            "dropped": dropped,
+            "sampled_out": sampled_out,
+            "queued": len(self._buffer),
+            "capacity": self.capacity,
+            "drop_policy": self.drop_policy,
+            "batches": self.batches,
+            "max_batch_ms": round(self.max_batch_ms, 3),
+            "write_errors": self.write_errors,
+        }
+
+
+_sink: Optional[LogSink] = None
+_sink_lock = threading.Lock()
+
+
+def get_log_sink() -> Optional[LogSink]:
+    """Process-wide sink configured from `tools_config.log_sink` and subscribed to the tools' log sources.
+
+    Returns None if the sink is disabled (tool events then stay in the JustLogBus buffer as before).
+    """
+    global _sink
+    if _sink is None:
+        with _sink_lock:
+            if _sink is None:
+                config = get_tools_config("log_sink")
+                if not config.get("enabled", True):
+                    return None
+                sink = LogSink(
+                    path=config.get("path") or os.path.join(get_log_dir(), "agent_tools.jsonl"),
+                    capacity=int(config.get("capacity", 65536)),
+                    batch_size=int(config.get("batch_size", 1024)),
+                    flush_interval=float(config.get("flush_interval", 0.5)),
+                    drop_policy=config.get("drop_policy", "drop_oldest"),
+                    block_ms=float(config.get("block_ms", 5.0)),
+                    sample_burst=int(config.get("sample_burst", 50)),
+                    sample_window=float(config.get("sample_window", 1.0)),
+                    sample_every=int(config.get("sample_every", 100)),
+                    max_bytes=int(float(config.get("max_mb", 100)) * 1024 ** 2),
+                    backups=int(config.get("backups", 3)),
+                )
+                for prefix in config.get("prefixes") or DEFAULT_PREFIXES:
+                    JustLogBus().subscribe(prefix, sink.handle)
+                _sink = sink
+    return _sink
+
+
+def log_sink_stats() -> Dict[str, Any]:
+    """Report tool log sink metrics (events enqueued, written, dropped and sampled out, batches).
+
+    Returns:
+        Dict[str, Any]: Sink statistics, or {"enabled": False} if the sink is disabled
+    """
+    sink = get_log_sink()
+    if sink is None:
+        return {"enabled": False}
+    return {"enabled": True, **sink.stats()}
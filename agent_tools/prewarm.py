@@ -0,0 +1,156 @@
+import importlib
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from just_agents.just_bus import JustLogBus
+
+from agent_tools.log_sink import get_log_sink
+from agent_tools.tools_config import get_agent_profiles, get_tmp_dir, get_tools_config
+
+
+# Initialize the singleton logger
+log_bus = JustLogBus()
+get_log_sink()
+
+READY_FILE_PREFIX = ".agents_warm"
+# set by the docker-compose command of the agent server, so scripts importing agent_tools neither prewarm nor write ready files
+SERVER_WORKER_ENV = "AGENT_SERVER_WORKER"
+
+_started = False
+_started_lock = threading.Lock()
+
+
+def resolve(qualname: str) -> Any:
+    """Import `package.module.attr` (the last segment is the attribute)."""
+    module_name, _, attr = qualname.rpartition(".")
+    return getattr(importlib.import_module(module_name), attr)
+
+
+def timed(fn, *args, **kwargs) -> tuple:
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, (time.perf_counter() - start) * 1000
+
+
+def prewarm_profile(name: str, profile: Dict[str, Any], run_prompt_tools: bool = True) -> Dict[str, Any]:
+    """Import everything a profile references and call its prompt tools once."""
+    report: Dict[str, Any] = {"profile": name, "steps": [], "errors": []}
+    steps: List[Dict[str, Any]] = report["steps"]
+
+    def step(kind: str, target: str, fn, *args, **kwargs) -> Optional[Any]:
+        try:
+            result, elapsed_ms = timed(fn, *args, **kwargs)
+            steps.append({"kind": kind, "target": target, "ms": round(elapsed_ms, 2)})
+            return result
+        except Exception as e:
+            steps.append({"kind": kind, "target": target, "ms": None, "error": f"{type(e).__name__}: {e}"})
+            report["errors"].append(f"{kind} {target}: {type(e).__name__}: {e}")
+            return None
+
+    if profile.get("class_qualname"):
+        step("class", profile["class_qualname"], resolve, profile["class_qualname"])
+
+    for tool in profile.get("tools") or []:
+        if isinstance(tool, dict) and tool.get("package") and tool.get("function"):
+            target = f"{tool['package']}.{tool['function']}"
+            step("tool", target, resolve, target)
+
+    for tool in profile.get("prompt_tools") or []:
+        if not (isinstance(tool, dict) and tool.get("package") and tool.get("function")):
+            continue
+        target = f"{tool['package']}.{tool['function']}"
+        fn = step("prompt_tool_import", target, resolve, target)
+        if fn is not None and run_prompt_tools:
+            result = step("prompt_tool_call", target, fn, **(tool.get("call_arguments") or {}))
+            if result is not None:
+                steps[-1]["result_chars"] = len(json.dumps(result, default=str))
+
+    report["total_ms"] = round(sum(s["ms"] for s in steps if s["ms"] is not None), 2)
+    report["ok"] = not report["errors"]
+    return report
+
+
+def prewarm_worker() -> Dict[str, Any]:
+    """Warm this server worker: profile imports, one call of every prompt tool and the search cache.
+
+    The search cache is warmed with rag_tools.prewarm_search_cache when tools_config.search_cache.prewarm
+    lists targets (unless tools_config.prewarm.search_cache is false); its errors are reported but do not
+    block readiness. Writes $TMP_DIR/prewarm_report.<pid>.json and, unless a profile failed with AGENT_FAILFAST,
+    the ready file $TMP_DIR/.agents_warm.<pid> that the container healthcheck counts.
+
+    Returns:
+        Dict[str, Any]: Per-profile reports and the total time
+    """
+    config = get_tools_config("prewarm")
+    start = time.perf_counter()
+    reports = [
+        prewarm_profile(name, profile or {}, config.get("prompt_tools", True))
+        for name, profile in get_agent_profiles().items()
+    ]
+    search_cache: Optional[Dict[str, Any]] = None
+    if config.get("search_cache", True) and get_tools_config("search_cache").get("prewarm"):
+        try:
+            result, elapsed_ms = timed(resolve("agent_tools.rag_tools.prewarm_search_cache"))
+            search_cache = {"ms": round(elapsed_ms, 2), "profiles": result}
+        except Exception as e:
+            search_cache = {"ms": None, "error": f"{type(e).__name__}: {e}"}
+    total_ms = round((time.perf_counter() - start) * 1000, 2)
+    failed = [r["profile"] for r in reports if r.get("ok") is False]
+
+    pid = os.getpid()
+    tmp_dir = get_tmp_dir()
+    os.makedirs(tmp_dir, exist_ok=True)
+    with open(os.path.join(tmp_dir, f"prewarm_report.{pid}.json"), "w", encoding="utf-8") as f:
+        json.dump({"pid": pid, "total_ms": total_ms, "profiles": reports, "search_cache": search_cache}, f, indent=2, default=str)
+    failfast = os.getenv("AGENT_FAILFAST", "true").lower() == "true"
+    if not (failed and failfast):
+        write_ready_file()
+
+    log_bus.log_message(
+        f"Prewarmed worker {pid} in {total_ms:.0f} ms" + (f", failed: {', '.join(failed)}" if failed else ""),
+        source="prewarm.prewarm_worker",
+        action="prewarm",
+        pid=pid,
+        total_ms=total_ms,
+        failed=failed,
+        ready=not (failed and failfast),
+    )
+    return {"total_ms": total_ms, "failed": failed, "profiles": reports, "search_cache": search_cache}
+
+
+def write_ready_file() -> str:
+    """Write $TMP_DIR/.agents_warm.<pid>, the file the container healthcheck counts per worker."""
+    tmp_dir = get_tmp_dir()
+    os.makedirs(tmp_dir, exist_ok=True)
+    path = os.path.join(tmp_dir, f"{READY_FILE_PREFIX}.{os.getpid()}")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(f"{time.time()}\n")
+    return path
+
+
+def start_worker_prewarm() -> bool:
+    """Start prewarm_worker in a background thread once per agent server worker.
+
+    Called when the worker first imports agent_tools (agent_tools/__init__.py) while loading the
+    profiles, so the imports, caches and prompt tool results end up in the process that serves
+    the requests. Only runs in processes started with AGENT_SERVER_WORKER=true. With
+    tools_config.prewarm disabled, the ready file is written right away.
+
+    Returns:
+        bool: True if this call started the prewarm thread
+    """
+    global _started
+    if _started or os.getenv(SERVER_WORKER_ENV, "false").lower() != "true":
+        return False
+    with _started_lock:
+        if _started:
+            return False
+        _started = True
+    if not get_tools_config("prewarm").get("enabled", False):
+        write_ready_file()
+        return False
+    threading.Thread(target=prewarm_worker, name="prewarm_worker", daemon=True).start()
+    return True
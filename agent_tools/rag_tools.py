@@ -0,0 +1,197 @@
+import os
+from typing import Any, Dict, List, Optional
+
+from just_agents.just_bus import JustLogBus
+from just_semantic_search.meili.rag import EmbeddingModel, MeiliRAG
+from just_semantic_search.remote.jina import jina_embed_query
+
+from agent_tools.embedding_cache import get_embedding_cache
+from agent_tools.log_sink import get_log_sink
+from agent_tools.search_cache import get_search_cache
+from agent_tools.tools_config import get_agent_profiles, get_tools_config
+from agent_tools.tracing import span
+
+
+# Initialize the singleton logger
+log_bus = JustLogBus()
+get_log_sink()
+
+
+def _get_rag(index: str) -> MeiliRAG:
+    """Get the shared MeiliRAG instance for an index, configured like just_semantic_search tools."""
+    return MeiliRAG.get_instance(
+        host=os.getenv("MEILISEARCH_HOST", "127.0.0.1"),
+        port=os.getenv("MEILISEARCH_PORT", 7700),
+        api_key=os.getenv("MEILISEARCH_API_KEY", "fancy_master_key"),
+        index_name=index,
+        model=EmbeddingModel(os.getenv("EMBEDDING_MODEL", EmbeddingModel.JINA_EMBEDDINGS_V3.value)),
+    )
+
+
+def _embed_query(rag: MeiliRAG, query: str, remote_embedding: bool) -> List[float]:
+    """Embed a search query, going through the query embedding cache when it is enabled."""
+    if remote_embedding:
+        model_key = f"remote/{rag.model_name}"
+        embed = jina_embed_query
+    else:
+        model_key = f"local/{rag.model.value}"
+        embed = lambda q: rag.sentence_transformer.encode(q, **rag.embedding_model_params.retrival_query).tolist()
+
+    def compute(q: str) -> List[float]:
+        with span("embedding", model=model_key):
+            return embed(q)
+
+    cache = get_embedding_cache()
+    if cache is None:
+        return compute(query)
+    return cache.get_or_compute(query, model_key, compute)
+
+
+def _index_version(rag: MeiliRAG, index: str) -> Optional[int]:
+    """Uid of the last succeeded task of an index, changes whenever documents or settings change."""
+    with span("meilisearch", index=index, operation="tasks"):
+        tasks = rag.client.get_tasks(index_ids=[index], statuses="succeeded", limit=1)
+    return tasks.results[0].uid if tasks.results else None
+
+
+def _format_hits(hits: List[Dict[str, Any]]) -> List[str]:
+    """Render search hits the same way just_semantic_search search_documents does."""
+    result = []
+    for h in hits:
+        doc_info = h["text"]
+        if "title" in h:
+            doc_info = f"Title: {h['title']}\n{doc_info}"
+        if "fragment_num" in h and "total_fragments" in h:
+            doc_info += f"\nFragment: {h['fragment_num']} out of {h['total_fragments']}"
+        if "token_count" in h:
+            doc_info += f"\nToken count: {h['token_count']}"
+        doc_info += f"\nSOURCE: {h['source']}"
+        result.append(doc_info)
+    return result
+
+
+def search_documents(query: str, index: str, limit: Optional[int] = 8, semantic_ratio: Optional[float] = 0.5, debug: bool = True, remote_embedding: bool = False) -> list[str]:
+    """
+    Search documents in MeiliSearch database.
+
+    Args:
+        query (str): The search query string used to find relevant documents.
+        index (str): The name of the index to search within.
+                    It should be one of the allowed list of indexes.
+        limit (int): The number of documents to return. 8 by default.
+        semantic_ratio (float): The ratio of semantic search. 0.5 by default.
+        debug (bool): If True, print debug information. True by default.
+        remote_embedding (bool): If True and JINA_API_KEY is set, the embedding is done remotely.
+    Returns:
+        list[str]: A list of strings containing the document text followed by the source.
+        Each string contains the document content and its source separated by '\n SOURCE: '.
+
+    Example:
+        Example result:
+        [
+            "Ageing as a risk factor...\n SOURCE: /path/to/document.txt",
+            "Another document content...\n SOURCE: /path/to/another/document.txt"
+        ]
+    """
+    if semantic_ratio is None:
+        semantic_ratio = float(os.getenv("MEILISEARCH_SEMANTIC_RATIO", 0.5))
+    remote_embedding = bool(remote_embedding and os.getenv("JINA_API_KEY", None))
+    rag = _get_rag(index)
+    cached = [True]
+
+    def search() -> List[str]:
+        cached[0] = False
+        vector = _embed_query(rag, query, remote_embedding) if semantic_ratio > 0.0 else None
+        with span("meilisearch", index=index, operation="search", limit=limit, semantic_ratio=semantic_ratio):
+            hits = rag.search(query, vector=vector, limit=limit, semanticRatio=semantic_ratio).hits
+        return _format_hits(hits)
+
+    cache = get_search_cache()
+    if cache is None:
+        result = search()
+    else:
+        result = cache.get_or_search(index, query, limit, semantic_ratio, search, lambda i: _index_version(rag, i))
+
+    if debug:
+        log_bus.log_message(
+            f"Search in {index} returned {len(result)} hits",
+            source="rag_tools.search_documents",
+            action="search_documents",
+            query=query,
+            index=index,
+            limit=limit,
+            semantic_ratio=semantic_ratio,
+            remote_embedding=remote_embedding,
+            result_cache_hit=cached[0],
+        )
+    return result
+
+
+def embedding_cache_stats() -> Dict[str, Any]:
+    """Report query embedding cache metrics (lookups, memory/disk hits, misses, hit rate).
+
+    Returns:
+        Dict[str, Any]: Cache statistics, or {"enabled": False} if the cache is disabled
+    """
+    cache = get_embedding_cache()
+    if cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **cache.stats()}
+
+
+def search_cache_stats() -> Dict[str, Any]:
+    """Report search result cache metrics (hits, misses, invalidations, hit rate, index versions).
+
+    Returns:
+        Dict[str, Any]: Cache statistics, or {"enabled": False} if the cache is disabled
+    """
+    cache = get_search_cache()
+    if cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **cache.stats()}
+
+
+def prewarm_search_cache() -> Dict[str, Any]:
+    """Run the `examples` prompts of configured profiles as searches to fill the caches.
+
+    Targets come from `tools_config.search_cache.prewarm`, a list of
+    {profile, index, limit, semantic_ratio, remote_embedding} entries.
+
+    Returns:
+        Dict[str, Any]: Number of prewarmed queries and errors per profile
+    """
+    if get_search_cache() is None:
+        return {"enabled": False}
+    profiles = get_agent_profiles()
+    report: Dict[str, Any] = {}
+    for target in get_tools_config("search_cache").get("prewarm") or []:
+        profile = target.get("profile")
+        examples = (profiles.get(profile) or {}).get("examples") or []
+        done, errors = 0, []
+        for example in examples:
+            prompt = example.get("prompt") if isinstance(example, dict) else None
+            if not prompt:
+                continue
+            try:
+                search_documents(
+                    prompt.strip(),
+                    target["index"],
+                    limit=target.get("limit", 8),
+                    semantic_ratio=target.get("semantic_ratio", 0.5),
+                    debug=False,
+                    remote_embedding=target.get("remote_embedding", False),
+                )
+                done += 1
+            except Exception as e:
+                errors.append(str(e))
+        report[profile] = {"index": target.get("index"), "queries": done, "errors": errors}
+        log_bus.log_message(
+            f"Prewarmed search cache for {profile} with {done} queries",
+            source="rag_tools.prewarm_search_cache",
+            action="prewarm",
+            profile=profile,
+            index=target.get("index"),
+            queries=done,
+            errors=errors,
+        )
+    return report
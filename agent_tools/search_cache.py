@@ -0,0 +1,126 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+from agent_tools.embedding_cache import normalize_query
+from agent_tools.tool_cache import ToolResultCache, get_tool_cache, tool_cache_ttl
+from agent_tools.tools_config import get_tools_config
+
+
+class SearchResultCache:
+    """LRU cache of search results invalidated by index version.
+
+    Every entry remembers the version of its index (the uid of the last succeeded update task)
+    at the time it was stored. The current version is looked up at most once per
+    `version_check_interval` seconds per index, so a cache hit costs no Meilisearch call
+    within that window and entries for an updated index are dropped on the next check.
+
+    With a `shared` ToolResultCache, results missing from this worker's LRU are looked up in the
+    "search" namespace that all workers share (keyed by the index version as well) before searching.
+    """
+
+    def __init__(self, max_entries: int = 1024, version_check_interval: float = 5.0, shared: Optional[ToolResultCache] = None):
+        self.max_entries = max_entries
+        self.version_check_interval = version_check_interval
+        self.shared = shared
+        self._entries: "OrderedDict[Hashable, Tuple[Any, Any]]" = OrderedDict()
+        self._versions: Dict[str, Tuple[Any, float]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.shared_hits = 0
+
+    @staticmethod
+    def make_key(index: str, query: str, limit: Optional[int], semantic_ratio: Optional[float]) -> Hashable:
+        return index, normalize_query(query), limit, None if semantic_ratio is None else float(semantic_ratio)
+
+    def index_version(self, index: str, fetch_version: Callable[[str], Any]) -> Any:
+        """Current version of an index, refreshed at most every version_check_interval seconds."""
+        now = time.monotonic()
+        with self._lock:
+            cached = self._versions.get(index)
+            if cached is not None and now - cached[1] < self.version_check_interval:
+                return cached[0]
+        version = fetch_version(index)
+        with self._lock:
+            self._versions[index] = (version, now)
+        return version
+
+    def get_or_search(
+        self,
+        index: str,
+        query: str,
+        limit: Optional[int],
+        semantic_ratio: Optional[float],
+        search: Callable[[], List[str]],
+        fetch_version: Callable[[str], Any]
+    ) -> List[str]:
+        """Return cached results for the current index version or run the search and store it."""
+        key = self.make_key(index, query, limit, semantic_ratio)
+        version = self.index_version(index, fetch_version)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] == version:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return list(entry[1])
+                del self._entries[key]
+                self.invalidations += 1
+        hit = False
+        if self.shared is not None:
+            hit, results = self.shared.get("search", [version, *key])
+        if not hit:
+            results = search()
+            if self.shared is not None:
+                self.shared.put("search", [version, *key], results, tool_cache_ttl("search"))
+        with self._lock:
+            if hit:
+                self.shared_hits += 1
+            else:
+                self.misses += 1
+            self._entries[key] = (version, list(results))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return results
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.shared_hits + self.misses
+            return {
+                "lookups": lookups,
+                "hits": self.hits,
+                "shared_hits": self.shared_hits,
+                "misses": self.misses,
+                "invalidations": self.invalidations,
+                "hit_rate": (self.hits + self.shared_hits) / lookups if lookups else 0.0,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "index_versions": {index: version for index, (version, _) in self._versions.items()},
+            }
+
+
+_cache: Optional[SearchResultCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_search_cache() -> Optional[SearchResultCache]:
+    """Process-wide cache configured from `tools_config.search_cache`, or None if disabled."""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                config = get_tools_config("search_cache")
+                if not config.get("enabled", True):
+                    return None
+                # a per-worker tool cache would only duplicate this LRU, share results through the others
+                tool_cache = get_tool_cache() if config.get("shared", True) else None
+                _cache = SearchResultCache(
+                    max_entries=int(config.get("max_entries", 1024)),
+                    version_check_interval=float(config.get("version_check_interval", 5.0)),
+                    shared=tool_cache if tool_cache is not None and tool_cache.backend.name != "memory" else None,
+                )
+    return _cache
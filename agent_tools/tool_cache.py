@@ -0,0 +1,328 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from agent_tools.tools_config import get_tmp_dir, get_tools_config
+
+
+class MemoryCacheBackend:
+    """Per-process LRU store, the fastest backend when the agent server runs a single worker."""
+
+    name = "memory"
+
+    def __init__(self, max_entries: int = 10000, max_bytes: int = 256 * 1024 ** 2):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, Tuple[str, Optional[float]]]" = OrderedDict()
+        self._counters: Dict[str, int] = {}
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[1] is not None and entry[1] < time.time():
+                self._drop(key)
+                return None
+            self._entries.move_to_end(key)
+            return entry[0]
+
+    def set(self, key: str, value: str, ttl: Optional[float] = None) -> None:
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = (value, time.time() + ttl if ttl else None)
+            self._bytes += len(value)
+            while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+                self._drop(next(iter(self._entries)))
+
+    def _drop(self, key: str) -> None:
+        value, _ = self._entries.pop(key)
+        self._bytes -= len(value)
+
+    def counter(self, key: str) -> int:
+        with self._lock:
+            return self._counters.get(key, 0)
+
+    def increment(self, key: str) -> int:
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + 1
+            return self._counters[key]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"entries": len(self._entries), "bytes": self._bytes, "max_bytes": self.max_bytes}
+
+
+class SqliteCacheBackend:
+    """Store shared by the worker processes of one host: a memory-mapped sqlite file in WAL mode.
+
+    Readers map the database pages (`mmap_size`) and coordinate through the WAL shared-memory index,
+    so a hit costs no copy through the kernel and no IPC. Put the file on /dev/shm for a purely
+    in-memory store. Expired and oldest entries are evicted once the store exceeds max_bytes.
+    """
+
+    name = "shared"
+
+    def __init__(self, path: str, max_entries: int = 10000, max_bytes: int = 256 * 1024 ** 2):
+        self.path = path
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._writes = 0
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=5.0, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=OFF")  # a cache can lose its last writes on power loss
+        self._conn.execute(f"PRAGMA mmap_size={max(max_bytes * 2, 64 * 1024 ** 2)}")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS entries (key TEXT PRIMARY KEY, value TEXT, expires REAL, created REAL)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS entries_created ON entries (created)")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS counters (key TEXT PRIMARY KEY, value INTEGER)")
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute("SELECT value, expires FROM entries WHERE key = ?", (key,)).fetchone()
+        if row is None or (row[1] is not None and row[1] < time.time()):
+            return None
+        return row[0]
+
+    def set(self, key: str, value: str, ttl: Optional[float] = None) -> None:
+        now = time.time()
+        with self._lock:
+            self._conn.execute("INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?)",
+                               (key, value, now + ttl if ttl else None, now))
+            self._writes += 1
+            if self._writes % 100 == 0:
+                self._evict(now)
+
+    def _evict(self, now: float) -> None:
+        self._conn.execute("DELETE FROM entries WHERE expires IS NOT NULL AND expires < ?", (now,))
+        count, size = self._conn.execute("SELECT count(*), coalesce(sum(length(value)), 0) FROM entries").fetchone()
+        while count > self.max_entries or size > self.max_bytes:
+            # drop the oldest entries, at least a quarter at a time so eviction stays rare
+            self._conn.execute("DELETE FROM entries WHERE key IN (SELECT key FROM entries ORDER BY created LIMIT ?)",
+                               (max(count - self.max_entries, count // 4, 1),))
+            count, size = self._conn.execute("SELECT count(*), coalesce(sum(length(value)), 0) FROM entries").fetchone()
+
+    def counter(self, key: str) -> int:
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM counters WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else 0
+
+    def increment(self, key: str) -> int:
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.execute(
+                    "INSERT INTO counters VALUES (?, 1) ON CONFLICT(key) DO UPDATE SET value = value + 1", (key,))
+                value = self._conn.execute("SELECT value FROM counters WHERE key = ?", (key,)).fetchone()[0]
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return value
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            count, size = self._conn.execute("SELECT count(*), coalesce(sum(length(value)), 0) FROM entries").fetchone()
+        return {"entries": count, "bytes": size, "max_bytes": self.max_bytes, "path": self.path}
+
+
+class RedisCacheBackend:
+    """Store shared by all workers and hosts through any Redis-protocol server.
+
+    Entries expire through Redis TTLs (and its maxmemory policy), keys are namespaced with `prefix`
+    so the server can be shared with the LiteLLM proxy cache.
+    """
+
+    name = "redis"
+
+    def __init__(self, url: str, prefix: str = "just-chat-tools:"):
+        import redis  # optional dependency, only needed for this backend
+
+        self.url = url
+        self.prefix = prefix
+        self._client = redis.Redis.from_url(url, socket_timeout=1.0, socket_connect_timeout=1.0)
+
+    def get(self, key: str) -> Optional[str]:
+        value = self._client.get(self.prefix + key)
+        return value.decode("utf-8") if value is not None else None
+
+    def set(self, key: str, value: str, ttl: Optional[float] = None) -> None:
+        self._client.set(self.prefix + key, value, px=int(ttl * 1000) if ttl else None)
+
+    def counter(self, key: str) -> int:
+        value = self._client.get(self.prefix + key)
+        return int(value) if value is not None else 0
+
+    def increment(self, key: str) -> int:
+        return int(self._client.incr(self.prefix + key))
+
+    def stats(self) -> Dict[str, Any]:
+        return {"url": self.url.split("@")[-1], "prefix": self.prefix}
+
+
+class ToolResultCache:
+    """Cache of tool results (JSON values) on a pluggable backend, with namespace invalidation.
+
+    Keys carry the generation counter of their namespace, which is kept in the backend itself:
+    `invalidate(namespace)` increments it, so every worker using the same backend stops seeing the
+    old entries at once and they simply age out. Backend errors never fail a tool call, the result
+    is then computed without the cache.
+    """
+
+    def __init__(self, backend: Any, ttl: Optional[float] = 300.0, max_value_bytes: int = 1024 ** 2):
+        self.backend = backend
+        self.ttl = ttl
+        self.max_value_bytes = max_value_bytes
+        self._lock = threading.Lock()
+        self._namespaces: Dict[str, Dict[str, int]] = {}
+        self.errors = 0
+
+    def _count(self, namespace: str, event: str) -> None:
+        with self._lock:
+            counters = self._namespaces.setdefault(namespace, {"hits": 0, "misses": 0, "invalidations": 0})
+            counters[event] += 1
+
+    def make_key(self, namespace: str, parts: Any) -> str:
+        generation = self.backend.counter(f"generation:{namespace}")
+        digest = hashlib.sha256(json.dumps(parts, sort_keys=True, default=str).encode("utf-8")).hexdigest()[:32]
+        return f"{namespace}:{generation}:{digest}"
+
+    def get(self, namespace: str, parts: Any) -> Tuple[bool, Any]:
+        """(True, value) on a hit, (False, None) on a miss or backend error."""
+        try:
+            raw = self.backend.get(self.make_key(namespace, parts))
+        except Exception:
+            with self._lock:
+                self.errors += 1
+            return False, None
+        self._count(namespace, "hits" if raw is not None else "misses")
+        return (True, json.loads(raw)) if raw is not None else (False, None)
+
+    def put(self, namespace: str, parts: Any, value: Any, ttl: Optional[float] = None) -> None:
+        try:
+            raw = json.dumps(value)
+        except (TypeError, ValueError):
+            return  # not a JSON value, not cached
+        if len(raw) > self.max_value_bytes:
+            return
+        try:
+            self.backend.set(self.make_key(namespace, parts), raw, ttl if ttl is not None else self.ttl)
+        except Exception:
+            with self._lock:
+                self.errors += 1
+
+    def get_or_compute(self, namespace: str, parts: Any, compute: Callable[[], Any], ttl: Optional[float] = None) -> Any:
+        """Return the cached value for (namespace, parts) or compute, store and return it."""
+        hit, value = self.get(namespace, parts)
+        if hit:
+            return value
+        value = compute()
+        self.put(namespace, parts, value, ttl)
+        return value
+
+    def invalidate(self, namespace: str) -> int:
+        """Drop all entries of a namespace for every worker sharing the backend, returns the new generation."""
+        generation = self.backend.increment(f"generation:{namespace}")
+        self._count(namespace, "invalidations")
+        return generation
+
+    def stats(self) -> Dict[str, Any]:
+        try:
+            backend_stats = self.backend.stats()
+        except Exception as e:
+            backend_stats = {"error": str(e)}
+        with self._lock:
+            namespaces = {name: dict(counters) for name, counters in self._namespaces.items()}
+            hits = sum(c["hits"] for c in namespaces.values())
+            lookups = hits + sum(c["misses"] for c in namespaces.values())
+            return {
+                "backend": self.backend.name,
+                "lookups": lookups,
+                "hits": hits,
+                "hit_rate": hits / lookups if lookups else 0.0,
+                "errors": self.errors,
+                "namespaces": namespaces,
+                **backend_stats,
+            }
+
+
+_cache: Optional[ToolResultCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_tool_cache() -> Optional[ToolResultCache]:
+    """Process-wide cache configured from `tools_config.tool_cache`, or None if disabled."""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                config = get_tools_config("tool_cache")
+                if not config.get("enabled", True):
+                    return None
+                backend_name = config.get("backend", "memory")
+                max_entries = int(config.get("max_entries", 10000))
+                max_bytes = int(float(config.get("max_mb", 256)) * 1024 ** 2)
+                if backend_name == "memory":
+                    backend = MemoryCacheBackend(max_entries=max_entries, max_bytes=max_bytes)
+                elif backend_name == "shared":
+                    backend = SqliteCacheBackend(
+                        path=config.get("path") or os.path.join(get_tmp_dir(), "tool_cache.sqlite"),
+                        max_entries=max_entries,
+                        max_bytes=max_bytes,
+                    )
+                elif backend_name == "redis":
+                    backend = RedisCacheBackend(
+                        url=config.get("redis_url") or os.getenv("TOOL_CACHE_REDIS_URL", "redis://llm-cache:6379/1"),
+                        prefix=config.get("prefix", "just-chat-tools:"),
+                    )
+                else:
+                    raise ValueError(f"Unknown tool_cache backend {backend_name}, expected memory, shared or redis")
+                _cache = ToolResultCache(
+                    backend,
+                    ttl=float(config["ttl"]) if config.get("ttl") else None,
+                    max_value_bytes=int(float(config.get("max_value_kb", 1024)) * 1024),
+                )
+    return _cache
+
+
+def tool_cache_ttl(namespace: str) -> Optional[float]:
+    """Per-namespace TTL from `tools_config.tool_cache.ttls`, None to use the cache default."""
+    ttl = (get_tools_config("tool_cache").get("ttls") or {}).get(namespace)
+    return float(ttl) if ttl is not None else None
+
+
+def tool_cache_stats() -> Dict[str, Any]:
+    """Report shared tool cache metrics (backend, hits and misses per namespace, size).
+
+    Returns:
+        Dict[str, Any]: Cache statistics, or {"enabled": False} if the cache is disabled
+    """
+    cache = get_tool_cache()
+    if cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **cache.stats()}
+
+
+def invalidate_tool_cache(namespace: str) -> Dict[str, Any]:
+    """Drop cached tool results of a namespace ("files" or "search") for all agent workers.
+
+    Args:
+        namespace: Cache namespace to invalidate
+
+    Returns:
+        Dict[str, Any]: The namespace and its new generation, or {"enabled": False} if the cache is disabled
+    """
+    cache = get_tool_cache()
+    if cache is None:
+        return {"enabled": False}
+    return {"enabled": True, "namespace": namespace, "generation": cache.invalidate(namespace)}
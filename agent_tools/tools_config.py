@@ -0,0 +1,56 @@
+import os
+from functools import lru_cache
+from typing import Any, Dict
+
+import yaml
+
+
+def get_config_path() -> str:
+    """Path to the agent profiles YAML, the same file the agent server is started with."""
+    return os.getenv("AGENT_CONFIG_PATH", "/app/chat_agent_profiles.yaml")
+
+
+def get_tmp_dir() -> str:
+    """Resolved TMP_DIR of the agent container (relative values are resolved against APP_DIR)."""
+    return os.path.join(os.getenv("APP_DIR", "/app"), os.getenv("TMP_DIR", "tmp"))
+
+
+def get_log_dir() -> str:
+    """Resolved LOG_DIR of the agent container, /app/logs by default."""
+    return os.path.join(os.getenv("APP_DIR", "/app"), os.getenv("LOG_DIR", "logs"))
+
+
+def get_data_dir() -> str:
+    """Resolved DATA_DIR of the agent container, /app/data by default."""
+    return os.path.join(os.getenv("APP_DIR", "/app"), os.getenv("DATA_DIR", "data"))
+
+
+@lru_cache(maxsize=1)
+def _load_config(config_path: str) -> Dict[str, Any]:
+    if not os.path.exists(config_path):
+        return {}
+    with open(config_path, "r", encoding="utf-8") as f:
+        return yaml.safe_load(f) or {}
+
+
+def get_tools_config(section: str) -> Dict[str, Any]:
+    """Read a section of the top-level `tools_config` mapping of the agent profiles YAML.
+
+    Args:
+        section: Name of the section, e.g. "embedding_cache"
+
+    Returns:
+        Dict[str, Any]: Section settings, or an empty dict if the file or section is missing
+    """
+    tools_config = _load_config(get_config_path()).get("tools_config") or {}
+    return dict(tools_config.get(section) or {})
+
+
+def get_agent_profiles() -> Dict[str, Dict[str, Any]]:
+    """Agent profiles from the agent profiles YAML, keyed by profile name.
+
+    Returns:
+        Dict[str, Dict[str, Any]]: Raw profile mappings under AGENT_PARENT_SECTION ("agent_profiles" by default)
+    """
+    parent_section = os.getenv("AGENT_PARENT_SECTION", "agent_profiles") or "agent_profiles"
+    return dict(_load_config(get_config_path()).get(parent_section) or {})
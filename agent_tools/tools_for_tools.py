@@ -2,6 +2,11 @@ import os
 import sys
 import ast
 import json
+import time
+import shutil
+import hashlib
+import platform
+import subprocess
 import importlib.util
 import inspect
 
@@ -9,19 +14,136 @@ import inspect
 TOOLS_DIR = os.path.dirname(__file__)
 REQUIREMENTS_FILE = os.path.join(TOOLS_DIR, 'requirements.txt')
 
-def install_requirements():
+def requirements_hash(requirements_file=REQUIREMENTS_FILE):
     """
-    Install the requirements specified in the requirements.txt file.
-    This is a placeholder: you might call pip programmatically or ensure that
-    the container/virtual environment installs requirements on startup.
+    Hash of the requirements file content (ignoring comments and blank lines) together with the
+    Python version and platform, since built wheels are only valid for the interpreter that built them.
     """
-    if os.path.exists(REQUIREMENTS_FILE):
-        # For demonstration, we simply print the command.
-        # In a real environment, you might use subprocess to run:
-        # subprocess.run([sys.executable, "-m", "pip", "install", "-r", REQUIREMENTS_FILE])
-        print(f"Installing requirements from {REQUIREMENTS_FILE}...")
-    else:
+    with open(requirements_file, "r", encoding="utf-8") as f:
+        lines = [line.strip() for line in f if line.strip() and not line.strip().startswith("#")]
+    key = "\n".join(sorted(lines) + [f"python{sys.version_info[0]}.{sys.version_info[1]}", platform.machine(), sys.platform])
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()[:16]
+
+
+def requirements_satisfied(requirements_file=REQUIREMENTS_FILE):
+    """
+    Check without calling pip whether every requirement is already installed in a matching version.
+    Lines that can't be checked locally (pip options, URLs) count as not satisfied.
+    """
+    try:
+        from importlib.metadata import PackageNotFoundError, version
+        from packaging.requirements import InvalidRequirement, Requirement
+    except ImportError:
+        return False
+    with open(requirements_file, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.split("#", 1)[0].strip()
+            if not line:
+                continue
+            try:
+                requirement = Requirement(line)
+            except InvalidRequirement:
+                return False
+            if requirement.url:
+                return False
+            if requirement.marker is not None and not requirement.marker.evaluate():
+                continue
+            try:
+                installed = version(requirement.name)
+            except PackageNotFoundError:
+                return False
+            if not requirement.specifier.contains(installed, prereleases=True):
+                return False
+    return True
+
+
+def _pip(*args):
+    subprocess.run([sys.executable, "-m", "pip", *args, "--disable-pip-version-check"], check=True)
+
+
+def install_requirements(wheelhouse_dir=None, force=False, keep=3):
+    """
+    Install the requirements specified in the requirements.txt file, reusing a local wheelhouse.
+
+    Wheels for all requirements are built once into `<wheelhouse_dir>/<hash>`, where the hash covers
+    the requirements file and the interpreter (see requirements_hash). Later starts install from that
+    folder with `--no-index`, so pip neither resolves against nor downloads from the package index,
+    and starts where everything is already installed skip pip entirely. The cold install time is
+    kept next to the wheels to report the startup time saved.
+
+    Parameters:
+      - wheelhouse_dir: folder of the wheelhouses, WHEELHOUSE_DIR or $APP_DIR/$TMP_DIR/wheelhouse by default
+        (docker-compose mounts ./tmp/wheelhouse there, so it survives container re-creation)
+      - force: reinstall from the wheelhouse even if the requirements are satisfied
+      - keep: number of wheelhouses (requirements versions) to keep
+
+    Returns a dict with the action taken, the hash and timings.
+    """
+    if not os.path.exists(REQUIREMENTS_FILE):
         print("No requirements.txt found.")
+        return {"success": True, "action": "none"}
+
+    start = time.perf_counter()
+    key = requirements_hash()
+    wheelhouse_dir = wheelhouse_dir or os.getenv("WHEELHOUSE_DIR") or os.path.join(
+        os.getenv("APP_DIR", "/app"), os.getenv("TMP_DIR", "tmp"), "wheelhouse")
+    layer = os.path.join(wheelhouse_dir, key)
+    stamp = os.path.join(layer, "install.json")
+    cold_seconds = None
+    if os.path.exists(stamp):
+        with open(stamp, "r", encoding="utf-8") as f:
+            cold_seconds = json.load(f).get("cold_seconds")
+        os.utime(stamp)  # most recently used wheelhouses survive pruning
+
+    try:
+        if not force and requirements_satisfied():
+            action = "skipped"
+        elif cold_seconds is not None:
+            print(f"Installing requirements from wheelhouse {layer}...")
+            _pip("install", "--no-index", "--find-links", layer, "-r", REQUIREMENTS_FILE)
+            action = "wheelhouse"
+        else:
+            print(f"Building wheelhouse {layer} from {REQUIREMENTS_FILE}...")
+            os.makedirs(wheelhouse_dir, exist_ok=True)
+            partial = f"{layer}.tmp-{os.getpid()}"
+            shutil.rmtree(partial, ignore_errors=True)
+            _pip("wheel", "--wheel-dir", partial, "-r", REQUIREMENTS_FILE)
+            _pip("install", "--no-index", "--find-links", partial, "-r", REQUIREMENTS_FILE)
+            cold_seconds = time.perf_counter() - start
+            with open(os.path.join(partial, "install.json"), "w", encoding="utf-8") as f:
+                json.dump({"hash": key, "cold_seconds": cold_seconds, "python": sys.version.split()[0]}, f)
+            shutil.rmtree(layer, ignore_errors=True)
+            os.replace(partial, layer)
+            action = "built"
+    except (subprocess.CalledProcessError, OSError) as e:
+        print(f"Installing requirements failed: {e}")
+        return {"success": False, "action": "failed", "hash": key, "error": str(e)}
+
+    _prune_wheelhouses(wheelhouse_dir, keep)
+    seconds = time.perf_counter() - start
+    report = {"success": True, "action": action, "hash": key, "seconds": round(seconds, 3)}
+    if cold_seconds is not None:
+        report["cold_seconds"] = round(cold_seconds, 3)
+        if action != "built":
+            report["saved_seconds"] = round(cold_seconds - seconds, 3)
+    elif action == "skipped":
+        # the image already ships every requirement: there never was a cold install to compare with
+        report["note"] = "requirements are satisfied by the image, no wheelhouse needed"
+    described = {"skipped": "already satisfied", "wheelhouse": "installed from wheelhouse", "built": "installed, wheelhouse built"}
+    print(f"Requirements {described[action]} in {seconds:.2f} s" +
+          (f" (cold install {cold_seconds:.2f} s, saved {cold_seconds - seconds:.2f} s)" if "saved_seconds" in report else
+           " (satisfied by the image, no wheelhouse built and no cold install to compare with)" if action == "skipped" else ""))
+    return report
+
+
+def _prune_wheelhouses(wheelhouse_dir, keep):
+    """Delete all but the `keep` most recently used wheelhouses."""
+    if not os.path.isdir(wheelhouse_dir):
+        return
+    layers = [os.path.join(wheelhouse_dir, name) for name in os.listdir(wheelhouse_dir)
+              if os.path.exists(os.path.join(wheelhouse_dir, name, "install.json"))]
+    for layer in sorted(layers, key=lambda path: os.path.getmtime(os.path.join(path, "install.json")), reverse=True)[keep:]:
+        shutil.rmtree(layer, ignore_errors=True)
 
 
 def load_module(module_path, module_name):
@@ -178,7 +300,11 @@ def set_requirements(reqs_dict):
 
 # When the application starts, install requirements and auto-import tools.
 if __name__ == "__main__":
-    install_requirements()
+    result = install_requirements(force="--force" in sys.argv)
+    if not result["success"]:
+        sys.exit(1)
+    if "--install-only" in sys.argv:
+        sys.exit(0)
     # For demonstration, print the tool map.
     print("Tool Map:")
     print(tool_map())
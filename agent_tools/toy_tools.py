@@ -1,34 +1,138 @@
+import os
+import uuid
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+
 import numpy as np
 import pandas as pd
 
-def generate_random_matrix(rows: int, cols: int) -> np.ndarray:
+from agent_tools.data_tools import validate_path_security
+from agent_tools.tools_config import get_data_dir, get_tmp_dir, get_tools_config
+
+
+SENTINEL = 0.2323232323232  # written to [0][0] to discern between tool output and hallucinations
+
+
+def generate_random_matrix(
+    rows: int,
+    cols: int,
+    seed: Optional[int] = None,
+    dtype: str = "float64",
+    max_inline: Optional[int] = None
+) -> Union[np.ndarray, Dict[str, Any]]:
     """
     Generate a random matrix of given dimensions.
 
+    Small matrices are returned as they are. Matrices with more than `max_inline` elements are
+    generated chunk by chunk into a memory-mapped .npy file in TMP_DIR, and a handle with summary
+    statistics is returned instead of the values. The same seed gives the same values either way.
+
     Args:
         rows (int): Number of rows.
         cols (int): Number of columns.
+        seed (int): Seed of the random generator, for reproducible matrices.
+        dtype (str): "float64" or "float32".
+        max_inline (int): Largest number of elements returned as an array (tools_config.random_matrix.max_inline, 10000 by default).
 
     Returns:
-        np.ndarray: A matrix filled with random values.
+        np.ndarray | dict: The matrix filled with uniform [0, 1) values, or for large shapes a dict with the
+            file path, shape, dtype, seed, min/max/mean/std and the top-left corner of the matrix.
     """
-    matrix = np.random.rand(rows, cols)
-    matrix[0][0]=0.2323232323232 #to discern between tool output and hallucinations
-    print("Random Matrix:\n", matrix)
+    if rows < 1 or cols < 1:
+        raise ValueError("rows and cols must be positive")
+    if dtype not in ("float64", "float32"):
+        raise ValueError(f"Unsupported dtype {dtype}, use float64 or float32")
+    config = get_tools_config("random_matrix")
+    if max_inline is None:
+        max_inline = int(config.get("max_inline", 10000))
+    rng = np.random.default_rng(seed)
+
+    if rows * cols <= max_inline:
+        matrix = rng.random((rows, cols), dtype=dtype)
+        matrix[0][0] = SENTINEL
+        print("Random Matrix:\n", matrix)
+        return matrix
+
+    folder = Path(config.get("path") or os.path.join(get_tmp_dir(), "random_matrices"))
+    folder.mkdir(parents=True, exist_ok=True)
+    path = folder / f"matrix-{rows}x{cols}-{dtype}-{seed if seed is not None else 'random'}-{uuid.uuid4().hex[:8]}.npy"
+    matrix = np.lib.format.open_memmap(path, mode="w+", dtype=dtype, shape=(rows, cols))
+    # rows per chunk so that a chunk is about chunk_mb, sequential draws keep the seeded stream intact
+    chunk_rows = max(1, int(float(config.get("chunk_mb", 64)) * 1024 ** 2) // (cols * matrix.itemsize))
+    total = 0.0
+    total_squares = 0.0
+    minimum, maximum = np.inf, -np.inf
+    for start in range(0, rows, chunk_rows):
+        chunk = matrix[start:start + chunk_rows]
+        rng.random(chunk.shape, dtype=dtype, out=chunk)
+        if start == 0:
+            chunk[0][0] = SENTINEL
+        total += float(chunk.sum(dtype=np.float64))
+        total_squares += float(np.square(chunk, dtype=np.float64).sum())
+        minimum = min(minimum, float(chunk.min()))
+        maximum = max(maximum, float(chunk.max()))
+    matrix.flush()
+    preview = matrix[:5, :5].tolist()
+    del matrix
+    _evict_matrices(folder, keep=path, max_bytes=int(float(config.get("max_mb", 2048)) * 1024 ** 2))
+
+    count = rows * cols
+    mean = total / count
+    summary = {
+        "path": str(path),
+        "shape": [rows, cols],
+        "dtype": dtype,
+        "seed": seed,
+        "min": minimum,
+        "max": maximum,
+        "mean": mean,
+        "std": max(0.0, total_squares / count - mean * mean) ** 0.5,
+        "preview": preview,
+    }
+    print("Random Matrix saved to", path, "\n", {k: v for k, v in summary.items() if k != "preview"})
+    return summary
+
+
+def _evict_matrices(folder: Path, keep: Path, max_bytes: int) -> None:
+    """Delete the oldest matrix files until the folder fits in max_bytes (the new file is always kept)."""
+    entries = []
+    for path in folder.glob("matrix-*.npy"):
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            continue
+        entries.append((stat.st_mtime, stat.st_size, path))
+    total = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        if path == keep:
+            continue
+        try:
+            path.unlink()
+        except FileNotFoundError:
+            pass
+        total -= size
 
-    return matrix
 
-def summarize_dataframe(data: dict) -> pd.DataFrame:
+def summarize_dataframe(data: Optional[dict] = None, file_path: Optional[str] = None, columns: Optional[List[str]] = None) -> pd.DataFrame:
     """
-    Convert a dictionary into a DataFrame and return basic statistics.
+    Convert a dictionary, or a CSV/Parquet file from the data directory, into a DataFrame and return basic statistics.
 
     Args:
         data (dict): A dictionary where keys are column names and values are lists.
+        file_path (str): Path to a .csv, .tsv or .parquet file relative to the data directory, used instead of data.
+        columns (List[str]): Columns of the file to summarize. All columns by default.
 
     Returns:
         pd.DataFrame: A DataFrame summary with mean and standard deviation.
     """
-    df = pd.DataFrame(data)
+    if file_path:
+        # large CSV files are parsed once and then read from a memory-mapped Arrow copy
+        from agent_tools.columnar_cache import read_table
+        df = read_table(Path(validate_path_security(file_path, get_data_dir())), columns=columns).to_pandas()
+    else:
+        df = pd.DataFrame(data)
     summary = df.describe()
     print("\nData Summary:\n", summary)
     return summary
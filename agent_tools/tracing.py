@@ -0,0 +1,522 @@
+import atexit
+import json
+import os
+import random
+import threading
+import time
+import urllib.request
+from collections import deque
+from contextvars import ContextVar
+from typing import Any, Deque, Dict, Generator, Iterable, List, Optional, Tuple
+
+from just_agents.web.chat_ui_agent import ChatUIAgent
+
+from agent_tools.log_sink import rotate_file
+from agent_tools.tools_config import get_log_dir, get_tools_config
+
+# OTLP span kinds
+KIND_INTERNAL, KIND_SERVER, KIND_CLIENT = 1, 2, 3
+CLIENT_STAGES = ("completion", "embedding", "meilisearch")
+
+# innermost open span of the current turn; None outside traced turns, which makes span() a no-op
+_current: ContextVar[Optional["Span"]] = ContextVar("agent_tools_span", default=None)
+
+
+class Trace:
+    __slots__ = ("trace_id", "profile", "spans", "root")
+
+    def __init__(self, profile: str):
+        self.trace_id = f"{random.getrandbits(128):032x}"
+        self.profile = profile
+        self.spans: List[Span] = []
+        self.root: Optional[Span] = None
+
+
+class Span:
+    __slots__ = ("trace", "span_id", "parent", "name", "start_ns", "end_ns", "children_ns", "attributes", "error")
+
+    def __init__(self, trace: Trace, name: str, parent: Optional["Span"], attributes: Dict[str, Any]):
+        self.trace = trace
+        self.span_id = f"{random.getrandbits(64):016x}"
+        self.parent = parent
+        self.name = name
+        self.attributes = attributes
+        self.start_ns = time.time_ns()
+        self.end_ns = 0
+        self.children_ns = 0
+        self.error: Optional[str] = None
+        trace.spans.append(self)
+
+    @property
+    def duration_ms(self) -> float:
+        return (self.end_ns - self.start_ns) / 1e6
+
+    def set(self, **attributes: Any) -> None:
+        self.attributes.update(attributes)
+
+    def to_otlp(self) -> Dict[str, Any]:
+        stage = self.name.split(":", 1)[0]
+        span = {
+            "traceId": self.trace.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": KIND_SERVER if self is self.trace.root else KIND_CLIENT if stage in CLIENT_STAGES else KIND_INTERNAL,
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns),
+            "attributes": [{"key": k, "value": _otlp_value(v)} for k, v in self.attributes.items() if v is not None],
+            "status": {"code": 2, "message": self.error} if self.error else {"code": 1},
+        }
+        if self.parent is not None:
+            span["parentSpanId"] = self.parent.span_id
+        return span
+
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def _percentile(ordered: List[float], q: float) -> float:
+    return ordered[min(len(ordered) - 1, int(len(ordered) * q))] if ordered else 0.0
+
+
+class TraceSummary:
+    """Per profile: turn latencies and, per stage, self time (time not spent in child spans).
+
+    The stage of a span is its name ("completion", "tool:search_documents", "embedding", ...),
+    time of the turn outside any span is counted as the "agent" stage. Self time makes nested
+    stages add up to the turn time, so the stage with the largest share is the one to optimize.
+    """
+
+    def __init__(self, samples: int = 1000):
+        self.samples = samples
+        self._lock = threading.Lock()
+        self._profiles: Dict[str, Dict[str, Any]] = {}
+
+    def add(self, profile: str, turn_ms: float, stages: Iterable[Tuple[str, float, float]]) -> None:
+        """Record a turn of `profile` with (stage, duration ms, self time ms) of each of its spans."""
+        with self._lock:
+            entry = self._profiles.get(profile)
+            if entry is None:
+                entry = self._profiles[profile] = {"turns": 0, "turn_ms": 0.0, "samples": deque(maxlen=self.samples), "stages": {}}
+            entry["turns"] += 1
+            entry["turn_ms"] += turn_ms
+            entry["samples"].append(turn_ms)
+            for stage, duration_ms, self_ms in stages:
+                stats = entry["stages"].get(stage)
+                if stats is None:
+                    stats = entry["stages"][stage] = {"count": 0, "self_ms": 0.0, "samples": deque(maxlen=self.samples)}
+                stats["count"] += 1
+                stats["self_ms"] += self_ms
+                stats["samples"].append(duration_ms)
+
+    def report(self) -> Dict[str, Any]:
+        with self._lock:
+            profiles = {}
+            for profile, entry in sorted(self._profiles.items()):
+                turns = sorted(entry["samples"])
+                stages = {}
+                for stage, stats in sorted(entry["stages"].items(), key=lambda item: -item[1]["self_ms"]):
+                    ordered = sorted(stats["samples"])
+                    stages[stage] = {
+                        "count": stats["count"],
+                        "per_turn": round(stats["count"] / entry["turns"], 2),
+                        "p50_ms": round(_percentile(ordered, 0.50), 1),
+                        "p95_ms": round(_percentile(ordered, 0.95), 1),
+                        "self_ms": round(stats["self_ms"], 1),
+                        "share": round(stats["self_ms"] / entry["turn_ms"] * 100, 1) if entry["turn_ms"] else 0.0,
+                    }
+                slowest = next(iter(stages), None)
+                profiles[profile] = {
+                    "turns": entry["turns"],
+                    "turn_p50_ms": round(_percentile(turns, 0.50), 1),
+                    "turn_p95_ms": round(_percentile(turns, 0.95), 1),
+                    "slowest_stage": slowest,
+                    "slowest_share": stages[slowest]["share"] if slowest else None,
+                    "stages": stages,
+                }
+            return profiles
+
+
+class TraceExporter:
+    """Batches finished traces from a bounded queue to OTLP/JSON, in a background thread.
+
+    Each batch is one ExportTraceServiceRequest: appended as a line to `path` (the format of the
+    OpenTelemetry Collector file exporter, readable by scripts/trace_report.py) and/or POSTed
+    to an OTLP/HTTP `endpoint` such as a collector, Jaeger or Tempo on :4318/v1/traces.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        endpoint: Optional[str] = None,
+        headers: Optional[Dict[str, str]] = None,
+        service_name: str = "just-chat-agents",
+        capacity: int = 10000,
+        batch_size: int = 256,
+        flush_interval: float = 2.0,
+        timeout: float = 5.0,
+        max_bytes: int = 100 * 1024 ** 2,
+        backups: int = 3
+    ):
+        self.path = path
+        self.endpoint = endpoint
+        self.headers = {"Content-Type": "application/json", **(headers or {})}
+        self.service_name = service_name
+        self.capacity = capacity
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.timeout = timeout
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self._queue: Deque[List[Span]] = deque()
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+        self._write_lock = threading.Lock()
+        self.exported = 0
+        self.dropped = 0
+        self.errors = 0
+        if path:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._thread = threading.Thread(target=self._run, name="trace_exporter", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def export(self, spans: List[Span]) -> None:
+        if len(self._queue) >= self.capacity:
+            self.dropped += 1
+            return
+        self._queue.append(spans)
+        if len(self._queue) >= self.batch_size:
+            self._wakeup.set()
+
+    def _run(self) -> None:
+        while not self._stopped.is_set():
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            self.flush()
+
+    def flush(self) -> None:
+        with self._write_lock:
+            while self._queue:
+                batch: List[Span] = []
+                try:
+                    for _ in range(self.batch_size):
+                        batch.extend(self._queue.popleft())
+                except IndexError:
+                    pass
+                self._send(batch)
+
+    def _send(self, spans: List[Span]) -> None:
+        payload = json.dumps({"resourceSpans": [{
+            "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": self.service_name}}]},
+            "scopeSpans": [{"scope": {"name": "agent_tools.tracing"}, "spans": [s.to_otlp() for s in spans]}],
+        }]}, ensure_ascii=False).encode("utf-8")
+        try:
+            if self.path:
+                rotate_file(self.path, len(payload) + 1, self.max_bytes, self.backups)
+                with open(self.path, "ab") as f:
+                    f.write(payload + b"\n")
+            if self.endpoint:
+                request = urllib.request.Request(self.endpoint, data=payload, headers=self.headers, method="POST")
+                with urllib.request.urlopen(request, timeout=self.timeout):
+                    pass
+        except OSError:
+            self.errors += 1
+            return
+        self.exported += len(spans)
+
+    def close(self) -> None:
+        self._stopped.set()
+        self._wakeup.set()
+        self._thread.join(timeout=5.0)
+        self.flush()
+
+    def stats(self) -> Dict[str, Any]:
+        return {"path": self.path, "endpoint": self.endpoint, "exported_spans": self.exported,
+                "queued_traces": len(self._queue), "dropped_traces": self.dropped, "export_errors": self.errors}
+
+
+class Tracer:
+    """Collects the spans of each turn, summarizes every finished turn and exports a sample of them.
+
+    Turns are exported with probability `sample_rate`, and always when slower than `slow_turn_ms`
+    (the decision is made when the turn ends, so slow turns are never lost to sampling).
+    """
+
+    def __init__(self, exporter: Optional[TraceExporter] = None, sample_rate: float = 1.0,
+                 slow_turn_ms: Optional[float] = None, summary_samples: int = 1000):
+        self.exporter = exporter
+        self.sample_rate = sample_rate
+        self.slow_turn_ms = slow_turn_ms
+        self.summary = TraceSummary(summary_samples)
+        self.turns = 0
+
+    def start_turn(self, profile: str, **attributes: Any) -> Span:
+        parent = _current.get()
+        if parent is not None:  # an agent called by a tool of another agent: a child span of that turn
+            return Span(parent.trace, f"turn:{profile}", parent, attributes)
+        trace = Trace(profile)
+        trace.root = Span(trace, "turn", None, {"profile": profile, **attributes})
+        return trace.root
+
+    def end(self, span: Span, error: Optional[BaseException] = None) -> None:
+        span.end_ns = time.time_ns()
+        if error is not None and span.error is None:
+            span.error = f"{type(error).__name__}: {error}"
+        if span.parent is not None:
+            span.parent.children_ns += span.end_ns - span.start_ns
+        elif span is span.trace.root:
+            self._finish(span.trace)
+
+    def _finish(self, trace: Trace) -> None:
+        self.turns += 1
+        root = trace.root
+        turn_ms = root.duration_ms
+        stages = [(s.name, s.duration_ms, (s.end_ns - s.start_ns - s.children_ns) / 1e6)
+                  for s in trace.spans if s is not root and s.end_ns]
+        stages.append(("agent", turn_ms, (root.end_ns - root.start_ns - root.children_ns) / 1e6))
+        self.summary.add(trace.profile, turn_ms, stages)
+        if self.exporter is not None and (
+            random.random() < self.sample_rate or (self.slow_turn_ms is not None and turn_ms >= self.slow_turn_ms)
+        ):
+            self.exporter.export(trace.spans)
+
+
+class _SpanContext:
+    __slots__ = ("tracer", "name", "attributes", "span", "token")
+
+    def __init__(self, tracer: Tracer, name: str, attributes: Dict[str, Any]):
+        self.tracer = tracer
+        self.name = name
+        self.attributes = attributes
+
+    def __enter__(self) -> Span:
+        parent = _current.get()
+        self.span = Span(parent.trace, self.name, parent, self.attributes)
+        self.token = _current.set(self.span)
+        return self.span
+
+    def __exit__(self, exc_type: Any, exc: Optional[BaseException], tb: Any) -> None:
+        _current.reset(self.token)
+        self.tracer.end(self.span, exc)
+
+
+class _NoSpan:
+    """Context manager of span() outside traced turns."""
+
+    def __enter__(self) -> None:
+        return None
+
+    def __exit__(self, *args: Any) -> None:
+        return None
+
+
+_NO_SPAN = _NoSpan()
+_tracer: Optional[Tracer] = None
+_tracer_loaded = False
+_tracer_lock = threading.Lock()
+
+
+def get_tracer() -> Optional[Tracer]:
+    """Process-wide tracer configured from `tools_config.tracing`.
+
+    Returns None if tracing is disabled (the default), the configuration is only read once.
+    """
+    global _tracer, _tracer_loaded
+    if _tracer is None and not _tracer_loaded:
+        with _tracer_lock:
+            if _tracer is None and not _tracer_loaded:
+                config = get_tools_config("tracing")
+                if config.get("enabled", False):
+                    targets = [t.strip() for t in str(config.get("export", "file")).split(",")]
+                    endpoint = config.get("otlp_endpoint") or os.getenv("OTEL_EXPORTER_OTLP_TRACES_ENDPOINT")
+                    if not endpoint and os.getenv("OTEL_EXPORTER_OTLP_ENDPOINT"):
+                        endpoint = os.getenv("OTEL_EXPORTER_OTLP_ENDPOINT").rstrip("/") + "/v1/traces"
+                    exporter = None
+                    if "file" in targets or "otlp" in targets:
+                        exporter = TraceExporter(
+                            path=(config.get("path") or os.path.join(get_log_dir(), "traces.jsonl")) if "file" in targets else None,
+                            endpoint=endpoint if "otlp" in targets else None,
+                            headers=config.get("otlp_headers"),
+                            service_name=config.get("service_name", "just-chat-agents"),
+                            capacity=int(config.get("capacity", 10000)),
+                            flush_interval=float(config.get("flush_interval", 2.0)),
+                            max_bytes=int(float(config.get("max_mb", 100)) * 1024 ** 2),
+                            backups=int(config.get("backups", 3)),
+                        )
+                    _tracer = Tracer(
+                        exporter,
+                        sample_rate=float(config.get("sample_rate", 1.0)),
+                        slow_turn_ms=config.get("slow_turn_ms"),
+                        summary_samples=int(config.get("summary_samples", 1000)),
+                    )
+                _tracer_loaded = True
+    return _tracer
+
+
+def span(name: str, **attributes: Any) -> Any:
+    """Context manager timing a stage of the current turn as a child span.
+
+    Outside a traced turn (tracing disabled, or code not called by an agent) it does nothing and
+    costs one context variable lookup. Yields the Span, or None when not tracing.
+    """
+    if _current.get() is None:
+        return _NO_SPAN
+    return _SpanContext(_tracer, name, attributes)
+
+
+def trace_summary() -> Dict[str, Any]:
+    """Report where the time of chat turns goes, per profile: turn p50/p95 and per stage (prompt tools,
+    admission wait, completions, tool calls, embedding, Meilisearch) count, p50/p95 and share of the
+    turn time, with the slowest stage flagged.
+
+    Returns:
+        Dict[str, Any]: Summary per profile and exporter metrics, or {"enabled": False} if tracing is disabled
+    """
+    tracer = get_tracer()
+    if tracer is None:
+        return {"enabled": False}
+    return {
+        "enabled": True,
+        "turns": tracer.turns,
+        "exporter": tracer.exporter.stats() if tracer.exporter is not None else None,
+        "profiles": tracer.summary.report(),
+    }
+
+
+class TracedChatUIAgent(ChatUIAgent):
+    """ChatUIAgent that records a trace of each turn when `tools_config.tracing` is enabled.
+
+    The turn span covers the whole query or stream. It contains a span per prompt tool
+    ("prompt_tool:<name>"), completion ("completion", until the stream is consumed) and tool
+    call ("tool:<name>"), tools can add their own with span(). When tracing is disabled the
+    agent behaves exactly like ChatUIAgent.
+    """
+
+    def query(self, query_input: Any, **kwargs) -> str:
+        tracer = get_tracer()
+        if tracer is None:
+            return super().query(query_input, **kwargs)
+        turn = tracer.start_turn(self.shortname, stream=False)
+        token = _current.set(turn)
+        error = None
+        try:
+            return super().query(query_input, **kwargs)
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            _current.reset(token)
+            tracer.end(turn, error)
+
+    def stream(self, query_input: Any, **kwargs) -> Generator[Any, None, None]:
+        tracer = get_tracer()
+        chunks = super().stream(query_input, **kwargs)
+        if tracer is None:
+            return chunks
+        return self._traced_stream(chunks, tracer, tracer.start_turn(self.shortname, stream=True))
+
+    def _traced_stream(self, chunks: Iterable[Any], tracer: Tracer, turn: Span) -> Generator[Any, None, None]:
+        # the server may resume the stream from another thread, so the turn is made current for every step
+        chunks = iter(chunks)
+        error = None
+        try:
+            while True:
+                token = _current.set(turn)
+                try:
+                    chunk = next(chunks)
+                except StopIteration:
+                    return
+                finally:
+                    _current.reset(token)
+                yield chunk
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            tracer.end(turn, error)
+
+    def dynamic_prompt(self, prompt: str) -> str:
+        if _current.get() is None or not self.prompt_tools:
+            return super().dynamic_prompt(prompt)
+        # same as BaseAgent.dynamic_prompt, with a span per prompt tool
+        extended_prompt = prompt
+        for tool_name, tool in self.prompt_tools.items():
+            tool_input = tool.call_arguments
+            with span(f"prompt_tool:{tool_name}"):
+                tool_output = tool.get_callable()(**tool_input)
+            call_string = f'Result of {str(tool_name)}({str(tool_input)}) tool execution:\n'
+            call_string += f"{str(tool_output)}\n"
+            if tool.description:
+                call_string += f" # {str(tool_name)} short description: {tool.description}\n"
+            extended_prompt += f"\n{call_string}\n"
+        return extended_prompt
+
+    def _process_function_calls(self, function_calls: List[Any], memory: Any = None) -> Any:
+        if _current.get() is None:
+            return super()._process_function_calls(function_calls, memory)
+        # same as BaseAgent._process_function_calls, with a span per tool call
+        if not memory:
+            memory = self.memory
+        messages = []
+        for call in function_calls:
+            with span(f"tool:{call.name}") as tool_span:
+                msg = call.execute_function(lambda function_name: self.tools[function_name].get_callable())
+                content = msg.get("content") if isinstance(msg, dict) else None
+                if isinstance(content, str):
+                    tool_span.set(result_chars=len(content))
+                    if content.startswith(("Error occurred during call", "Incorrect arguments received")):
+                        tool_span.error = content[:200]
+            self.handle_on_response(msg, action='response', source='tool')
+            self.add_to_memory(msg, memory)
+            messages.append(msg)
+        return messages
+
+    def _execute_completion(self, messages: Any, stream: bool, active_options_for_this_call: Any, **kwargs) -> Any:
+        parent = _current.get()
+        if parent is None:
+            return super()._execute_completion(messages, stream, active_options_for_this_call, **kwargs)
+        completion = Span(parent.trace, "completion", parent, {
+            "model": kwargs.get("model") or active_options_for_this_call.get("model"),
+            "messages": len(messages),
+            "stream": stream,
+        })
+        try:
+            response = super()._execute_completion(messages, stream, active_options_for_this_call, **kwargs)
+        except BaseException as e:
+            _tracer.end(completion, e)
+            raise
+        if not stream:
+            self._record_usage(completion, response)
+            _tracer.end(completion)
+            return response
+        return self._end_after(response, completion)
+
+    def _end_after(self, response: Iterable[Any], completion: Span) -> Generator[Any, None, None]:
+        """End the completion span when the stream is consumed, noting the time to the first chunk."""
+        error = None
+        first = True
+        try:
+            for part in response:
+                if first:
+                    completion.set(ttft_ms=round((time.time_ns() - completion.start_ns) / 1e6, 1))
+                    first = False
+                self._record_usage(completion, part)
+                yield part
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            _tracer.end(completion, error)
+
+    @staticmethod
+    def _record_usage(completion: Span, response: Any) -> None:
+        usage = getattr(response, "usage", None)
+        if usage is not None and getattr(usage, "total_tokens", None):
+            completion.set(prompt_tokens=usage.prompt_tokens, completion_tokens=usage.completion_tokens)
@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+
+"""
+LLM Admission Control Benchmark
+
+Sends a burst of chat completions to the rate-limited mock LLM of load_test.py (started in-process,
+answering 429 above --provider-rpm requests per minute) from two kinds of callers:
+- user: a user-facing profile (admission_priority 0)
+- naming: chat naming requests (admission_priority 10, short admission_max_wait)
+
+Two modes are compared:
+- direct: plain ChatUIAgent, every request goes straight to the provider (the OpenAI client retries
+  429s after the provider's retry-after, then completion_max_tries retries again), like the profiles
+  before agent_tools.admission
+- admission: AdmissionControlledAgent with token buckets set to --rpm/--tpm, priority queue and shedding
+
+Requests arrive open-loop at --arrival-rate per second, each in its own thread, or with --event-loop
+as coroutines of one asyncio loop that call the agent inline like the agent server's chat_completions
+(there admission never waits, a completion that cannot start at once is shed). For each mode and caller the script reports
+answered, shed and failed requests with latency percentiles, plus the 429s the provider returned.
+Results are saved as JSON in tmp/benchmarks/.
+
+Usage:
+  python scripts/benchmark_admission.py
+  python scripts/benchmark_admission.py --users 60 --namings 30 --provider-rpm 40 --rpm 36 --user-wait 10 --no-stream
+  python scripts/benchmark_admission.py --event-loop
+"""
+
+import asyncio
+import json
+import os
+import platform
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import typer
+
+REPO_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_DIR))
+sys.path.insert(0, str(REPO_DIR / "scripts"))
+from just_agents.web.chat_ui_agent import ChatUIAgent  # noqa: E402
+from load_test import MockLLMHandler, MockServer, StageStats, percentile  # noqa: E402
+import agent_tools.admission as admission  # noqa: E402
+
+MODEL = "openai/mock"
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=REPO_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def start_mock(provider_rpm: int, provider_tpm: int, ttft_ms: float, answer_tokens: int) -> MockServer:
+    MockLLMHandler.stats = StageStats()
+    MockLLMHandler.ttft_ms = ttft_ms
+    MockLLMHandler.prefill_ms_per_token = 0.0
+    MockLLMHandler.tokens_per_second = 2000.0
+    MockLLMHandler.answer_tokens = answer_tokens
+    MockLLMHandler.tool_rounds = 0
+    MockLLMHandler.rpm_limit = provider_rpm
+    MockLLMHandler.tpm_limit = provider_tpm
+    MockLLMHandler._window = []
+    server = MockServer(("127.0.0.1", 0), MockLLMHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def make_agent(mode: str, api_base: str, priority: int, max_wait: float, retries: int) -> ChatUIAgent:
+    options = dict(
+        llm_options={"model": MODEL, "api_base": api_base, "api_key": "sk-mock", "max_tokens": 64},
+        raise_on_completion_status_errors=True,
+        completion_max_tries=retries,
+        continue_conversation=False,
+        remember_query=False,
+    )
+    if mode == "direct":
+        return ChatUIAgent(**options)
+    return admission.AdmissionControlledAgent(admission_priority=priority, admission_max_wait=max_wait, **options)
+
+
+def run_mode(mode: str, api_base: str, users: int, namings: int, arrival_rate: float, stream: bool,
+             retries: int, user_wait: float, naming_wait: float, event_loop: bool = False) -> Dict[str, Any]:
+    settings = {"user": (0, user_wait), "naming": (10, naming_wait)}
+    # one naming request after every (users / namings) user requests, as chat-ui names each new chat
+    step = max(1, round(users / max(1, namings)))
+    order: List[str] = []
+    remaining = {"user": users, "naming": namings}
+    while remaining["user"] or remaining["naming"]:
+        for _ in range(step):
+            if remaining["user"]:
+                order.append("user")
+                remaining["user"] -= 1
+        if remaining["naming"]:
+            order.append("naming")
+            remaining["naming"] -= 1
+    results: Dict[str, Dict[str, List[float]]] = {kind: {"ok": [], "shed": [], "error": []} for kind in settings}
+    errors: Dict[str, int] = {}
+    shed_markers = (admission.SHED_MESSAGE, json.dumps(admission.SHED_MESSAGE)[1:-1])  # streamed chunks are JSON
+    lock = threading.Lock()
+    start = time.perf_counter() + 1.0
+
+    def record(kind: str, scheduled: float, text: Optional[str], error: Optional[Exception]) -> None:
+        outcome = "error" if error is not None else "shed" if any(marker in text for marker in shed_markers) else "ok"
+        with lock:
+            if error is not None:
+                errors[type(error).__name__] = errors.get(type(error).__name__, 0) + 1
+            results[kind][outcome].append((time.perf_counter() - scheduled) * 1000)
+
+    def request(i: int, kind: str) -> None:
+        # one agent per request: concurrent streams of a single agent instance share its eliot action context
+        agent = make_agent(mode, api_base, *settings[kind], retries)
+        scheduled = start + i / arrival_rate
+        time.sleep(max(0.0, scheduled - time.perf_counter()))
+        prompt = f"Question {i}: why are glucose prediction models important?"
+        try:
+            if stream:
+                text = "".join(str(chunk) for chunk in agent.stream(prompt))
+            else:
+                text = agent.query(prompt)
+            record(kind, scheduled, text, None)
+        except Exception as e:
+            record(kind, scheduled, None, e)
+
+    async def request_on_loop(i: int, kind: str) -> None:
+        # like chat_completions: query() runs inline, stream() is iterated on the loop chunk by chunk
+        agent = make_agent(mode, api_base, *settings[kind], retries)
+        scheduled = start + i / arrival_rate
+        await asyncio.sleep(max(0.0, scheduled - time.perf_counter()))
+        prompt = f"Question {i}: why are glucose prediction models important?"
+        try:
+            if stream:
+                chunks = []
+                for chunk in agent.stream(prompt):
+                    chunks.append(str(chunk))
+                    await asyncio.sleep(0)  # the response send lets other requests run between chunks
+                text = "".join(chunks)
+            else:
+                text = agent.query(prompt)
+            record(kind, scheduled, text, None)
+        except Exception as e:
+            record(kind, scheduled, None, e)
+
+    async def run_on_loop() -> None:
+        await asyncio.gather(*(request_on_loop(i, kind) for i, kind in enumerate(order)))
+
+    began = time.perf_counter()
+    if event_loop:
+        asyncio.run(run_on_loop())
+    else:
+        with ThreadPoolExecutor(max_workers=len(order)) as pool:
+            for i, kind in enumerate(order):
+                pool.submit(request, i, kind)
+    elapsed = time.perf_counter() - began
+
+    report: Dict[str, Any] = {"seconds": round(elapsed, 2), "errors": errors}
+    for kind, outcomes in results.items():
+        ok = outcomes["ok"]
+        report[kind] = {
+            "ok": len(ok),
+            "shed": len(outcomes["shed"]),
+            "error": len(outcomes["error"]),
+            "p50_ms": round(percentile(ok, 50), 1) if ok else None,
+            "p99_ms": round(percentile(ok, 99), 1) if ok else None,
+            "shed_p50_ms": round(percentile(outcomes["shed"], 50), 1) if outcomes["shed"] else None,
+        }
+    return report
+
+
+def main(
+    users: int = typer.Option(200, "--users", help="Requests of the user-facing profile"),
+    namings: int = typer.Option(100, "--namings", help="Chat naming requests, interleaved with the user requests"),
+    arrival_rate: float = typer.Option(30.0, "--arrival-rate", help="Requests started per second"),
+    provider_rpm: int = typer.Option(120, "--provider-rpm", help="Mock provider limit, 429 above this many requests per minute"),
+    provider_tpm: int = typer.Option(0, "--provider-tpm", help="Mock provider token limit per minute (0: unlimited)"),
+    rpm: int = typer.Option(108, "--rpm", help="Admission rpm bucket, (1 + burst) x rpm must stay below the provider limit"),
+    tpm: int = typer.Option(0, "--tpm", help="Admission tpm bucket (0: unlimited)"),
+    max_parallel: int = typer.Option(32, "--max-parallel", help="Admission max_parallel_requests"),
+    burst: float = typer.Option(0.1, "--burst", help="Share of the per-minute limits usable at once"),
+    user_wait: float = typer.Option(30.0, "--user-wait", help="admission_max_wait of user requests"),
+    naming_wait: float = typer.Option(5.0, "--naming-wait", help="admission_max_wait of naming requests"),
+    retries: int = typer.Option(3, "--retries", help="completion_max_tries of both modes"),
+    ttft_ms: float = typer.Option(200.0, "--ttft-ms", help="Mock time to first token"),
+    answer_tokens: int = typer.Option(40, "--answer-tokens", help="Mock answer length"),
+    stream: bool = typer.Option(True, "--stream/--no-stream", help="Use streaming completions like chat-ui"),
+    event_loop: bool = typer.Option(False, "--event-loop", help="Run the requests on one asyncio loop like the agent server, instead of one thread each"),
+    modes: str = typer.Option("direct,admission", "--modes", help="Comma-separated modes to run"),
+    output: Optional[str] = typer.Option(None, "--output", "-o", help="Result JSON path (default: tmp/benchmarks/admission-<time>-<commit>.json)")
+) -> None:
+    """Compare direct LLM calls with admission control against a rate-limited mock provider."""
+    results: Dict[str, Any] = {}
+    # litellm imports parts of itself on the first call, which must not happen in many threads at once
+    server = start_mock(0, 0, 0.0, 1)
+    make_agent("direct", f"http://127.0.0.1:{server.server_address[1]}/v1", 0, 0.0, 1).query("warm up")
+    server.shutdown()
+    server.server_close()
+    for mode in [m.strip() for m in modes.split(",")]:
+        if mode not in ("direct", "admission"):
+            raise typer.BadParameter(f"Unknown mode {mode}")
+        # a fresh provider window and fresh buckets for every mode
+        server = start_mock(provider_rpm, provider_tpm, ttft_ms, answer_tokens)
+        api_base = f"http://127.0.0.1:{server.server_address[1]}/v1"
+        admission._controller = admission.AdmissionController({
+            "split_across_workers": False,
+            "burst": burst,
+            "max_queue": users + namings,
+            "models": {MODEL: {"rpm": rpm, "tpm": tpm, "max_parallel_requests": max_parallel}},
+        })
+        try:
+            result = run_mode(mode, api_base, users, namings, arrival_rate, stream, retries, user_wait, naming_wait, event_loop)
+        finally:
+            server.shutdown()
+            server.server_close()
+        counters = MockLLMHandler.stats.snapshot()["counters"]
+        result["provider_429"] = counters.get("rate_limited", 0)
+        if mode == "admission":
+            result["admission"] = admission.admission_stats()["models"][MODEL]
+        results[mode] = result
+        print(f"  {mode:<10} {result['seconds']:>6.1f} s  provider 429s {result['provider_429']:>5}")
+        for kind in ("user", "naming"):
+            r = result[kind]
+            print(f"    {kind:<7} ok {r['ok']:>5}  shed {r['shed']:>5}  error {r['error']:>5}  "
+                  f"p50 {r['p50_ms'] or 0:>8.1f} ms  p99 {r['p99_ms'] or 0:>8.1f} ms")
+
+    commit = git_commit()
+    report = {
+        "commit": commit,
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "parameters": {"users": users, "namings": namings, "arrival_rate": arrival_rate, "provider_rpm": provider_rpm,
+                       "provider_tpm": provider_tpm, "rpm": rpm, "tpm": tpm, "max_parallel": max_parallel, "burst": burst,
+                       "user_wait": user_wait, "naming_wait": naming_wait, "retries": retries, "stream": stream,
+                       "event_loop": event_loop},
+        "results": results,
+    }
+    if output is None:
+        output = str(REPO_DIR / "tmp" / "benchmarks" / f"admission-{datetime.now():%Y%m%d-%H%M%S}-{commit or 'nogit'}.json")
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResults written to {output}")
+
+
+if __name__ == "__main__":
+    typer.run(main)
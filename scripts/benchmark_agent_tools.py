@@ -0,0 +1,286 @@
+#!/usr/bin/env python3
+
+"""
+Agent Tools Benchmark Suite
+
+Times the agent_tools hot paths that chat turns hit and tracks their peak memory:
+- data_tools: validate_path_security, list_files (tree and flat), read_file, query_table
+- tools_for_tools: auto_import_tools, tool_map
+- toy_tools: summarize_dataframe, generate_random_matrix
+- glucose_metrics: a --cgm-readings long CGM series from Parquet, from the columnar cache copy of a CSV and in memory
+- columnar_cache: big.csv parsed as text (pandas, pyarrow) vs read from its memory-mapped Arrow copy
+
+Synthetic data is generated once in the work folder and reused between runs:
+- many_files: a flat-ish tree with --files text/csv files (100k by default)
+- deep_tree: a --depth levels deep directory chain with a few files per level
+- big.csv: a numeric CSV of --csv-mb megabytes (use e.g. --csv-mb 4096 for multi-GB)
+- cgm.parquet / cgm.csv: a 5-minute CGM series (time, glucose) of --cgm-readings readings
+
+Each case is timed --repeats times without tracing (median and min are reported), then run once
+more under tracemalloc for the peak of Python/numpy allocations. Results are written as JSON
+tagged with the git commit, and --compare prints the change against an earlier result file.
+
+Usage:
+  python scripts/benchmark_agent_tools.py --workdir /tmp/agent_tools_bench
+  python scripts/benchmark_agent_tools.py --workdir /tmp/agent_tools_bench --compare tmp/benchmarks/<previous>.json
+"""
+
+import contextlib
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+import typer
+
+REPO_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_DIR))
+
+
+def generate_many_files(root: Path, files: int, seed: int = 1) -> None:
+    """Create `files` small .txt/.csv/.bin files spread over 1000 folders (skipped if already there)."""
+    marker = root / f".generated_{files}"
+    if marker.exists():
+        return
+    rng = random.Random(seed)
+    for i in range(files):
+        folder = root / f"group_{i % 1000:04d}"
+        folder.mkdir(parents=True, exist_ok=True)
+        extension = rng.choice([".txt", ".txt", ".csv", ".bin"])
+        (folder / f"file_{i:06d}{extension}").write_text(f"record {i}\n", encoding="utf-8")
+    marker.write_text("ok", encoding="utf-8")
+
+
+def generate_deep_tree(root: Path, depth: int, files_per_level: int = 3) -> Path:
+    """Create a directory chain `depth` levels deep and return its deepest folder."""
+    folder = root
+    for level in range(depth):
+        folder = folder / f"level_{level:03d}"
+        folder.mkdir(parents=True, exist_ok=True)
+        for i in range(files_per_level):
+            path = folder / f"note_{i}.md"
+            if not path.exists():
+                path.write_text(f"level {level} note {i}\n", encoding="utf-8")
+    return folder
+
+
+def generate_csv(path: Path, size_mb: int, seed: int = 1) -> None:
+    """Write a numeric CSV of roughly size_mb megabytes (skipped if already at least that big)."""
+    target = size_mb * 1024 * 1024
+    if path.exists() and path.stat().st_size >= target:
+        return
+    path.parent.mkdir(parents=True, exist_ok=True)
+    rng = random.Random(seed)
+    rows = [f"{i},{rng.random():.6f},{rng.randint(40, 400)},{rng.random() * 100:.3f},{rng.choice('abcde')}\n"
+            for i in range(10000)]
+    chunk = "".join(rows)
+    with path.open("w", encoding="utf-8") as f:
+        f.write("id,value,glucose,score,label\n")
+        written = 0
+        while written < target:
+            f.write(chunk)
+            written += len(chunk)
+
+
+def generate_cgm(folder: Path, readings: int, seed: int = 1) -> None:
+    """Write a 5-minute CGM series (daily cycle, meal spikes and sensor noise) as Parquet and CSV."""
+    marker = folder / f".generated_cgm_{readings}"
+    if marker.exists():
+        return
+    import numpy as np
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+    import pyarrow.parquet as pq
+
+    folder.mkdir(parents=True, exist_ok=True)
+    rng = np.random.default_rng(seed)
+    seconds = 1_600_000_000 + np.arange(readings, dtype=np.int64) * 300
+    day = 2 * np.pi * (seconds % 86400) / 86400
+    glucose = 130 + 35 * np.sin(day) + 40 * np.maximum(0, np.sin(3 * day)) ** 4 + rng.normal(0, 6, readings)
+    table = pa.table({"time": pa.array(seconds.astype("datetime64[s]")), "glucose": np.round(glucose, 1)})
+    pq.write_table(table, folder / "cgm.parquet")
+    pa_csv.write_csv(table, folder / "cgm.csv")
+    marker.write_text("ok", encoding="utf-8")
+
+
+def measure(fn: Callable[[], Any], repeats: int) -> Dict[str, Any]:
+    """Median/min wall time over `repeats` runs and peak traced memory of one extra run."""
+    times: List[float] = []
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        for _ in range(repeats):
+            start = time.perf_counter()
+            fn()
+            times.append(time.perf_counter() - start)
+        tracemalloc.start()
+        try:
+            fn()
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+    return {
+        "seconds_median": statistics.median(times),
+        "seconds_min": min(times),
+        "repeats": repeats,
+        "peak_mb": peak / (1024 * 1024),
+    }
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=REPO_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main(
+    workdir: str = typer.Option("tmp/agent_tools_bench", "--workdir", "-w", help="Folder for synthetic data (reused between runs)"),
+    files: int = typer.Option(100000, "--files", help="Number of files in the many_files tree"),
+    depth: int = typer.Option(100, "--depth", help="Depth of the deep_tree directory chain"),
+    csv_mb: int = typer.Option(256, "--csv-mb", help="Size of the synthetic CSV in megabytes"),
+    cgm_readings: int = typer.Option(10_000_000, "--cgm-readings", help="Length of the synthetic CGM series"),
+    repeats: int = typer.Option(3, "--repeats", "-r", help="Timed runs per case"),
+    only: Optional[str] = typer.Option(None, "--only", help="Comma-separated substrings of case names to run"),
+    output: Optional[str] = typer.Option(None, "--output", "-o", help="Result JSON path (default: tmp/benchmarks/agent_tools-<time>-<commit>.json)"),
+    compare: Optional[str] = typer.Option(None, "--compare", help="Earlier result JSON to compare against")
+) -> None:
+    """Benchmark agent_tools hot paths and store time and peak memory per case as JSON."""
+    data_dir = Path(workdir).resolve() / "data"
+    data_dir.mkdir(parents=True, exist_ok=True)
+    # data_tools resolve their base folder from APP_DIR/DATA_DIR at call time
+    os.environ["APP_DIR"] = str(data_dir.parent)
+    os.environ["DATA_DIR"] = "data"
+
+    import pandas as pd
+    from agent_tools import columnar_cache, data_tools, glucose_metrics, toy_tools, tools_for_tools
+
+    print(f"Preparing synthetic data in {data_dir}...")
+    start = time.perf_counter()
+    generate_many_files(data_dir / "many_files", files)
+    deepest = generate_deep_tree(data_dir / "deep_tree", depth)
+    generate_csv(data_dir / "tables" / "big.csv", csv_mb)
+    generate_cgm(data_dir / "cgm", cgm_readings)
+    print(f"Data ready in {time.perf_counter() - start:.1f} s")
+
+    # cases marked "columnar cache" read from the Arrow copy, convert it up front like the background worker would
+    cache = columnar_cache.get_columnar_cache()
+    csv_path = data_dir / "tables" / "big.csv"
+    start = time.perf_counter()
+    if cache is not None:
+        cache.convert(csv_path)
+        cache.convert(data_dir / "cgm" / "cgm.csv")
+    print(f"Columnar cache copy of big.csv ready in {time.perf_counter() - start:.1f} s")
+
+    deep_file = str((deepest / "note_0.md").relative_to(data_dir))
+    csv_file = "tables/big.csv"
+    frame = {
+        "A": [random.random() for _ in range(1_000_000)],
+        "B": list(range(1_000_000)),
+        "C": [random.randint(40, 400) for _ in range(1_000_000)],
+    }
+    import numpy as np
+    cgm_series = np.round(130 + 35 * np.sin(np.arange(cgm_readings) / 45.8) + np.random.default_rng(1).normal(0, 6, cgm_readings), 1)
+
+    cases: Dict[str, Callable[[], Any]] = {
+        "validate_path_security x10000": lambda: [
+            data_tools.validate_path_security(deep_file, str(data_dir)) for _ in range(10000)
+        ],
+        "list_files tree many_files": lambda: data_tools.list_files(subdir="many_files"),
+        "list_files tree many_files show_all": lambda: data_tools.list_files(show_all=True, subdir="many_files"),
+        "list_files flat many_files": lambda: data_tools.list_files(subdir="many_files", as_json=False),
+        "list_files tree deep_tree": lambda: data_tools.list_files(subdir="deep_tree"),
+        "read_file deep_tree leaf": lambda: data_tools.read_file(deep_file),
+        f"read_file big.csv {csv_mb}MB": lambda: data_tools.read_file(csv_file),
+        f"query_table big.csv {csv_mb}MB filter head": lambda: data_tools.query_table(
+            csv_file, columns=["id", "glucose"], filters=[["glucose", ">", 390]], limit=20
+        ),
+        f"query_table big.csv {csv_mb}MB group by": lambda: data_tools.query_table(
+            csv_file, group_by=["label"], aggregations={"glucose": ["mean", "max"], "id": ["count"]}
+        ),
+        f"parse big.csv {csv_mb}MB pandas.read_csv": lambda: pd.read_csv(csv_path),
+        f"parse big.csv {csv_mb}MB pyarrow csv": lambda: columnar_cache._source_dataset(csv_path).to_table(),
+        f"read big.csv {csv_mb}MB columnar cache": lambda: columnar_cache.read_table(csv_path),
+        f"summarize_dataframe big.csv {csv_mb}MB columnar cache": lambda: toy_tools.summarize_dataframe(
+            file_path=csv_file, columns=["value", "glucose", "score"]
+        ),
+        f"glucose_metrics cgm.parquet {cgm_readings} readings": lambda: glucose_metrics.glucose_metrics(
+            file_path="cgm/cgm.parquet", time_column="time"
+        ),
+        f"glucose_metrics cgm.csv {cgm_readings} readings columnar cache": lambda: glucose_metrics.glucose_metrics(
+            file_path="cgm/cgm.csv", time_column="time"
+        ),
+        f"glucose_metrics in memory {cgm_readings} readings": lambda: glucose_metrics.glucose_metrics(
+            readings=cgm_series
+        ),
+        "auto_import_tools": tools_for_tools.auto_import_tools,
+        "tool_map": tools_for_tools.tool_map,
+        "summarize_dataframe 1Mx3": lambda: toy_tools.summarize_dataframe(frame),
+        "generate_random_matrix 1000x1000": lambda: toy_tools.generate_random_matrix(1000, 1000),
+        "generate_random_matrix 5000x5000": lambda: toy_tools.generate_random_matrix(5000, 5000),
+        "generate_random_matrix 5000x5000 float32 seeded": lambda: toy_tools.generate_random_matrix(
+            5000, 5000, seed=1, dtype="float32"
+        ),
+    }
+    if only:
+        needles = [n.strip() for n in only.split(",")]
+        cases = {name: fn for name, fn in cases.items() if any(n in name for n in needles)}
+
+    # cases that process a known number of items also report throughput
+    items = {name: cgm_readings for name in cases if name.startswith("glucose_metrics")}
+
+    results: Dict[str, Dict[str, Any]] = {}
+    for name, fn in cases.items():
+        try:
+            results[name] = measure(fn, repeats)
+        except Exception as e:
+            results[name] = {"error": f"{type(e).__name__}: {e}"}
+        r = results[name]
+        if "error" in r:
+            print(f"  ❌ {name}: {r['error']}")
+            continue
+        throughput = ""
+        if name in items and r["seconds_median"]:
+            r["items_per_second"] = items[name] / r["seconds_median"]
+            throughput = f"  {r['items_per_second'] / 1e6:.1f} M items/s"
+        print(f"  {name:<40} {r['seconds_median'] * 1000:>10.2f} ms  (min {r['seconds_min'] * 1000:.2f} ms)  peak {r['peak_mb']:>9.2f} MB{throughput}")
+
+    commit = git_commit()
+    report = {
+        "commit": commit,
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "parameters": {"files": files, "depth": depth, "csv_mb": csv_mb, "cgm_readings": cgm_readings, "repeats": repeats},
+        "results": results,
+    }
+    if output is None:
+        output = str(REPO_DIR / "tmp" / "benchmarks" / f"agent_tools-{datetime.now():%Y%m%d-%H%M%S}-{commit or 'nogit'}.json")
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResults written to {output}")
+
+    if compare:
+        with open(compare, "r", encoding="utf-8") as f:
+            previous = json.load(f)
+        print(f"\nComparison with {previous.get('commit')} ({previous.get('timestamp')}):")
+        for name, r in results.items():
+            old = previous.get("results", {}).get(name)
+            if not old or "error" in old or "error" in r:
+                continue
+            time_ratio = r["seconds_median"] / old["seconds_median"] if old["seconds_median"] else float("nan")
+            memory_delta = r["peak_mb"] - old["peak_mb"]
+            print(f"  {name:<40} time x{time_ratio:.2f}  peak {memory_delta:+.2f} MB")
+
+
+if __name__ == "__main__":
+    typer.run(main)
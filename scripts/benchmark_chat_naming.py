@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+
+"""
+Chat Naming Benchmark
+
+Compares chat titling by the LLM (what TRAP_CHAT_NAMES does for every new conversation) with the
+local keyword/emoji titling of agent_tools.chat_naming.HeuristicChatNamingAgent, which only falls
+back to the LLM when its confidence is below --min-confidence.
+
+Prompts are the `examples` of all profiles plus a built-in set of typical first messages (or the
+lines of --prompts). LLM latency is measured against --llm-url (any OpenAI-compatible endpoint,
+e.g. the mock from scripts/load_test.py or a provider) or modelled with --llm-ms.
+
+Usage:
+  python scripts/benchmark_chat_naming.py --show
+  python scripts/benchmark_chat_naming.py --llm-url http://127.0.0.1:4010/v1 --llm-model mock
+"""
+
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import httpx
+import typer
+import yaml
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from agent_tools.chat_naming import _cached_title, heuristic_title  # noqa: E402
+
+# The system prompt chat-ui sends with naming requests (see TRAP_CHAT_NAMES)
+NAMING_PROMPT = ("You are a summarization AI. Summarize the user's request into a single short sentence of four words "
+                 "or less. Do not try to answer it, only summarize the user's query. Always start your answer with an "
+                 "emoji relevant to the summary")
+
+FIRST_MESSAGES = [
+    "How do I lower my fasting glucose?",
+    "Can you explain what a CGM is?",
+    "What is the dawn phenomenon?",
+    "Compare LSTM and transformer models for glucose forecasting",
+    "hi",
+    "hello, who are you?",
+    "Which datasets are available for CGM research?",
+    "Write a python function that reads a CSV and plots glucose over time",
+    "What does HbA1c measure?",
+    "can you help me",
+    "Summarize the latest research on intermittent fasting and insulin sensitivity",
+    "Is 140 mg/dL after a meal normal?",
+    "What are the founders of GlucoseDAO working on?",
+    "Generate a random 5x5 matrix",
+    "ok thanks",
+    "Explain the Gluformer architecture in simple words",
+    "What should I eat before exercise to avoid hypoglycemia?",
+    "Tell me a joke",
+    "How accurate are glucose prediction models 30 minutes ahead?",
+    "Translate this to German please",
+]
+
+
+def load_prompts(config: str, prompts_file: Optional[str]) -> List[str]:
+    if prompts_file:
+        return [line.strip() for line in Path(prompts_file).read_text(encoding="utf-8").splitlines() if line.strip()]
+    prompts = list(FIRST_MESSAGES)
+    if Path(config).exists():
+        with open(config, "r", encoding="utf-8") as f:
+            agents = (yaml.safe_load(f) or {}).get("agent_profiles") or {}
+        for agent in agents.values():
+            for example in (agent or {}).get("examples") or []:
+                if isinstance(example, dict) and example.get("prompt"):
+                    prompts.append(" ".join(example["prompt"].split()))
+    return prompts
+
+
+def llm_title(client: httpx.Client, url: str, model: str, prompt: str) -> Dict[str, object]:
+    start = time.perf_counter()
+    response = client.post(f"{url.rstrip('/')}/chat/completions", json={
+        "model": model,
+        "messages": [{"role": "system", "content": NAMING_PROMPT}, {"role": "user", "content": prompt}],
+        "temperature": 0.7,
+    })
+    response.raise_for_status()
+    title = response.json()["choices"][0]["message"].get("content") or ""
+    return {"title": title.strip(), "ms": (time.perf_counter() - start) * 1000}
+
+
+def describe(label: str, values: List[float]) -> str:
+    ordered = sorted(values)
+    p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+    return f"  {label:<28} mean {statistics.mean(values):>9.3f} ms  p50 {statistics.median(values):>9.3f} ms  p95 {p95:>9.3f} ms"
+
+
+def main(
+    config: str = typer.Option("chat_agent_profiles.yaml", "--config", "-c", help="Agent profiles YAML whose examples are added to the prompts"),
+    prompts_file: Optional[str] = typer.Option(None, "--prompts", help="Text file with one first message per line (replaces the built-in set)"),
+    min_confidence: float = typer.Option(0.6, "--min-confidence", help="Heuristic confidence needed to skip the LLM"),
+    llm_url: Optional[str] = typer.Option(None, "--llm-url", help="OpenAI-compatible base URL to time real naming calls"),
+    llm_model: str = typer.Option("mock", "--llm-model", help="Model name sent to --llm-url"),
+    api_key: Optional[str] = typer.Option(None, "--api-key", help="Bearer key for --llm-url"),
+    llm_ms: float = typer.Option(450.0, "--llm-ms", help="Modelled LLM naming latency when --llm-url is not set"),
+    repeats: int = typer.Option(1000, "--repeats", help="Heuristic runs per prompt for timing"),
+    show: bool = typer.Option(False, "--show", help="Print every prompt with its local title and confidence")
+) -> None:
+    """Compare LLM chat naming with local heuristic titling and LLM fallback."""
+    prompts = load_prompts(config, prompts_file)
+    print(f"{len(prompts)} prompts, min confidence {min_confidence}")
+
+    cold: List[float] = []
+    warm: List[float] = []
+    decisions = []
+    for prompt in prompts:
+        _cached_title.cache_clear()
+        start = time.perf_counter()
+        title, confidence = heuristic_title(prompt)
+        cold.append((time.perf_counter() - start) * 1000)
+        start = time.perf_counter()
+        for _ in range(repeats):
+            heuristic_title(prompt)
+        warm.append((time.perf_counter() - start) * 1000 / repeats)
+        decisions.append((prompt, title, confidence, confidence >= min_confidence))
+
+    llm: List[float] = []
+    llm_titles: Dict[str, str] = {}
+    if llm_url:
+        headers = {"Authorization": f"Bearer {api_key}"} if api_key else {}
+        with httpx.Client(headers=headers, timeout=60) as client:
+            for prompt in prompts:
+                result = llm_title(client, llm_url, llm_model, prompt)
+                llm.append(result["ms"])
+                llm_titles[prompt] = result["title"]
+    else:
+        llm = [llm_ms] * len(prompts)
+
+    hybrid = [cold[i] if local else cold[i] + llm[i] for i, (_, _, _, local) in enumerate(decisions)]
+    local_count = sum(1 for d in decisions if d[3])
+
+    if show:
+        print()
+        for prompt, title, confidence, local in decisions:
+            marker = "local" if local else "LLM  "
+            llm_part = f"  | LLM: {llm_titles[prompt]}" if prompt in llm_titles else ""
+            print(f"  [{marker} {confidence:.2f}] {title:<42} <- {prompt[:60]}{llm_part}")
+
+    print(f"\nLatency per naming request ({'measured' if llm_url else 'modelled'} LLM):")
+    print(describe("LLM only", llm))
+    print(describe("local + LLM fallback", hybrid))
+    print(describe("heuristic (uncached)", cold))
+    print(describe("heuristic (cached)", warm))
+    print(f"\nUpstream naming calls: {len(prompts)} -> {len(prompts) - local_count} "
+          f"({local_count / len(prompts):.0%} saved)")
+    print(f"Mean naming latency: {statistics.mean(llm):.1f} -> {statistics.mean(hybrid):.1f} ms")
+
+
+if __name__ == "__main__":
+    typer.run(main)
@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+
+"""
+Tool Logging Benchmark
+
+Measures what JustLogBus.log_message costs a tool call under concurrent load, for three ways of
+handling the tools' log events:
+- bus-buffer: no subscriber for tool sources (the default before agent_tools.log_sink), events pile
+  up in the JustLogBus buffer, which is re-dispatched on every publish
+- sync-file: a subscriber that serializes and appends every event to a file in the caller's thread
+- sink: agent_tools.log_sink.LogSink (sampling, bounded buffer, batched background writer)
+
+Each of --threads workers publishes --events tool-like events (sources and actions of data_tools,
+rag_tools and glucose_metrics, with --kinds distinct actions). Per-call latency percentiles,
+throughput and the sink counters are printed and saved as JSON in tmp/benchmarks/.
+
+Usage:
+  python scripts/benchmark_log_sink.py
+  python scripts/benchmark_log_sink.py --threads 1,16,64 --events 10000 --drop-policy drop_newest --capacity 4096
+"""
+
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import typer
+
+REPO_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_DIR))
+from just_agents.just_bus import JustLogBus  # noqa: E402
+from agent_tools.log_sink import DEFAULT_PREFIXES, LogSink  # noqa: E402
+
+SOURCES = ["data_tools.read_file", "data_tools.list_files", "rag_tools.search_documents", "glucose_metrics.glucose_metrics"]
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=REPO_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class SyncFileSubscriber:
+    """Writes every event to a file in the publishing thread, like a plain file log handler."""
+
+    def __init__(self, path: str):
+        self._file = open(path, "a", encoding="utf-8")
+        self._lock = threading.Lock()
+
+    def handle(self, event_name: str, *args: Any, **kwargs: Any) -> None:
+        line = json.dumps({"ts": time.time(), "source": event_name, **kwargs}, default=str)
+        with self._lock:
+            self._file.write(line + "\n")
+            self._file.flush()
+
+    def close(self) -> None:
+        self._file.close()
+
+
+def percentile(values: List[float], q: float) -> float:
+    return values[min(len(values) - 1, int(len(values) * q))]
+
+
+def run_load(threads: int, events: int, kinds: int) -> Dict[str, Any]:
+    latencies: List[List[float]] = [[] for _ in range(threads)]
+    barrier = threading.Barrier(threads + 1)
+
+    def worker(n: int) -> None:
+        own = latencies[n]
+        barrier.wait()
+        for i in range(events):
+            source = SOURCES[i % len(SOURCES)]
+            start = time.perf_counter()
+            JustLogBus.log_message(
+                f"Tool call {i} of worker {n}", source=source, action=f"action_{i % kinds}",
+                path=f"folder/file_{i}.txt", worker=n,
+            )
+            own.append(time.perf_counter() - start)
+
+    pool = [threading.Thread(target=worker, args=(n,)) for n in range(threads)]
+    for thread in pool:
+        thread.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for thread in pool:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    ordered = sorted(v for own in latencies for v in own)
+    return {
+        "calls": len(ordered),
+        "seconds": elapsed,
+        "calls_per_second": len(ordered) / elapsed,
+        "p50_us": percentile(ordered, 0.50) * 1e6,
+        "p99_us": percentile(ordered, 0.99) * 1e6,
+        "p999_us": percentile(ordered, 0.999) * 1e6,
+        "max_us": ordered[-1] * 1e6,
+    }
+
+
+def main(
+    threads: str = typer.Option("1,16,64", "--threads", help="Comma-separated numbers of concurrent publishing threads"),
+    events: int = typer.Option(2000, "--events", help="Events published per thread"),
+    kinds: int = typer.Option(4, "--kinds", help="Distinct actions per source (fewer kinds means more sampling)"),
+    modes: str = typer.Option("bus-buffer,sync-file,sink", "--modes", help="Comma-separated modes to run"),
+    capacity: int = typer.Option(65536, "--capacity", help="Sink buffer capacity"),
+    drop_policy: str = typer.Option("drop_oldest", "--drop-policy", help="Sink drop policy: drop_oldest, drop_newest or block"),
+    sample_burst: int = typer.Option(50, "--sample-burst", help="Sink: events of one kind kept per window before sampling"),
+    sample_every: int = typer.Option(100, "--sample-every", help="Sink: keep one in this many events above the burst"),
+    output: Optional[str] = typer.Option(None, "--output", "-o", help="Result JSON path (default: tmp/benchmarks/log_sink-<time>-<commit>.json)")
+) -> None:
+    """Compare tool log handling strategies by per-call latency under concurrent load."""
+    bus = JustLogBus()
+    workdir = tempfile.mkdtemp(prefix="log_sink_bench_")
+    results: Dict[str, Dict[str, Any]] = {}
+    for mode in [m.strip() for m in modes.split(",")]:
+        for thread_count in [int(t) for t in threads.split(",")]:
+            bus._buffer.clear()
+            subscriber: Any = None
+            if mode == "sync-file":
+                subscriber = SyncFileSubscriber(os.path.join(workdir, "sync.jsonl"))
+            elif mode == "sink":
+                subscriber = LogSink(
+                    os.path.join(workdir, "sink.jsonl"), capacity=capacity, drop_policy=drop_policy,
+                    sample_burst=sample_burst, sample_every=sample_every,
+                )
+            elif mode != "bus-buffer":
+                raise typer.BadParameter(f"Unknown mode {mode}")
+            if subscriber is not None:
+                for prefix in DEFAULT_PREFIXES:
+                    bus.subscribe(prefix, subscriber.handle)
+            try:
+                result = run_load(thread_count, events, kinds)
+            finally:
+                if subscriber is not None:
+                    for prefix in DEFAULT_PREFIXES:
+                        bus.unsubscribe(prefix, subscriber.handle)
+                    subscriber.close()
+            if isinstance(subscriber, LogSink):
+                result["sink"] = subscriber.stats()
+            name = f"{mode} x{thread_count}"
+            results[name] = result
+            extra = ""
+            if "sink" in result:
+                s = result["sink"]
+                extra = f"  written {s['written']} dropped {s['dropped']} sampled out {s['sampled_out']}"
+            print(f"  {name:<16} {result['calls_per_second']:>10.0f} calls/s  p50 {result['p50_us']:>8.1f} us  "
+                  f"p99 {result['p99_us']:>8.1f} us  p99.9 {result['p999_us']:>9.1f} us  max {result['max_us']:>9.1f} us{extra}")
+
+    commit = git_commit()
+    report = {
+        "commit": commit,
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "parameters": {"events": events, "kinds": kinds, "capacity": capacity, "drop_policy": drop_policy,
+                       "sample_burst": sample_burst, "sample_every": sample_every},
+        "results": results,
+    }
+    if output is None:
+        output = str(REPO_DIR / "tmp" / "benchmarks" / f"log_sink-{datetime.now():%Y%m%d-%H%M%S}-{commit or 'nogit'}.json")
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResults written to {output}")
+
+
+if __name__ == "__main__":
+    typer.run(main)
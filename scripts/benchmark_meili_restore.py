@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+
+"""
+Meilisearch Restore Startup Benchmark
+
+Starts Meilisearch on an empty database the way a fresh deployment does and measures the time
+until /health answers, for each restore mode:
+- dump: --import-dump dumps/just_chat_rag.dump (documents are re-indexed, and re-embedded unless
+  their vectors are user-provided)
+- snapshot: --import-snapshot dumps/just_chat_rag.snapshot (the database files are unpacked as they are)
+
+Meilisearch imports before it starts serving, so the time to a healthy instance is the restore time.
+After each start the document count of every index is read, to check that both modes restore the same data.
+Meilisearch runs either from a local binary (--meilisearch-bin) or in a container (--docker-image);
+snapshots only restore on the Meilisearch version that created them.
+Results are saved as JSON in tmp/benchmarks/.
+
+Usage:
+  python scripts/benchmark_meili_restore.py --meilisearch-bin ./meilisearch
+  python scripts/benchmark_meili_restore.py --docker-image getmeili/meilisearch:v1.26.0 --runs 3
+  python scripts/benchmark_meili_restore.py --docker-image getmeili/meilisearch:v1.26.0 --container-cli podman --modes snapshot
+"""
+
+import json
+import os
+import platform
+import shutil
+import socket
+import statistics
+import subprocess
+import tempfile
+import time
+import urllib.error
+import urllib.request
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import typer
+
+REPO_DIR = Path(__file__).resolve().parent.parent
+MASTER_KEY = "benchmark_master_key"
+IMPORT_FLAGS = {"dump": "--import-dump", "snapshot": "--import-snapshot"}
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=REPO_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def get_json(url: str, timeout: float = 2.0) -> Any:
+    request = urllib.request.Request(url, headers={"Authorization": f"Bearer {MASTER_KEY}"})
+    with urllib.request.urlopen(request, timeout=timeout) as response:
+        return json.loads(response.read())
+
+
+def restore_command(mode: str, source: str, port: int, db_dir: str, meilisearch_bin: Optional[str],
+                    docker_image: Optional[str], container_cli: str, container_name: str) -> List[str]:
+    options = ["--master-key", MASTER_KEY, "--no-analytics", "--env", "development"]
+    if docker_image:
+        return [container_cli, "run", "--rm", "--name", container_name, "-p", f"127.0.0.1:{port}:7700",
+                "-v", f"{os.path.dirname(source)}:/restore:ro,z", docker_image,
+                "meilisearch", "--db-path", "/meili_data/data.ms", *options,
+                IMPORT_FLAGS[mode], f"/restore/{os.path.basename(source)}"]
+    return [meilisearch_bin or "meilisearch", "--db-path", os.path.join(db_dir, "data.ms"),
+            "--http-addr", f"127.0.0.1:{port}", *options, IMPORT_FLAGS[mode], source]
+
+
+def run_restore(mode: str, source: str, meilisearch_bin: Optional[str], docker_image: Optional[str],
+                container_cli: str, timeout: float) -> Dict[str, Any]:
+    """Start Meilisearch on an empty database restoring from source, return the time to healthy and the document counts."""
+    port = free_port()
+    db_dir = tempfile.mkdtemp(prefix="meili_restore_")
+    container_name = f"meili-restore-{mode}-{os.getpid()}-{port}"
+    command = restore_command(mode, source, port, db_dir, meilisearch_bin, docker_image, container_cli, container_name)
+    log_path = os.path.join(db_dir, "meilisearch.log")
+    started = time.perf_counter()
+    with open(log_path, "wb") as log:
+        process = subprocess.Popen(command, stdout=log, stderr=subprocess.STDOUT)
+    healthy_s: Optional[float] = None
+    documents: Dict[str, int] = {}
+    try:
+        while time.perf_counter() - started < timeout and process.poll() is None:
+            try:
+                if get_json(f"http://127.0.0.1:{port}/health").get("status") == "available":
+                    healthy_s = time.perf_counter() - started
+                    break
+            except (OSError, ValueError):
+                pass
+            time.sleep(0.05)
+        if healthy_s is not None:
+            stats = get_json(f"http://127.0.0.1:{port}/stats", timeout=30.0)
+            documents = {uid: index["numberOfDocuments"] for uid, index in stats.get("indexes", {}).items()}
+        else:
+            with open(log_path, "rb") as log:
+                tail = log.read()[-2000:].decode("utf-8", "replace")
+            print(f"    {mode} did not become healthy (exit code {process.poll()}):\n{tail}")
+    finally:
+        if docker_image:
+            subprocess.run([container_cli, "stop", "-t", "1", container_name], capture_output=True)
+        process.terminate()
+        try:
+            process.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            process.kill()
+        shutil.rmtree(db_dir, ignore_errors=True)
+    return {"healthy_s": round(healthy_s, 3) if healthy_s is not None else None, "documents": documents}
+
+
+def main(
+    dump: str = typer.Option("dumps/just_chat_rag.dump", "--dump", help="Dump restored in dump mode"),
+    snapshot: str = typer.Option("dumps/just_chat_rag.snapshot", "--snapshot", help="Snapshot restored in snapshot mode (scripts/meilisearch_dump.py --snapshot --update-import)"),
+    modes: str = typer.Option("dump,snapshot", "--modes", help="Comma-separated restore modes to run"),
+    runs: int = typer.Option(3, "--runs", help="Cold starts per mode"),
+    meilisearch_bin: Optional[str] = typer.Option(None, "--meilisearch-bin", help="Meilisearch binary (default: meilisearch on PATH)"),
+    docker_image: Optional[str] = typer.Option(None, "--docker-image", help="Run Meilisearch in this container image instead of a local binary"),
+    container_cli: str = typer.Option("docker", "--container-cli", help="docker or podman"),
+    timeout: float = typer.Option(3600.0, "--timeout", help="Seconds to wait for a restored instance to become healthy"),
+    output: Optional[str] = typer.Option(None, "--output", "-o", help="Result JSON path (default: tmp/benchmarks/meili-restore-<time>-<commit>.json)")
+) -> None:
+    """Compare Meilisearch cold start times restoring from a dump and from a snapshot."""
+    sources = {"dump": dump, "snapshot": snapshot}
+    results: Dict[str, Any] = {}
+    for mode in [m.strip() for m in modes.split(",")]:
+        if mode not in sources:
+            raise typer.BadParameter(f"Unknown mode {mode}")
+        source = os.path.abspath(sources[mode])
+        if not os.path.isfile(source):
+            print(f"  {mode:<9} skipped, {source} not found")
+            continue
+        attempts = []
+        for run in range(runs):
+            attempt = run_restore(mode, source, meilisearch_bin, docker_image, container_cli, timeout)
+            attempts.append(attempt)
+            print(f"  {mode:<9} run {run + 1}: healthy after {attempt['healthy_s'] or float('nan'):>8.2f} s, "
+                  f"{sum(attempt['documents'].values())} documents in {len(attempt['documents'])} indexes")
+        times = [a["healthy_s"] for a in attempts if a["healthy_s"] is not None]
+        results[mode] = {
+            "source": source,
+            "size_bytes": os.path.getsize(source),
+            "runs": attempts,
+            "median_s": round(statistics.median(times), 3) if times else None,
+            "min_s": round(min(times), 3) if times else None,
+            "documents": attempts[-1]["documents"],
+        }
+
+    print()
+    for mode, result in results.items():
+        print(f"  {mode:<9} {result['size_bytes'] / 1024 ** 2:>9.1f} MB  median {result['median_s'] or float('nan'):>8.2f} s  "
+              f"min {result['min_s'] or float('nan'):>8.2f} s")
+    if results.get("dump", {}).get("median_s") and results.get("snapshot", {}).get("median_s"):
+        print(f"  snapshot restore is {results['dump']['median_s'] / results['snapshot']['median_s']:.1f}x faster")
+        if results["dump"]["documents"] != results["snapshot"]["documents"]:
+            print("  ⚠️ dump and snapshot restore different document counts, the snapshot may be out of date")
+
+    commit = git_commit()
+    report = {
+        "commit": commit,
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "parameters": {"runs": runs, "meilisearch_bin": meilisearch_bin, "docker_image": docker_image},
+        "results": results,
+    }
+    if output is None:
+        output = str(REPO_DIR / "tmp" / "benchmarks" / f"meili-restore-{datetime.now():%Y%m%d-%H%M%S}-{commit or 'nogit'}.json")
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResults written to {output}")
+
+
+if __name__ == "__main__":
+    typer.run(main)
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+
+"""
+Prompt Prefix Cache Benchmark
+
+Shows how the ordering of prompt_tools output affects provider/proxy prompt (KV) caching.
+Prompts are assembled like just-agents does on every completion: the profile's system prompt
+followed by "Result of <tool>(<args>) tool execution:" and the tool output, then a user message.
+
+Two scenarios are compared against a local prefix-caching stub (block-based, like vLLM/provider
+prompt caches: a block is reused only if every block before it matched):
+- filesystem order: directory entries in one fixed unsorted order, as `directory.iterdir()` returns
+  them; --orders N spreads the requests round-robin over N different fixed orders, like workers,
+  replicas or a rewritten directory that list the same folder in different orders
+- canonical: the sorted output list_files produces now
+
+Usage:
+  python scripts/benchmark_prompt_cache.py --data-dir data --requests 500
+  python scripts/benchmark_prompt_cache.py --data-dir data --requests 500 --orders 4
+"""
+
+import hashlib
+import random
+import statistics
+import sys
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List
+
+import typer
+import yaml
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from agent_tools.data_tools import _build_tree  # noqa: E402
+
+
+class PrefixCacheStub:
+    """Block-level prompt prefix cache with LRU eviction and a linear prefill latency model."""
+
+    def __init__(self, block_chars: int = 256, capacity_blocks: int = 100000,
+                 base_ms: float = 50.0, prefill_ms_per_token: float = 0.05, chars_per_token: float = 4.0):
+        self.block_chars = block_chars
+        self.capacity_blocks = capacity_blocks
+        self.base_ms = base_ms
+        self.prefill_ms_per_token = prefill_ms_per_token
+        self.chars_per_token = chars_per_token
+        self.blocks: "OrderedDict[str, None]" = OrderedDict()
+
+    def complete(self, prompt: str) -> Dict[str, float]:
+        """Simulate a completion request, returning cached characters and time to first token."""
+        cached_chars = 0
+        prefix_hash = ""
+        matching = True
+        for start in range(0, len(prompt), self.block_chars):
+            block = prompt[start:start + self.block_chars]
+            prefix_hash = hashlib.sha1(f"{prefix_hash}{block}".encode("utf-8")).hexdigest()
+            if matching and prefix_hash in self.blocks and len(block) == self.block_chars:
+                cached_chars += len(block)
+                self.blocks.move_to_end(prefix_hash)
+            else:
+                matching = False
+                self.blocks[prefix_hash] = None
+        while len(self.blocks) > self.capacity_blocks:
+            self.blocks.popitem(last=False)
+        uncached_tokens = (len(prompt) - cached_chars) / self.chars_per_token
+        return {
+            "cached_chars": cached_chars,
+            "total_chars": len(prompt),
+            "ttft_ms": self.base_ms + uncached_tokens * self.prefill_ms_per_token,
+        }
+
+
+def shuffled_tree(tree: Dict[str, Any], rng: random.Random) -> Dict[str, Any]:
+    """Same tree with directory entries in random order (file entries keep their field order)."""
+    items = list(tree.items())
+    rng.shuffle(items)
+    return {
+        name: value if value.get("type") == "file" else shuffled_tree(value, rng)
+        for name, value in items
+    }
+
+
+def build_prompt(system_prompt: str, tool_name: str, call_arguments: Dict[str, Any], tool_output: Any, user_message: str) -> str:
+    """Mirror just_agents BaseAgent.dynamic_prompt followed by the user turn."""
+    prompt = system_prompt
+    prompt += f"\nResult of {tool_name}({call_arguments}) tool execution:\n{tool_output}\n\n"
+    return f"{prompt}\nUSER: {user_message}"
+
+
+def run_scenario(label: str, prompts: List[str], stub: PrefixCacheStub) -> Dict[str, float]:
+    results = [stub.complete(p) for p in prompts]
+    ttft = sorted(r["ttft_ms"] for r in results)
+    cached = sum(r["cached_chars"] for r in results)
+    total = sum(r["total_chars"] for r in results)
+    stats = {
+        "hit_rate": cached / total if total else 0.0,
+        "ttft_mean": statistics.mean(ttft),
+        "ttft_p50": ttft[len(ttft) // 2],
+        "ttft_p95": ttft[min(len(ttft) - 1, int(len(ttft) * 0.95))],
+    }
+    print(f"\n{label}:")
+    print(f"  Prefix cache hit rate: {stats['hit_rate']:.1%} of prompt characters")
+    print(f"  Time to first token: mean {stats['ttft_mean']:.1f} ms, p50 {stats['ttft_p50']:.1f} ms, p95 {stats['ttft_p95']:.1f} ms")
+    return stats
+
+
+def main(
+    data_dir: str = typer.Option("data", "--data-dir", help="Folder listed by the prompt tool"),
+    config: str = typer.Option("chat_agent_profiles.yaml", "--config", "-c", help="Agent profiles YAML"),
+    profile: str = typer.Option("sugar_genie", "--profile", help="Profile whose system prompt and examples are used"),
+    requests: int = typer.Option(500, "--requests", "-n", help="Number of simulated completions per scenario"),
+    block_chars: int = typer.Option(256, "--block-chars", help="Cache block size in characters (~64 tokens)"),
+    base_ms: float = typer.Option(50.0, "--base-ms", help="Fixed time to first token in ms"),
+    prefill_ms_per_token: float = typer.Option(0.05, "--prefill-ms-per-token", help="Prefill cost of each uncached token"),
+    orders: int = typer.Option(1, "--orders", help="Distinct fixed unsorted listing orders the requests are spread over (1: a single order)"),
+    seed: int = typer.Option(42, "--seed", help="Random seed")
+) -> None:
+    """Compare prefix cache hit rate and time to first token for unordered vs canonical prompt_tools output."""
+    with open(config, "r", encoding="utf-8") as f:
+        agent = ((yaml.safe_load(f) or {}).get("agent_profiles") or {}).get(profile) or {}
+    system_prompt = agent.get("system_prompt", "")
+    examples = [e["prompt"] for e in agent.get("examples") or [] if isinstance(e, dict) and e.get("prompt")] or ["Hello"]
+    call_arguments = {"show_all": False, "subdir": None, "as_json": True}
+    for tool in agent.get("prompt_tools") or []:
+        if tool.get("function") == "list_files":
+            call_arguments = tool.get("call_arguments") or call_arguments
+
+    root = Path(data_dir)
+    subdir = call_arguments.get("subdir")
+    start = time.perf_counter()
+    tree = _build_tree(root / subdir if subdir else root, root, bool(call_arguments.get("show_all")))
+    build_ms = (time.perf_counter() - start) * 1000
+    print(f"Profile: {profile}, listing {root / subdir if subdir else root} ({build_ms:.2f} ms to build the tree)")
+    print(f"Requests per scenario: {requests}, unsorted orders: {max(1, orders)}, block: {block_chars} chars, prefill: {prefill_ms_per_token} ms/token")
+
+    rng = random.Random(seed)
+    users = [rng.choice(examples) for _ in range(requests)]
+    # each order is shuffled once and stays fixed, like the iterdir order of one worker
+    listings = [shuffled_tree(tree, rng) for _ in range(max(1, orders))]
+    unordered = [
+        build_prompt(system_prompt, "list_files", call_arguments, listings[i % len(listings)], u) for i, u in enumerate(users)
+    ]
+    canonical = [build_prompt(system_prompt, "list_files", call_arguments, tree, u) for u in users]
+
+    before = run_scenario("FILESYSTEM ORDER (unsorted iterdir)", unordered, PrefixCacheStub(block_chars, base_ms=base_ms, prefill_ms_per_token=prefill_ms_per_token))
+    after = run_scenario("CANONICAL (sorted list_files output)", canonical, PrefixCacheStub(block_chars, base_ms=base_ms, prefill_ms_per_token=prefill_ms_per_token))
+    print(f"\nHit rate: {before['hit_rate']:.1%} -> {after['hit_rate']:.1%}, "
+          f"mean TTFT: {before['ttft_mean']:.1f} -> {after['ttft_mean']:.1f} ms")
+
+
+if __name__ == "__main__":
+    typer.run(main)
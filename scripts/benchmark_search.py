@@ -0,0 +1,282 @@
+#!/usr/bin/env python3
+
+"""
+RAG Search Latency & Relevance Benchmark
+
+Runs a query set against a Meilisearch RAG index for every combination of:
+- embedding mode: local (sentence-transformers model of EMBEDDING_MODEL) or remote (Jina API, needs JINA_API_KEY)
+- semantic ratio: 0.0 is keyword only (no query embedding), 1.0 is vector only
+- limit: number of hits requested
+- concurrency: searches in flight at once
+
+Queries are the `examples` prompts of the profiles (--profile) plus --queries files:
+- .txt: one query per line
+- .jsonl: {"query": "...", "relevant": ["source", ...]} per line, "relevant" is optional
+
+Queries with "relevant" sources form the labelled set. A hit matches a label when its `source` equals
+the label or ends with "/<label>". Recall@limit is the share of labelled sources found in the hits.
+
+Query embeddings are computed once per mode and timed separately from the searches, which run
+directly against the index (the result and embedding caches of agent_tools.rag_tools are bypassed).
+For each configuration the script reports:
+- search p50/p99: Meilisearch round trips
+- cold p50/p99: embedding plus search, what an uncached query costs
+- throughput in searches per second
+- recall on the labelled set
+Finally it recommends the fastest configuration whose recall is within --recall-tolerance of the best.
+Results are saved as JSON in tmp/benchmarks/.
+
+Usage:
+  python scripts/benchmark_search.py --index glucosedao --queries data/search_labels.jsonl
+  python scripts/benchmark_search.py --index glucosedao --ratios 0,0.5,1 --limits 5 --embeddings local,remote --concurrency 1,16
+"""
+
+import json
+import os
+import platform
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import typer
+import yaml
+
+REPO_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_DIR / "scripts"))
+from load_test import percentile  # noqa: E402
+
+Query = Dict[str, Any]  # {"query": str, "relevant": Optional[List[str]]}
+SearchFn = Callable[[str, Optional[List[float]], int, float], List[str]]
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=REPO_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def load_queries(config: str, profiles: List[str], files: List[str]) -> List[Query]:
+    """Profile example prompts plus queries from .txt/.jsonl files, labelled ones keep their relevant sources."""
+    queries: Dict[str, Query] = {}
+    if profiles:
+        with open(config, "r", encoding="utf-8") as f:
+            agent_profiles = (yaml.safe_load(f) or {}).get("agent_profiles") or {}
+        for profile in profiles:
+            for example in (agent_profiles.get(profile) or {}).get("examples") or []:
+                prompt = example.get("prompt") if isinstance(example, dict) else None
+                if prompt and prompt.strip():
+                    queries.setdefault(prompt.strip(), {"query": prompt.strip(), "relevant": None})
+    for path in files:
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                if path.endswith(".jsonl"):
+                    entry = json.loads(line)
+                    text = entry["query"].strip()
+                    relevant = entry.get("relevant")
+                    queries[text] = {"query": text, "relevant": list(relevant) if relevant else None}
+                else:
+                    queries.setdefault(line.strip(), {"query": line.strip(), "relevant": None})
+    return list(queries.values())
+
+
+def recall(sources: List[str], relevant: List[str]) -> float:
+    found = sum(1 for label in relevant if any(s == label or s.endswith(f"/{label}") for s in sources))
+    return found / len(relevant)
+
+
+def embed_all(queries: List[Query], embed: Callable[[str], List[float]]) -> Tuple[Dict[str, List[float]], Dict[str, float]]:
+    """Embed every query once, returning the vectors and the embedding time per query in ms."""
+    vectors: Dict[str, List[float]] = {}
+    times: Dict[str, float] = {}
+    for q in queries:
+        start = time.perf_counter()
+        vectors[q["query"]] = embed(q["query"])
+        times[q["query"]] = (time.perf_counter() - start) * 1000
+    return vectors, times
+
+
+def run_config(search: SearchFn, queries: List[Query], vectors: Optional[Dict[str, List[float]]],
+               embed_ms: Dict[str, float], limit: int, ratio: float, concurrency: int, repeats: int) -> Dict[str, Any]:
+    """Run every query `repeats` times with `concurrency` searches in flight."""
+    search_ms: List[float] = []
+    cold_ms: List[float] = []
+    recalls: List[float] = []
+    errors: Dict[str, int] = {}
+    lock = threading.Lock()
+
+    def one(q: Query, first: bool) -> None:
+        vector = vectors[q["query"]] if vectors is not None else None
+        start = time.perf_counter()
+        try:
+            sources = search(q["query"], vector, limit, ratio)
+        except Exception as e:
+            with lock:
+                errors[type(e).__name__] = errors.get(type(e).__name__, 0) + 1
+            return
+        elapsed = (time.perf_counter() - start) * 1000
+        with lock:
+            search_ms.append(elapsed)
+            cold_ms.append(elapsed + embed_ms.get(q["query"], 0.0))
+            if first and q["relevant"]:
+                recalls.append(recall(sources, q["relevant"]))
+
+    jobs = [(q, r == 0) for r in range(repeats) for q in queries]
+    began = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for q, first in jobs:
+            pool.submit(one, q, first)
+    elapsed = time.perf_counter() - began
+    return {
+        "searches": len(search_ms),
+        "errors": errors,
+        "search_p50_ms": round(percentile(search_ms, 50), 2) if search_ms else None,
+        "search_p99_ms": round(percentile(search_ms, 99), 2) if search_ms else None,
+        "cold_p50_ms": round(percentile(cold_ms, 50), 2) if cold_ms else None,
+        "cold_p99_ms": round(percentile(cold_ms, 99), 2) if cold_ms else None,
+        "throughput_qps": round(len(search_ms) / elapsed, 1) if elapsed > 0 else None,
+        "recall": round(sum(recalls) / len(recalls), 4) if recalls else None,
+        "labelled": len(recalls),
+    }
+
+
+def recommend(rows: List[Dict[str, Any]], tolerance: float) -> Optional[Dict[str, Any]]:
+    """Fastest single-client configuration (by cold p50) whose recall is within tolerance of the best recall."""
+    candidates = [r for r in rows if r["concurrency"] == min(x["concurrency"] for x in rows) and r["cold_p50_ms"] is not None]
+    with_recall = [r for r in candidates if r["recall"] is not None]
+    if with_recall:
+        best = max(r["recall"] for r in with_recall)
+        candidates = [r for r in with_recall if r["recall"] >= best - tolerance]
+    return min(candidates, key=lambda r: r["cold_p50_ms"], default=None)
+
+
+def make_backend(index: str, host: str, port: int, api_key: str) -> Tuple[SearchFn, Dict[str, Callable[[str], List[float]]]]:
+    """Search function and query embedders of an index, configured like agent_tools.rag_tools._get_rag."""
+    from just_semantic_search.meili.rag import EmbeddingModel, MeiliRAG
+    from just_semantic_search.remote.jina import jina_embed_query
+
+    rag = MeiliRAG.get_instance(
+        host=host,
+        port=port,
+        api_key=api_key,
+        index_name=index,
+        model=EmbeddingModel(os.getenv("EMBEDDING_MODEL", EmbeddingModel.JINA_EMBEDDINGS_V3.value)),
+    )
+
+    def search(query: str, vector: Optional[List[float]], limit: int, ratio: float) -> List[str]:
+        hits = rag.search(query, vector=vector, limit=limit, semanticRatio=ratio).hits
+        return list(dict.fromkeys(h.get("source", "") for h in hits))  # fragments of one source count once
+
+    embedders = {
+        "local": lambda q: rag.sentence_transformer.encode(q, **rag.embedding_model_params.retrival_query).tolist(),
+        "remote": jina_embed_query,
+    }
+    return search, embedders
+
+
+def floats(value: str) -> List[float]:
+    return [float(v) for v in value.split(",") if v.strip()]
+
+
+def ints(value: str) -> List[int]:
+    return [int(v) for v in value.split(",") if v.strip()]
+
+
+def main(
+    index: str = typer.Option("glucosedao", "--index", help="Meilisearch RAG index to search"),
+    config: str = typer.Option(str(REPO_DIR / "chat_agent_profiles.yaml"), "--config", "-c", help="Agent profiles YAML"),
+    profiles: str = typer.Option("sugar_genie", "--profile", help="Comma-separated profiles whose examples prompts are queries (empty: none)"),
+    queries_files: List[str] = typer.Option([], "--queries", help=".txt (one query per line) or .jsonl ({query, relevant}) query files, repeatable"),
+    ratios: str = typer.Option("0.0,0.25,0.5,0.75,1.0", "--ratios", help="Comma-separated semantic ratios"),
+    limits: str = typer.Option("5,8", "--limits", help="Comma-separated limits"),
+    embeddings: str = typer.Option("local", "--embeddings", help="Comma-separated embedding modes: local, remote"),
+    concurrency: str = typer.Option("1,8", "--concurrency", help="Comma-separated numbers of concurrent searches"),
+    repeats: int = typer.Option(3, "--repeats", help="Runs of the query set per configuration"),
+    recall_tolerance: float = typer.Option(0.02, "--recall-tolerance", help="Recall below the best that still counts as accurate"),
+    host: str = typer.Option(os.getenv("MEILISEARCH_HOST", "127.0.0.1"), "--host", help="Meilisearch host (MEILISEARCH_HOST)"),
+    port: int = typer.Option(int(os.getenv("MEILISEARCH_PORT", 7700)), "--port", help="Meilisearch port (MEILISEARCH_PORT)"),
+    api_key: str = typer.Option(os.getenv("MEILISEARCH_API_KEY", "fancy_master_key"), "--api-key", help="Meilisearch API key (MEILISEARCH_API_KEY)"),
+    output: Optional[str] = typer.Option(None, "--output", "-o", help="Result JSON path (default: tmp/benchmarks/search-<time>-<commit>.json)")
+) -> None:
+    """Measure search latency, throughput and recall across semantic ratios, limits and embedding modes."""
+    queries = load_queries(config, [p.strip() for p in profiles.split(",") if p.strip()], queries_files)
+    if not queries:
+        raise typer.BadParameter("No queries: use --profile with examples or --queries files")
+    labelled = sum(1 for q in queries if q["relevant"])
+    print(f"{len(queries)} queries ({labelled} labelled) against index {index} at {host}:{port}")
+
+    search, embedders = make_backend(index, host, port, api_key)
+    modes = [m.strip() for m in embeddings.split(",") if m.strip()]
+    for mode in modes:
+        if mode not in embedders:
+            raise typer.BadParameter(f"Unknown embedding mode {mode}")
+    if "remote" in modes and not os.getenv("JINA_API_KEY"):
+        print("JINA_API_KEY is not set, skipping remote embeddings")
+        modes.remove("remote")
+
+    # warm up the connection and the local model before anything is timed
+    search(queries[0]["query"], None, 1, 0.0)
+    embed_stats: Dict[str, Any] = {}
+    vectors: Dict[str, Tuple[Dict[str, List[float]], Dict[str, float]]] = {}
+    for mode in modes:
+        embedders[mode](queries[0]["query"])
+        vectors[mode] = embed_all(queries, embedders[mode])
+        times = list(vectors[mode][1].values())
+        embed_stats[mode] = {"p50_ms": round(percentile(times, 50), 2), "p99_ms": round(percentile(times, 99), 2)}
+        print(f"  {mode} embedding p50 {embed_stats[mode]['p50_ms']:.1f} ms, p99 {embed_stats[mode]['p99_ms']:.1f} ms")
+
+    rows: List[Dict[str, Any]] = []
+    print(f"\n  {'embedding':<9} {'ratio':>5} {'limit':>5} {'conc':>4} {'search p50':>11} {'p99':>8} "
+          f"{'cold p50':>9} {'p99':>8} {'qps':>7} {'recall':>7}")
+    for ratio in floats(ratios):
+        # keyword-only search does not embed the query, one row covers every embedding mode
+        for mode in (["none"] if ratio == 0.0 else modes):
+            query_vectors, embed_ms = vectors[mode] if mode != "none" else (None, {})
+            for limit in ints(limits):
+                for workers in ints(concurrency):
+                    row = {"embedding": mode, "semantic_ratio": ratio, "limit": limit, "concurrency": workers,
+                           **run_config(search, queries, query_vectors, embed_ms, limit, ratio, workers, repeats)}
+                    rows.append(row)
+                    recall_str = f"{row['recall']:.3f}" if row["recall"] is not None else "-"
+                    print(f"  {mode:<9} {ratio:>5.2f} {limit:>5} {workers:>4} {row['search_p50_ms'] or 0:>8.1f} ms "
+                          f"{row['search_p99_ms'] or 0:>8.1f} {row['cold_p50_ms'] or 0:>6.1f} ms {row['cold_p99_ms'] or 0:>8.1f} "
+                          f"{row['throughput_qps'] or 0:>7.1f} {recall_str:>7}")
+
+    best = recommend(rows, recall_tolerance)
+    if best:
+        recall_str = f", recall {best['recall']:.3f}" if best["recall"] is not None else " (no labelled queries, latency only)"
+        mode_str = "keyword only" if best["embedding"] == "none" else f"{best['embedding']} embedding"
+        print(f"\nFastest accurate configuration: {mode_str}, semantic_ratio {best['semantic_ratio']}, "
+              f"limit {best['limit']}: cold p50 {best['cold_p50_ms']:.1f} ms{recall_str}")
+
+    commit = git_commit()
+    report = {
+        "commit": commit,
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "parameters": {"index": index, "queries": len(queries), "labelled": labelled, "repeats": repeats,
+                       "recall_tolerance": recall_tolerance},
+        "embedding": embed_stats,
+        "results": rows,
+        "recommended": best,
+    }
+    if output is None:
+        output = str(REPO_DIR / "tmp" / "benchmarks" / f"search-{datetime.now():%Y%m%d-%H%M%S}-{commit or 'nogit'}.json")
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResults written to {output}")
+
+
+if __name__ == "__main__":
+    typer.run(main)
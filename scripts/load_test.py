@@ -0,0 +1,703 @@
+#!/usr/bin/env python3
+
+"""
+End-to-end Load Test Harness
+
+Measures how the agent stack behaves at 50-500 concurrent chats without spending real LLM quota.
+Three commands:
+- mock-llm: OpenAI-compatible /v1/chat/completions server that answers with scripted tool calls
+  (search_documents, generate_random_matrix, ...) on the first turn and a text answer after the tool
+  results, with configurable time to first token, prefill cost and tokens/s (streaming supported),
+  and optional provider rate limits (--rpm-limit/--tpm-limit answer 429 like Groq or OpenAI)
+- mock-search: stub of the Meilisearch API subset used by the agents (search, tasks, stats, indexes,
+  settings updates), returning keyword-ranked fragments of the files in --data-dir
+- run: replays the `examples` prompts of chat_agent_profiles.yaml against the agent server at one or
+  more concurrency levels and reports p50/p95/p99 turn latency, throughput and a per-stage breakdown
+  (LLM, search and agent overhead) taken from the /_mock/stats endpoints of both mocks
+
+Start the stack against the mocks with the compose override:
+  docker compose -f docker-compose.yml -f docker-compose.loadtest.yml up -d just-chat-agents mock-llm mock-search
+  python scripts/load_test.py run --concurrency 50,200,500
+
+Or locally, in three terminals:
+  python scripts/load_test.py mock-llm --port 4010
+  python scripts/load_test.py mock-search --port 7710 --data-dir data/glucose_txt
+  python scripts/load_test.py run --agent-url http://127.0.0.1:8091 --concurrency 50
+"""
+
+import asyncio
+import json
+import os
+import random
+import re
+import subprocess
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+import httpx
+import typer
+import yaml
+
+REPO_DIR = Path(__file__).resolve().parent.parent
+
+app = typer.Typer(help="Load test the agent server with a mock LLM and a mock search backend")
+
+ANSWER_WORDS = (
+    "glucose prediction models help people with diabetes anticipate highs and lows using continuous "
+    "monitoring data sources show that transformer and recurrent architectures reach good accuracy"
+).split()
+
+# Arguments the mock LLM uses when a profile exposes the tool; "{prompt}" is replaced by the user message
+DEFAULT_TOOL_SCRIPT: Dict[str, Dict[str, Any]] = {
+    "search_documents": {"query": "{prompt}", "index": "glucosedao", "limit": 5, "semantic_ratio": 0.0,
+                         "debug": True, "remote_embedding": True},
+    "generate_random_matrix": {"rows": 3, "cols": 4},
+    "summarize_dataframe": {"data": {"A": [1, 2, 3, 4, 5], "B": [10, 20, 30, 40, 50]}},
+}
+
+
+def percentile(values: List[float], q: float) -> Optional[float]:
+    """Nearest-rank percentile (q in 0..100), None for an empty list."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, int(round(q / 100 * len(ordered) + 0.5)) - 1))]
+
+
+def now_iso() -> str:
+    return datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
+
+
+class StageStats:
+    """Thread-safe duration samples per stage, served by the mocks on GET /_mock/stats."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._samples: Dict[str, List[float]] = {}
+        self._counters: Dict[str, int] = {}
+
+    def record(self, stage: str, ms: float, **counters: int) -> None:
+        with self._lock:
+            self._samples.setdefault(stage, []).append(ms)
+            for name, value in counters.items():
+                self._counters[name] = self._counters.get(name, 0) + value
+
+    def reset(self) -> None:
+        with self._lock:
+            self._samples.clear()
+            self._counters.clear()
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            stages = {
+                stage: {
+                    "count": len(samples),
+                    "total_ms": round(sum(samples), 2),
+                    **{f"p{q}_ms": round(percentile(samples, q), 2) for q in (50, 95, 99)},
+                }
+                for stage, samples in self._samples.items()
+            }
+            return {"stages": stages, "counters": dict(self._counters)}
+
+
+class JsonHandler(BaseHTTPRequestHandler):
+    """Shared plumbing of the mock servers: JSON bodies, /_mock/stats and quiet logging."""
+
+    protocol_version = "HTTP/1.1"
+    stats: StageStats
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+    def read_json(self) -> Any:
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length) if length else b""
+        return json.loads(body) if body else {}
+
+    def send_json(self, payload: Any, status: int = 200) -> None:
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def handle_stats(self, method: str, path: str) -> bool:
+        if path == "/_mock/stats" and method == "GET":
+            self.send_json(self.stats.snapshot())
+            return True
+        if path == "/_mock/stats/reset" and method == "POST":
+            self.stats.reset()
+            self.send_json({"ok": True})
+            return True
+        return False
+
+
+class MockLLMHandler(JsonHandler):
+    """OpenAI chat completions with scripted tool calls and a latency model."""
+
+    ttft_ms: float = 300.0
+    prefill_ms_per_token: float = 0.02
+    tokens_per_second: float = 200.0
+    answer_tokens: int = 150
+    tool_rounds: int = 1
+    unique_queries: bool = False
+    tool_script: Dict[str, Dict[str, Any]] = DEFAULT_TOOL_SCRIPT
+    rpm_limit: int = 0
+    tpm_limit: int = 0
+    _query_counter = 0
+    _counter_lock = threading.Lock()
+    _window: List[Tuple[float, int]] = []  # (time, tokens) of the requests accepted in the last 60 s
+
+    def do_GET(self) -> None:
+        path = urlparse(self.path).path
+        if self.handle_stats("GET", path):
+            return
+        if path.rstrip("/").endswith("/models"):
+            self.send_json({"object": "list", "data": [{"id": "mock", "object": "model", "owned_by": "load_test"}]})
+            return
+        self.send_json({"error": {"message": f"Unknown path {path}"}}, status=404)
+
+    def do_POST(self) -> None:
+        path = urlparse(self.path).path
+        if self.handle_stats("POST", path):
+            return
+        if not path.rstrip("/").endswith("/chat/completions"):
+            self.send_json({"error": {"message": f"Unknown path {path}"}}, status=404)
+            return
+        start = time.perf_counter()
+        request = self.read_json()
+        tool_call = self.next_tool_call(request)
+        prompt_tokens = sum(len(json.dumps(m.get("content") or "")) for m in request.get("messages") or []) // 4
+        if tool_call is not None:
+            completion_tokens = max(1, len(tool_call["function"]["arguments"]) // 4)
+        else:
+            completion_tokens = self.answer_tokens
+
+        retry_after = self.rate_limited(prompt_tokens + completion_tokens)
+        if retry_after is not None:
+            self.send_rate_limit(retry_after)
+            self.stats.record("llm_rate_limited", (time.perf_counter() - start) * 1000, rate_limited=1)
+            return
+
+        time.sleep((self.ttft_ms + prompt_tokens * self.prefill_ms_per_token) / 1000)
+        if request.get("stream"):
+            self.stream_completion(request, tool_call, completion_tokens)
+        else:
+            time.sleep(completion_tokens / self.tokens_per_second)
+            self.send_json(self.completion(request, tool_call, prompt_tokens, completion_tokens))
+
+        self.stats.record(
+            "llm_tool_call" if tool_call is not None else "llm_answer",
+            (time.perf_counter() - start) * 1000,
+            prompt_tokens=prompt_tokens,
+            completion_tokens=completion_tokens,
+        )
+
+    def rate_limited(self, tokens: int) -> Optional[float]:
+        """Seconds until the request fits the sliding-minute rpm/tpm limits, None if it is accepted."""
+        if not self.rpm_limit and not self.tpm_limit:
+            return None
+        with self._counter_lock:
+            now = time.monotonic()
+            window = MockLLMHandler._window = [(t, n) for t, n in MockLLMHandler._window if now - t < 60]
+            if self.rpm_limit and len(window) >= self.rpm_limit:
+                return 60 - (now - window[0][0])
+            if self.tpm_limit and sum(n for _, n in window) + tokens > self.tpm_limit and window:
+                return 60 - (now - window[0][0])
+            window.append((now, tokens))
+            return None
+
+    def send_rate_limit(self, retry_after: float) -> None:
+        body = json.dumps({"error": {"message": "Rate limit reached, please try again later",
+                                     "type": "requests", "code": "rate_limit_exceeded"}}).encode("utf-8")
+        self.send_response(429)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Retry-After", str(max(1, round(retry_after))))
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def next_tool_call(self, request: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """A scripted call to the first known tool, until tool_rounds calls were made for the last user message."""
+        messages = request.get("messages") or []
+        last_user = max((i for i, m in enumerate(messages) if m.get("role") == "user"), default=-1)
+        rounds = sum(1 for m in messages[last_user + 1:] if m.get("role") == "assistant" and m.get("tool_calls"))
+        if last_user < 0 or rounds >= self.tool_rounds:
+            return None
+        offered = [t.get("function", {}).get("name") for t in request.get("tools") or []]
+        name = next((n for n in offered if n in self.tool_script), None)
+        if name is None:
+            return None
+
+        prompt = messages[last_user].get("content") or ""
+        if isinstance(prompt, list):
+            prompt = " ".join(part.get("text", "") for part in prompt if isinstance(part, dict))
+        prompt = prompt.strip()
+        if self.unique_queries:
+            with self._counter_lock:
+                MockLLMHandler._query_counter += 1
+                prompt = f"{prompt} ({MockLLMHandler._query_counter})"
+        arguments = {
+            key: value.replace("{prompt}", prompt) if isinstance(value, str) else value
+            for key, value in self.tool_script[name].items()
+        }
+        return {
+            "id": f"call_{uuid.uuid4().hex[:24]}",
+            "type": "function",
+            "function": {"name": name, "arguments": json.dumps(arguments)},
+        }
+
+    def answer_text(self, tokens: int) -> str:
+        return " ".join(ANSWER_WORDS[i % len(ANSWER_WORDS)] for i in range(tokens))
+
+    def completion(self, request: Dict[str, Any], tool_call: Optional[Dict[str, Any]],
+                   prompt_tokens: int, completion_tokens: int) -> Dict[str, Any]:
+        if tool_call is not None:
+            message = {"role": "assistant", "content": None, "tool_calls": [tool_call]}
+        else:
+            message = {"role": "assistant", "content": self.answer_text(completion_tokens)}
+        return {
+            "id": f"chatcmpl-{uuid.uuid4().hex}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": request.get("model", "mock"),
+            "choices": [{"index": 0, "message": message,
+                         "finish_reason": "tool_calls" if tool_call is not None else "stop"}],
+            "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                      "total_tokens": prompt_tokens + completion_tokens},
+        }
+
+    def stream_completion(self, request: Dict[str, Any], tool_call: Optional[Dict[str, Any]], completion_tokens: int) -> None:
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+        chunk_id = f"chatcmpl-{uuid.uuid4().hex}"
+
+        def send(delta: Dict[str, Any], finish_reason: Optional[str] = None) -> None:
+            chunk = {
+                "id": chunk_id,
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": request.get("model", "mock"),
+                "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+            }
+            self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+            self.wfile.flush()
+
+        if tool_call is not None:
+            time.sleep(completion_tokens / self.tokens_per_second)
+            send({"role": "assistant", "content": None, "tool_calls": [{"index": 0, **tool_call}]})
+            send({}, "tool_calls")
+        else:
+            send({"role": "assistant", "content": ""})
+            for i in range(completion_tokens):
+                time.sleep(1 / self.tokens_per_second)
+                send({"content": ("" if i == 0 else " ") + ANSWER_WORDS[i % len(ANSWER_WORDS)]})
+            send({}, "stop")
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.wfile.flush()
+
+
+class MockSearchHandler(JsonHandler):
+    """The Meilisearch endpoints used by MeiliRAG and the search tools, backed by in-memory fragments."""
+
+    documents: List[Dict[str, Any]] = []
+    search_latency_ms: float = 20.0
+    task_uid: int = 1
+
+    def task_info(self, index_uid: Optional[str], task_type: str) -> Dict[str, Any]:
+        return {"taskUid": self.task_uid, "indexUid": index_uid, "status": "enqueued",
+                "type": task_type, "enqueuedAt": now_iso()}
+
+    def task_result(self, index_uid: Optional[str]) -> Dict[str, Any]:
+        timestamp = now_iso()
+        return {"uid": self.task_uid, "indexUid": index_uid, "status": "succeeded",
+                "type": "documentAdditionOrUpdate", "details": {}, "error": None, "duration": "PT0.001S",
+                "enqueuedAt": timestamp, "startedAt": timestamp, "finishedAt": timestamp}
+
+    def index_info(self, uid: str) -> Dict[str, Any]:
+        return {"uid": uid, "primaryKey": "hash", "createdAt": now_iso(), "updatedAt": now_iso()}
+
+    def index_stats(self) -> Dict[str, Any]:
+        return {"numberOfDocuments": len(self.documents), "isIndexing": False,
+                "fieldDistribution": {field: len(self.documents) for field in
+                                      ("hash", "text", "source", "fragment_num", "total_fragments", "token_count")}}
+
+    def do_GET(self) -> None:
+        url = urlparse(self.path)
+        parts = [p for p in url.path.split("/") if p]
+        if self.handle_stats("GET", url.path):
+            return
+        start = time.perf_counter()
+        if parts == ["health"]:
+            self.send_json({"status": "available"})
+        elif parts == ["version"]:
+            self.send_json({"commitSha": "mock", "commitDate": now_iso(), "pkgVersion": "1.26.0"})
+        elif parts == ["stats"]:
+            self.send_json({"databaseSize": 0, "lastUpdate": now_iso(), "indexes": {"glucosedao": self.index_stats()}})
+        elif parts == ["indexes"]:
+            self.send_json({"results": [self.index_info("glucosedao")], "offset": 0, "limit": 20, "total": 1})
+        elif parts == ["tasks"]:
+            index_uid = (parse_qs(url.query).get("indexUids") or [None])[0]
+            self.send_json({"results": [self.task_result(index_uid)], "total": 1, "limit": 1, "from": self.task_uid, "next": None})
+            self.stats.record("tasks", (time.perf_counter() - start) * 1000)
+        elif len(parts) == 2 and parts[0] == "tasks":
+            self.send_json(self.task_result(None))
+        elif len(parts) == 2 and parts[0] == "indexes":
+            self.send_json(self.index_info(parts[1]))
+        elif len(parts) == 3 and parts[0] == "indexes" and parts[2] == "stats":
+            self.send_json(self.index_stats())
+        else:
+            # settings and anything else the SDK may read: an empty object is accepted as "defaults"
+            self.send_json({})
+
+    def do_POST(self) -> None:
+        url = urlparse(self.path)
+        parts = [p for p in url.path.split("/") if p]
+        if self.handle_stats("POST", url.path):
+            return
+        request = self.read_json()
+        if len(parts) == 3 and parts[0] == "indexes" and parts[2] == "search":
+            self.search(parts[1], request)
+        elif parts == ["multi-search"]:
+            self.send_json({"results": [self.search_results(q.get("indexUid"), q) for q in request.get("queries") or []]})
+        elif parts == ["indexes"]:
+            self.send_json(self.task_info(request.get("uid"), "indexCreation"), status=202)
+        else:
+            self.send_json(self.task_info(parts[1] if len(parts) > 1 else None, "settingsUpdate"), status=202)
+
+    def do_PUT(self) -> None:
+        self.do_PATCH()
+
+    def do_PATCH(self) -> None:
+        parts = [p for p in urlparse(self.path).path.split("/") if p]
+        self.read_json()
+        self.send_json(self.task_info(parts[1] if len(parts) > 1 else None, "settingsUpdate"), status=202)
+
+    def do_DELETE(self) -> None:
+        parts = [p for p in urlparse(self.path).path.split("/") if p]
+        self.send_json(self.task_info(parts[1] if len(parts) > 1 else None, "indexDeletion"), status=202)
+
+    def search_results(self, index_uid: Optional[str], request: Dict[str, Any]) -> Dict[str, Any]:
+        query = request.get("q") or ""
+        limit = int(request.get("limit") or 20)
+        words = set(re.findall(r"\w+", query.lower()))
+        scored = sorted(
+            ((len(words & doc["_words"]), i) for i, doc in enumerate(self.documents)),
+            key=lambda pair: (-pair[0], pair[1]),
+        )[:limit]
+        hits = [{k: v for k, v in self.documents[i].items() if k != "_words"} for _, i in scored]
+        return {"hits": hits, "query": query, "processingTimeMs": int(self.search_latency_ms), "limit": limit,
+                "offset": 0, "estimatedTotalHits": len(self.documents), "semanticHitCount": 0, "indexUid": index_uid}
+
+    def search(self, index_uid: str, request: Dict[str, Any]) -> None:
+        start = time.perf_counter()
+        time.sleep(self.search_latency_ms / 1000)
+        results = self.search_results(index_uid, request)
+        self.send_json(results)
+        self.stats.record("search", (time.perf_counter() - start) * 1000, hits=len(results["hits"]))
+
+
+def load_fragments(data_dir: Optional[str], fragment_chars: int = 2000, synthetic: int = 200) -> List[Dict[str, Any]]:
+    """Split text files of data_dir into fragments shaped like MeiliRAG documents (synthetic if none)."""
+    texts: List[Tuple[str, str]] = []
+    if data_dir and Path(data_dir).is_dir():
+        for path in sorted(Path(data_dir).rglob("*")):
+            if path.is_file() and path.suffix.lower() in (".txt", ".md"):
+                texts.append((str(path), path.read_text(encoding="utf-8", errors="replace")))
+    if not texts:
+        rng = random.Random(1)
+        texts = [(f"/app/data/synthetic/doc_{i:04d}.txt", " ".join(rng.choice(ANSWER_WORDS) for _ in range(400)))
+                 for i in range(synthetic)]
+
+    documents = []
+    for source, text in texts:
+        fragments = [text[i:i + fragment_chars] for i in range(0, len(text), fragment_chars)] or [""]
+        for number, fragment in enumerate(fragments):
+            documents.append({
+                "hash": uuid.uuid5(uuid.NAMESPACE_URL, f"{source}#{number}").hex,
+                "text": fragment,
+                "source": source,
+                "fragment_num": number + 1,
+                "total_fragments": len(fragments),
+                "token_count": len(fragment) // 4,
+                "_words": set(re.findall(r"\w+", fragment.lower())),
+            })
+    return documents
+
+
+class MockServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 1024  # listen backlog, the default of 5 drops connections at a few hundred chats
+
+
+def serve(handler: type, host: str, port: int, label: str) -> None:
+    handler.stats = StageStats()
+    server = MockServer((host, port), handler)
+    print(f"{label} listening on http://{host}:{port} (GET /_mock/stats, POST /_mock/stats/reset)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+@app.command("mock-llm")
+def mock_llm(
+    host: str = typer.Option("127.0.0.1", "--host", help="Interface to listen on"),
+    port: int = typer.Option(4010, "--port", help="Port to listen on"),
+    ttft_ms: float = typer.Option(300.0, "--ttft-ms", help="Fixed time to first token in ms"),
+    prefill_ms_per_token: float = typer.Option(0.02, "--prefill-ms-per-token", help="Extra time to first token per prompt token"),
+    tokens_per_second: float = typer.Option(200.0, "--tokens-per-second", help="Decode speed of answers and tool call arguments"),
+    answer_tokens: int = typer.Option(150, "--answer-tokens", help="Tokens in every text answer"),
+    tool_rounds: int = typer.Option(1, "--tool-rounds", help="Tool calls before the text answer, per user message"),
+    semantic_ratio: float = typer.Option(0.0, "--semantic-ratio", help="semantic_ratio of scripted search_documents calls (> 0 needs query embeddings)"),
+    unique_queries: bool = typer.Option(False, "--unique-queries", help="Make every scripted search query unique, bypassing the search caches"),
+    script: Optional[str] = typer.Option(None, "--script", help="JSON file {tool_name: arguments} replacing the built-in tool script"),
+    rpm_limit: int = typer.Option(0, "--rpm-limit", help="Answer 429 above this many requests per minute (0: unlimited)"),
+    tpm_limit: int = typer.Option(0, "--tpm-limit", help="Answer 429 above this many prompt and completion tokens per minute (0: unlimited)")
+) -> None:
+    """Run an OpenAI-compatible mock LLM that emits scripted tool calls."""
+    tool_script = json.loads(Path(script).read_text(encoding="utf-8")) if script else dict(DEFAULT_TOOL_SCRIPT)
+    if "search_documents" in tool_script and not script:
+        tool_script["search_documents"] = {**tool_script["search_documents"], "semantic_ratio": semantic_ratio}
+    MockLLMHandler.ttft_ms = ttft_ms
+    MockLLMHandler.prefill_ms_per_token = prefill_ms_per_token
+    MockLLMHandler.tokens_per_second = tokens_per_second
+    MockLLMHandler.answer_tokens = answer_tokens
+    MockLLMHandler.tool_rounds = tool_rounds
+    MockLLMHandler.unique_queries = unique_queries
+    MockLLMHandler.tool_script = tool_script
+    MockLLMHandler.rpm_limit = rpm_limit
+    MockLLMHandler.tpm_limit = tpm_limit
+    serve(MockLLMHandler, host, port, "Mock LLM")
+
+
+@app.command("mock-search")
+def mock_search(
+    host: str = typer.Option("127.0.0.1", "--host", help="Interface to listen on"),
+    port: int = typer.Option(7710, "--port", help="Port to listen on"),
+    data_dir: Optional[str] = typer.Option(None, "--data-dir", help="Folder with .txt/.md files to serve as fragments (synthetic if empty)"),
+    search_latency_ms: float = typer.Option(20.0, "--search-latency-ms", help="Added latency of every search")
+) -> None:
+    """Run a stub of the Meilisearch API subset the agents use."""
+    MockSearchHandler.documents = load_fragments(data_dir)
+    MockSearchHandler.search_latency_ms = search_latency_ms
+    print(f"Serving {len(MockSearchHandler.documents)} fragments")
+    serve(MockSearchHandler, host, port, "Mock search")
+
+
+def load_prompts(config: str, parent_section: str, profiles: Optional[str]) -> List[Tuple[str, str]]:
+    """(profile, prompt) pairs from the `examples` of the selected (default: all visible) profiles."""
+    with open(config, "r", encoding="utf-8") as f:
+        agents: Dict[str, Any] = (yaml.safe_load(f) or {}).get(parent_section) or {}
+    selected = [p.strip() for p in profiles.split(",")] if profiles else [
+        name for name, agent in agents.items() if not (agent or {}).get("hidden")
+    ]
+    prompts = []
+    for name in selected:
+        for example in (agents.get(name) or {}).get("examples") or []:
+            if isinstance(example, dict) and example.get("prompt"):
+                prompts.append((name, example["prompt"].strip()))
+    return prompts
+
+
+async def chat_turn(client: httpx.AsyncClient, url: str, profile: str, messages: List[Dict[str, str]],
+                    stream: bool) -> Dict[str, Any]:
+    """Send one chat turn, returning latency, time to first byte and the answer (or the error)."""
+    payload = {"model": profile, "messages": messages, "stream": stream}
+    start = time.perf_counter()
+    first_byte: Optional[float] = None
+    try:
+        if stream:
+            answer = []
+            async with client.stream("POST", url, json=payload) as response:
+                response.raise_for_status()
+                async for line in response.aiter_lines():
+                    if first_byte is None:
+                        first_byte = time.perf_counter() - start
+                    if line.startswith("data: ") and line != "data: [DONE]":
+                        try:
+                            delta = json.loads(line[6:])["choices"][0].get("delta") or {}
+                            answer.append(delta.get("content") or "")
+                        except (ValueError, KeyError, IndexError):
+                            pass
+            text = "".join(answer)
+        else:
+            response = await client.post(url, json=payload)
+            first_byte = time.perf_counter() - start
+            response.raise_for_status()
+            text = response.json()["choices"][0]["message"].get("content") or ""
+        return {"ok": True, "seconds": time.perf_counter() - start, "ttfb": first_byte, "answer": text}
+    except Exception as e:
+        return {"ok": False, "seconds": time.perf_counter() - start, "ttfb": first_byte,
+                "error": f"{type(e).__name__}: {e}"}
+
+
+async def run_level(agent_url: str, prompts: List[Tuple[str, str]], concurrency: int, chats: int, turns: int,
+                    stream: bool, api_key: Optional[str], timeout: float, seed: int) -> Dict[str, Any]:
+    """Run `chats` conversations of `turns` turns each with at most `concurrency` of them in flight."""
+    rng = random.Random(seed)
+    url = f"{agent_url.rstrip('/')}/v1/chat/completions"
+    headers = {"Authorization": f"Bearer {api_key}"} if api_key else {}
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    semaphore = asyncio.Semaphore(concurrency)
+    results: List[Dict[str, Any]] = []
+
+    async def conversation(client: httpx.AsyncClient, profile: str) -> None:
+        async with semaphore:
+            messages: List[Dict[str, str]] = []
+            profile_prompts = [p for name, p in prompts if name == profile]
+            for _ in range(turns):
+                messages.append({"role": "user", "content": rng.choice(profile_prompts)})
+                result = await chat_turn(client, url, profile, messages, stream)
+                result["profile"] = profile
+                results.append(result)
+                if not result["ok"]:
+                    break
+                messages.append({"role": "assistant", "content": result["answer"]})
+
+    start = time.perf_counter()
+    async with httpx.AsyncClient(headers=headers, limits=limits, timeout=timeout) as client:
+        await asyncio.gather(*(conversation(client, rng.choice(prompts)[0]) for _ in range(chats)))
+    wall = time.perf_counter() - start
+
+    ok = [r for r in results if r["ok"]]
+    latencies = [r["seconds"] * 1000 for r in ok]
+    ttfbs = [r["ttfb"] * 1000 for r in ok if r["ttfb"] is not None]
+    errors: Dict[str, int] = {}
+    for r in results:
+        if not r["ok"]:
+            errors[r["error"][:120]] = errors.get(r["error"][:120], 0) + 1
+    return {
+        "concurrency": concurrency,
+        "chats": chats,
+        "turns": len(results),
+        "ok_turns": len(ok),
+        "errors": errors,
+        "wall_seconds": round(wall, 3),
+        "throughput_turns_per_second": round(len(ok) / wall, 3) if wall else 0.0,
+        "latency_ms": {f"p{q}": percentile(latencies, q) for q in (50, 95, 99)},
+        "latency_mean_ms": sum(latencies) / len(latencies) if latencies else None,
+        "ttfb_ms": {f"p{q}": percentile(ttfbs, q) for q in (50, 95, 99)},
+    }
+
+
+def mock_stats(url: Optional[str], reset: bool = False) -> Optional[Dict[str, Any]]:
+    """Read (or reset) the /_mock/stats of a mock server, None if it is not reachable."""
+    if not url:
+        return None
+    try:
+        if reset:
+            httpx.post(f"{url.rstrip('/')}/_mock/stats/reset", timeout=5).raise_for_status()
+            return None
+        return httpx.get(f"{url.rstrip('/')}/_mock/stats", timeout=5).json()
+    except httpx.HTTPError as e:
+        print(f"  ⚠️ Could not reach {url}: {e}")
+        return None
+
+
+def stage_breakdown(level: Dict[str, Any], llm: Optional[Dict[str, Any]], search: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Mean time per turn spent in the LLM, the search backend and the agent server itself."""
+    turns = level["ok_turns"] or 1
+    breakdown: Dict[str, Any] = {}
+    for source in (llm, search):
+        for stage, values in ((source or {}).get("stages") or {}).items():
+            breakdown[stage] = {
+                "calls_per_turn": round(values["count"] / turns, 3),
+                "ms_per_turn": round(values["total_ms"] / turns, 2),
+                "p50_ms": values["p50_ms"],
+                "p95_ms": values["p95_ms"],
+                "p99_ms": values["p99_ms"],
+            }
+    if level["latency_mean_ms"] is not None and breakdown:
+        accounted = sum(v["ms_per_turn"] for stage, v in breakdown.items() if stage != "tasks")
+        breakdown["agent_overhead"] = {"ms_per_turn": round(level["latency_mean_ms"] - accounted, 2)}
+    return breakdown
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=REPO_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+@app.command("run")
+def run(
+    agent_url: str = typer.Option("http://127.0.0.1:8091", "--agent-url", help="Agent server base URL"),
+    llm_url: Optional[str] = typer.Option("http://127.0.0.1:4010", "--llm-url", help="Mock LLM base URL for stage stats (empty to skip)"),
+    search_url: Optional[str] = typer.Option("http://127.0.0.1:7710", "--search-url", help="Mock search base URL for stage stats (empty to skip)"),
+    config: str = typer.Option("chat_agent_profiles.yaml", "--config", "-c", help="Agent profiles YAML with the examples to replay"),
+    parent_section: str = typer.Option("agent_profiles", "--parent-section", help="Section holding the profiles"),
+    profiles: Optional[str] = typer.Option(None, "--profiles", help="Comma-separated profiles to use (default: all visible profiles with examples)"),
+    concurrency: str = typer.Option("50,200,500", "--concurrency", help="Comma-separated concurrent chat levels"),
+    chats: int = typer.Option(0, "--chats", help="Conversations per level (default: 2x concurrency)"),
+    turns: int = typer.Option(1, "--turns", help="User turns per conversation"),
+    stream: bool = typer.Option(True, "--stream/--no-stream", help="Use streaming completions like chat-ui"),
+    api_key: Optional[str] = typer.Option(os.getenv("SECURITY_API_KEY"), "--api-key", help="Bearer key if the server sets SECURITY_API_KEY"),
+    timeout: float = typer.Option(300.0, "--timeout", help="Per-turn timeout in seconds"),
+    seed: int = typer.Option(42, "--seed", help="Random seed for prompt selection"),
+    output: Optional[str] = typer.Option(None, "--output", "-o", help="Result JSON path (default: tmp/benchmarks/load_test-<time>-<commit>.json)")
+) -> None:
+    """Replay profile examples at several concurrency levels and report latency, throughput and stages."""
+    prompts = load_prompts(config, parent_section, profiles)
+    if not prompts:
+        print("No example prompts found for the selected profiles")
+        raise typer.Exit(code=1)
+    print(f"Replaying {len(prompts)} example prompts from {sorted({p for p, _ in prompts})} against {agent_url}")
+
+    levels = []
+    for level_concurrency in [int(c) for c in concurrency.split(",") if c.strip()]:
+        mock_stats(llm_url, reset=True)
+        mock_stats(search_url, reset=True)
+        level = asyncio.run(run_level(
+            agent_url, prompts, level_concurrency, chats or 2 * level_concurrency, turns, stream, api_key, timeout, seed
+        ))
+        level["stages"] = stage_breakdown(level, mock_stats(llm_url), mock_stats(search_url))
+        levels.append(level)
+
+        latency = level["latency_ms"]
+        fmt = lambda v: f"{v:.0f}" if v is not None else "-"
+        print(f"\nConcurrency {level_concurrency}: {level['ok_turns']}/{level['turns']} turns ok in "
+              f"{level['wall_seconds']:.1f} s, {level['throughput_turns_per_second']:.2f} turns/s")
+        print(f"  Turn latency: p50 {fmt(latency['p50'])} ms, p95 {fmt(latency['p95'])} ms, p99 {fmt(latency['p99'])} ms"
+              f" (first byte p50 {fmt(level['ttfb_ms']['p50'])} ms)")
+        for stage, values in level["stages"].items():
+            calls = f"{values['calls_per_turn']:.2f} calls, " if "calls_per_turn" in values else ""
+            p95 = f", p95 {fmt(values['p95_ms'])} ms per call" if "p95_ms" in values else ""
+            print(f"  {stage:<16} {calls}{values['ms_per_turn']:.0f} ms per turn{p95}")
+        for error, count in level["errors"].items():
+            print(f"  ❌ {count} x {error}")
+
+    commit = git_commit()
+    report = {
+        "commit": commit,
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "agent_url": agent_url,
+        "parameters": {"profiles": sorted({p for p, _ in prompts}), "turns": turns, "stream": stream, "chats": chats},
+        "levels": levels,
+    }
+    if output is None:
+        output = str(REPO_DIR / "tmp" / "benchmarks" / f"load_test-{datetime.now():%Y%m%d-%H%M%S}-{commit or 'nogit'}.json")
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResults written to {output}")
+
+
+if __name__ == "__main__":
+    app()
@@ -10,9 +10,10 @@
 """
 MeiliSearch Dump & Export Tool
 
-This script supports two modes:
+This script supports three modes:
 1. DUMP MODE (Traditional): Creates backup files for manual transfer and import
 2. EXPORT MODE (Meilisearch 1.16+): Direct instance-to-instance migration via API
+3. SNAPSHOT MODE: Creates a snapshot of the database for fast restore by file copy
 
 REQUIREMENTS:
 - Both source and target instances MUST be Meilisearch 1.16.0 or higher
@@ -27,6 +28,8 @@ NEW EXPORT FEATURES:
 - Configurable payload sizes for performance
 - Automatic backup creation before/after export for data safety
 - Import dump management with backup of existing files
+- Incremental (delta) export using per-index watermarks
+- Snapshots promoted to just_chat_rag.snapshot, restored at startup without re-indexing
 
 Usage:
   # Export mode with auto-backup (recommended for 1.16+)
@@ -35,8 +38,14 @@ Usage:
   # Export with import dump update and no backup
   uv run scripts/meilisearch_dump.py --export --target-url http://target:7700 --target-api-key key --update-import --no-backup
   
+  # Incremental export: only indexes/documents changed since the last export to this target
+  uv run scripts/meilisearch_dump.py --export --target-url http://target:7700 --target-api-key key --incremental --no-backup
+
   # Traditional dump mode with import update
   uv run scripts/meilisearch_dump.py --update-import
+
+  # Snapshot mode: promote the new snapshot to just_chat_rag.snapshot for fast restore
+  uv run scripts/meilisearch_dump.py --snapshot --update-import
 """
 
 from meilisearch import Client
@@ -44,9 +53,11 @@ from meilisearch.errors import MeilisearchApiError
 from meilisearch.models.task import TaskInfo
 import time
 import os
+import json
+import fnmatch
 import shutil
 import typer
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple
 from datetime import datetime
 
 def enumerate_dumps_folder(dumps_path: str = "./dumps") -> List[str]:
@@ -77,9 +88,9 @@ def print_dumps_status(dumps_path: str = "./dumps", label: str = "") -> None:
         print("  (no files found)")
     print()
 
-def find_new_dump(dumps_path: str, start_time: float, timeout_seconds: int = 30) -> Optional[str]:
+def find_new_dump(dumps_path: str, start_time: float, timeout_seconds: int = 30, kind: str = "dump") -> Optional[str]:
     """Monitor dumps folder for new files created after start_time."""
-    print(f"Monitoring {dumps_path} for new dump files...")
+    print(f"Monitoring {dumps_path} for new {kind} files...")
     
     end_time = time.time() + timeout_seconds
     
@@ -90,12 +101,12 @@ def find_new_dump(dumps_path: str, start_time: float, timeout_seconds: int = 30)
                 if os.path.isfile(item_path):
                     file_mtime = os.path.getmtime(item_path)
                     if file_mtime > start_time:
-                        print(f"Found new dump: {item}")
+                        print(f"Found new {kind}: {item}")
                         return item
         
         time.sleep(1)  # Check every second
     
-    print("No new dump file detected within timeout period")
+    print(f"No new {kind} file detected within timeout period")
     return None
 
 def initiate_dump(client: Client) -> Optional[TaskInfo]:
@@ -119,6 +130,27 @@ def wait_for_dump(client: Client, task: TaskInfo, timeout_seconds: int = 600) ->
         print(f"Error waiting for dump: {e}")
         return None
 
+def initiate_snapshot(client: Client) -> Optional[TaskInfo]:
+    """Trigger a snapshot, written by Meilisearch to its --snapshot-dir (MEILI_SNAPSHOT_DIR)."""
+    try:
+        task = client.create_snapshot()
+        print(f"Snapshot status: {task.status}")
+        print(f"Snapshot task id: {task.task_uid}")
+        return task
+    except MeilisearchApiError as e:
+        print(f"Error creating snapshot: {e}")
+        return None
+
+def wait_for_snapshot(client: Client, task: TaskInfo, timeout_seconds: int = 600) -> Optional[TaskInfo]:
+    """Wait for snapshot task to complete."""
+    try:
+        updated_task = client.wait_for_task(task.task_uid, timeout_in_ms=timeout_seconds * 1000)
+        print(f"Snapshot completed with status: {updated_task.status}")
+        return updated_task
+    except MeilisearchApiError as e:
+        print(f"Error waiting for snapshot: {e}")
+        return None
+
 def get_client(host: str = "localhost", port: int = 7700, api_key: Optional[str] = None) -> Client:
     """Get MeiliSearch client with configurable host, port, and API key."""
     return Client(f"http://{host}:{port}", api_key=api_key)
@@ -225,31 +257,134 @@ def create_backup_dump(client: Client, dumps_path: str, label: str = "BACKUP") -
         print(f"⚠️ {label} dump created but file not found in monitoring")
         return None
 
-def update_import_dump(dumps_path: str, latest_dump: str) -> bool:
-    """Copy latest dump to just_chat_rag.dump with backup of existing."""
-    import_dump_path = os.path.join(dumps_path, "just_chat_rag.dump")
-    latest_dump_path = os.path.join(dumps_path, latest_dump)
-    
-    if not os.path.exists(latest_dump_path):
-        print(f"❌ Latest dump not found: {latest_dump_path}")
+def promote_import_file(source_path: str, import_path: str, kind: str = "dump") -> bool:
+    """Copy source_path to import_path, keeping the previous import file as <import_path>.bak."""
+    import_name = os.path.basename(import_path)
+
+    if not os.path.exists(source_path):
+        print(f"❌ Latest {kind} not found: {source_path}")
         return False
-    
-    # Backup existing import dump if it exists
-    if os.path.exists(import_dump_path):
-        backup_path = f"{import_dump_path}.bak"
+
+    # Copy next to the import file first, so a failed copy leaves the current import file in place
+    tmp_path = f"{import_path}.tmp"
+    shutil.copy2(source_path, tmp_path)
+
+    # Backup existing import file if it exists
+    if os.path.exists(import_path):
+        backup_path = f"{import_path}.bak"
         if os.path.exists(backup_path):
             os.remove(backup_path)  # Remove old backup
-        
-        os.rename(import_dump_path, backup_path)
-        print(f"📦 Backed up existing import dump to: just_chat_rag.dump.bak")
-    
-    # Copy latest dump to import location
-    shutil.copy2(latest_dump_path, import_dump_path)
-    print(f"✅ Updated import dump: just_chat_rag.dump")
-    print(f"   Source: {latest_dump}")
-    
+
+        os.rename(import_path, backup_path)
+        print(f"📦 Backed up existing import {kind} to: {import_name}.bak")
+
+    os.replace(tmp_path, import_path)
+    print(f"✅ Updated import {kind}: {import_name}")
+    print(f"   Source: {source_path}")
+
     return True
 
+def update_import_dump(dumps_path: str, latest_dump: str) -> bool:
+    """Copy latest dump to just_chat_rag.dump with backup of existing."""
+    return promote_import_file(
+        os.path.join(dumps_path, latest_dump), os.path.join(dumps_path, "just_chat_rag.dump"), "dump"
+    )
+
+def update_import_snapshot(dumps_path: str, snapshot_path: str, latest_snapshot: str) -> bool:
+    """Copy latest snapshot to just_chat_rag.snapshot with backup of existing."""
+    return promote_import_file(
+        os.path.join(snapshot_path, latest_snapshot), os.path.join(dumps_path, "just_chat_rag.snapshot"), "snapshot"
+    )
+
+def load_watermarks(watermark_file: str) -> Dict[str, Dict[str, Dict[str, Any]]]:
+    """Load export watermarks: {target_url: {index_uid: {"task_uid": ..., "updated_at": ...}}}."""
+    if not os.path.exists(watermark_file):
+        return {}
+    try:
+        with open(watermark_file, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError) as e:
+        print(f"⚠️ Could not read watermarks from {watermark_file}: {e}")
+        return {}
+
+def save_watermarks(watermark_file: str, watermarks: Dict[str, Dict[str, Dict[str, Any]]]) -> None:
+    """Atomically write export watermarks to disk."""
+    folder = os.path.dirname(watermark_file)
+    if folder:
+        os.makedirs(folder, exist_ok=True)
+    tmp_path = f"{watermark_file}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(watermarks, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, watermark_file)
+
+def resolve_export_indexes(client: Client, index_patterns: Optional[str]) -> List[str]:
+    """Expand comma-separated index patterns (or all indexes) into concrete index uids."""
+    all_indexes = [index.uid for index in client.get_indexes({"limit": 1000})["results"]]
+    if not index_patterns:
+        return all_indexes
+    patterns = [p.strip() for p in index_patterns.split(',')]
+    return [uid for uid in all_indexes if any(fnmatch.fnmatchcase(uid, p) for p in patterns)]
+
+def get_last_document_task_uid(client: Client, index_uid: str) -> Optional[int]:
+    """Return the uid of the latest succeeded task that changed documents of an index."""
+    try:
+        tasks = client.get_tasks({
+            "indexUids": [index_uid],
+            "types": ["documentAdditionOrUpdate", "documentEdition", "documentDeletion"],
+            "statuses": ["succeeded"],
+            "limit": 1
+        })
+    except MeilisearchApiError as e:
+        print(f"Error reading tasks for index '{index_uid}': {e}")
+        return None
+    return tasks.results[0].uid if tasks.results else None
+
+def build_incremental_indexes_config(
+    client: Client,
+    index_uids: List[str],
+    target_watermarks: Dict[str, Dict[str, Any]],
+    watermark_field: str,
+    filter_expr: Optional[str] = None,
+    override_settings: bool = False
+) -> Tuple[Dict[str, Dict[str, Any]], Dict[str, Optional[int]]]:
+    """
+    Build the export indexes config containing only indexes changed since the last sync.
+
+    An index is skipped when its latest document task uid has not moved past the stored
+    watermark. Changed indexes with a previous watermark get a `<field> >= <timestamp>` filter
+    (combined with the user filter), indexes without one are exported in full.
+
+    Returns:
+        Tuple of (indexes config for initiate_export, {index_uid: last document task uid})
+    """
+    indexes_config: Dict[str, Dict[str, Any]] = {}
+    last_task_uids: Dict[str, Optional[int]] = {}
+    for index_uid in index_uids:
+        last_task_uid = get_last_document_task_uid(client, index_uid)
+        watermark = target_watermarks.get(index_uid)
+        if watermark and last_task_uid is not None and watermark.get("task_uid") is not None \
+                and last_task_uid <= watermark["task_uid"]:
+            print(f"  = {index_uid}: unchanged since task {watermark['task_uid']}, skipping")
+            continue
+
+        filters = []
+        if filter_expr:
+            filters.append(f"({filter_expr})")
+        if watermark and watermark.get("updated_at") is not None:
+            filters.append(f"{watermark_field} >= {watermark['updated_at']}")
+            print(f"  + {index_uid}: delta since {watermark_field} >= {watermark['updated_at']}")
+        else:
+            print(f"  + {index_uid}: no watermark, full export")
+
+        config: Dict[str, Any] = {}
+        if filters:
+            config["filter"] = " AND ".join(filters)
+        if override_settings:
+            config["overrideSettings"] = True
+        indexes_config[index_uid] = config
+        last_task_uids[index_uid] = last_task_uid
+    return indexes_config, last_task_uids
+
 def main(
     host: Optional[str] = typer.Option(
         None, 
@@ -317,6 +452,33 @@ def main(
         "--filter",
         help="Filter expression for selective document export"
     ),
+    incremental: bool = typer.Option(
+        False,
+        "--incremental",
+        help="Export only documents changed since the last successful export to the same target"
+    ),
+    watermark_field: str = typer.Option(
+        "updated_at",
+        "--watermark-field",
+        help="Filterable numeric (unix seconds, fractional allowed) field used to select changed documents in incremental mode"
+    ),
+    watermark_file: Optional[str] = typer.Option(
+        None,
+        "--watermark-file",
+        help="Path to the incremental export state file (defaults to <dump-path>/export_watermarks.json)"
+    ),
+    # Snapshot-specific options
+    snapshot: bool = typer.Option(
+        False,
+        "--snapshot",
+        "-s",
+        help="Use snapshot mode instead of dump mode (restored by file copy, same Meilisearch version only)"
+    ),
+    snapshot_path: Optional[str] = typer.Option(
+        None,
+        "--snapshot-path",
+        help="Path where MeiliSearch creates snapshots, its MEILI_SNAPSHOT_DIR (defaults to <dumps-path>/snapshots)"
+    ),
     # Backup and import management options
     no_backup: bool = typer.Option(
         False,
@@ -326,7 +488,7 @@ def main(
     update_import: bool = typer.Option(
         False,
         "--update-import",
-        help="Copy latest dump to just_chat_rag.dump for import (backs up existing)"
+        help="Copy latest dump to just_chat_rag.dump (snapshot to just_chat_rag.snapshot) for import (backs up existing)"
     )
 ) -> None:
     """Create a MeiliSearch dump or export data to another instance."""
@@ -353,6 +515,10 @@ def main(
     
     client = get_client(host, port, api_key)
     
+    if export and snapshot:
+        print("Error: --export and --snapshot cannot be combined")
+        return
+    
     if export:
         # Export mode validation
         if not target_url:
@@ -367,16 +533,23 @@ def main(
         print(f"Payload size: {payload_size}")
         print(f"Auto-backup: {'disabled' if no_backup else 'enabled'}")
         
-        # Create backup before export (unless disabled)
-        pre_export_dump = None
-        if not no_backup:
-            pre_export_dump = create_backup_dump(client, actual_dump_path, "PRE-EXPORT")
-            if pre_export_dump is None:
-                print("⚠️ Warning: Pre-export backup failed, but continuing with export...")
-        
         # Prepare indexes configuration if patterns are provided
         indexes_config = None
-        if index_patterns:
+        last_task_uids: Dict[str, Optional[int]] = {}
+        if incremental:
+            if watermark_file is None:
+                watermark_file = os.path.join(actual_dump_path, "export_watermarks.json")
+            watermarks = load_watermarks(watermark_file)
+            print(f"Incremental mode: watermarks in {watermark_file} (field: {watermark_field})")
+            index_uids = resolve_export_indexes(client, index_patterns)
+            indexes_config, last_task_uids = build_incremental_indexes_config(
+                client, index_uids, watermarks.get(target_url, {}),
+                watermark_field, filter_expr, override_settings
+            )
+            if not indexes_config:
+                print("✅ Nothing changed since the last export, skipping")
+                return
+        elif index_patterns:
             indexes_config = {}
             patterns = [p.strip() for p in index_patterns.split(',')]
             for pattern in patterns:
@@ -393,6 +566,13 @@ def main(
             if override_settings:
                 print("Override settings: enabled")
         
+        # Create backup before export (unless disabled)
+        pre_export_dump = None
+        if not no_backup:
+            pre_export_dump = create_backup_dump(client, actual_dump_path, "PRE-EXPORT")
+            if pre_export_dump is None:
+                print("⚠️ Warning: Pre-export backup failed, but continuing with export...")
+        
         # Record start time for export
         start_time = time.time()
         
@@ -418,6 +598,21 @@ def main(
         if completed_task.status == "succeeded":
             print(f"Export completed successfully in {export_duration:.2f} seconds!")
             print(f"Data has been migrated to {target_url}")
+
+            # Advance watermarks only after a successful export. The watermark is the unfloored
+            # start_time and the next delta filters with >=, so documents stamped at or after the
+            # export start (writers stamp each upload batch when it is sent) are exported again next
+            # time; re-exporting a document that did make it into this export is a harmless upsert
+            if incremental:
+                target_watermarks = watermarks.setdefault(target_url, {})
+                for index_uid, last_task_uid in last_task_uids.items():
+                    target_watermarks[index_uid] = {
+                        "task_uid": last_task_uid,
+                        "updated_at": start_time,
+                        "exported_at": datetime.fromtimestamp(start_time).isoformat()
+                    }
+                save_watermarks(watermark_file, watermarks)
+                print(f"📌 Watermarks updated for {len(last_task_uids)} index(es)")
             
             # Create backup after export (unless disabled)
             post_export_dump = None
@@ -464,6 +659,96 @@ def main(
             print(f"\nTotal process time: {total_duration:.2f} seconds")
             print(f"Export operation time: {export_duration:.2f} seconds")
     
+    elif snapshot:
+        # Snapshot mode: a compressed copy of the database, restored at startup without re-indexing
+        actual_snapshot_path = snapshot_path if snapshot_path is not None else os.path.join(dumps_path, "snapshots")
+        print("Mode: SNAPSHOT")
+        print(f"Monitoring snapshots in: {actual_snapshot_path}")
+        try:
+            meili_version = client.get_version().get("pkgVersion", "unknown")
+        except MeilisearchApiError:
+            meili_version = "unknown"
+        print(f"MeiliSearch version: {meili_version} (snapshots only restore on the same version)")
+        
+        print_dumps_status(actual_snapshot_path, "BEFORE SNAPSHOT")
+        
+        # Record start time for new snapshot detection
+        start_time = time.time()
+        
+        print(f"Initiating snapshot at {datetime.fromtimestamp(start_time).strftime('%Y-%m-%d %H:%M:%S')}...")
+        task = initiate_snapshot(client)
+        
+        if task is None:
+            print("Failed to initiate snapshot")
+            return
+        
+        snapshot_start_time = time.time()
+        completed_task = wait_for_snapshot(client, task, timeout_seconds=600)
+        snapshot_end_time = time.time()
+        
+        if completed_task is None:
+            print("Failed to complete snapshot")
+            return
+        
+        snapshot_duration = snapshot_end_time - snapshot_start_time
+        
+        if completed_task.status == "succeeded":
+            print(f"Snapshot created successfully in {snapshot_duration:.2f} seconds!")
+            
+            # Meilisearch overwrites <db name>.snapshot on every snapshot, detected by its new mtime
+            new_snapshot = find_new_dump(actual_snapshot_path, start_time, kind="snapshot")
+            if new_snapshot:
+                file_path = os.path.join(actual_snapshot_path, new_snapshot)
+                size = os.path.getsize(file_path)
+                print(f"New snapshot created: {new_snapshot} ({size} bytes)")
+            
+            print_dumps_status(actual_snapshot_path, "AFTER SUCCESSFUL SNAPSHOT")
+            
+            # Promote the snapshot to the file restored at startup if requested
+            if update_import and new_snapshot:
+                print(f"\n📁 Updating import snapshot...")
+                update_success = update_import_snapshot(dumps_path, actual_snapshot_path, new_snapshot)
+                if not update_success:
+                    print("⚠️ Warning: Failed to update import snapshot")
+            elif update_import:
+                print("⚠️ Warning: --update-import requested but no snapshot was found")
+            
+            process_end_time = time.time()
+            total_duration = process_end_time - process_start_time
+            print(f"\nTotal process time: {total_duration:.2f} seconds")
+            print(f"Snapshot operation time: {snapshot_duration:.2f} seconds")
+            print(f"Completed at {datetime.fromtimestamp(process_end_time).strftime('%Y-%m-%d %H:%M:%S')}")
+            
+            print("\n" + "="*60)
+            if update_import and new_snapshot:
+                print("✅ SNAPSHOT COMPLETED AND IMPORT READY!")
+                print("   📁 Import snapshot updated: just_chat_rag.snapshot")
+                print(f"   ⚠️ Restores only on MeiliSearch {meili_version}, keep just_chat_rag.dump for upgrades")
+                print("   🔄 Restored instead of just_chat_rag.dump (when newer) with:")
+            else:
+                print("💡 TIP: To restore this snapshot on a fresh volume:")
+                if new_snapshot:
+                    print(f"   📁 First copy: cp {os.path.join(actual_snapshot_path, new_snapshot)} {os.path.join(dumps_path, 'just_chat_rag.snapshot')}")
+            print("   # For Docker:")
+            print("   docker compose down")
+            print("   docker volume rm just-chat_meili-data")
+            print("   USER_ID=$(id -u) GROUP_ID=$(id -g) docker compose up")
+            print("   # For Podman:")
+            print("   podman compose down")
+            print("   podman volume rm just-chat_meili-data")
+            print("   podman compose up")
+            print("   # Removes named volume (MeiliSearch data), preserves mongo-data volume")
+            print("="*60)
+        else:
+            print(f"Snapshot failed with status: {completed_task.status}")
+            if hasattr(completed_task, 'error'):
+                print(f"Error details: {completed_task.error}")
+            
+            process_end_time = time.time()
+            total_duration = process_end_time - process_start_time
+            print(f"\nTotal process time: {total_duration:.2f} seconds")
+            print(f"Snapshot operation time: {snapshot_duration:.2f} seconds")
+    
     else:
         # Original dump mode
         print("Mode: DUMP")
@@ -0,0 +1,540 @@
+#!/usr/bin/env -S uv run --script
+# /// script
+# requires-python = ">=3.9"
+# dependencies = [
+#     "meilisearch>=0.15.0",
+#     "requests",
+#     "typer",
+# ]
+# ///
+
+"""
+MeiliSearch Bulk Ingestion Tool
+
+Indexes text files (e.g. data/glucose_txt/*.txt) into a Meilisearch RAG index using the same
+document layout as just-semantic-search's MeiliRAG (`hash` primary key, `text`, `source`,
+`fragment_num`, `total_fragments`, `token_count` and user-provided `_vectors`). The `hash` is the
+md5 of source and text, so a chunk shared by several files is one document per file.
+
+FEATURES:
+- Paragraph-aware chunking with a configurable character budget
+- File-level skip: unchanged files (same size and mtime, or same chunk hashes) are not re-sent
+- Chunk-level embedding reuse: vectors are cached on disk keyed by model + chunk hash
+- Batched embedding calls (Jina API) executed concurrently
+- Large upload batches enqueued without waiting; all tasks are awaited once at the end
+- Chunks and files that disappeared since the previous run are deleted from the index
+- Every document gets an `updated_at` unix timestamp (taken when its upload batch is sent) usable by `meilisearch_dump.py --incremental`
+
+Usage:
+  # Ingest the glucose corpus into the glucosedao index (needs JINA_API_KEY for embeddings)
+  uv run scripts/meilisearch_ingest.py ingest data/glucose_txt --index glucosedao
+
+  # Keyword-only ingestion without embeddings
+  uv run scripts/meilisearch_ingest.py ingest data/glucose_txt --index glucosedao --embedding none
+
+  # Benchmark docs/s on a synthetic 100k-file corpus (no Meilisearch or API key needed)
+  uv run scripts/meilisearch_ingest.py benchmark --files 100000
+"""
+
+from meilisearch import Client
+from meilisearch.errors import MeilisearchApiError
+from meilisearch.models.task import TaskInfo
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from array import array
+from datetime import datetime
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+import hashlib
+import json
+import os
+import random
+import shutil
+import sqlite3
+import tempfile
+import time
+import requests
+import typer
+
+EmbedFn = Callable[[List[str]], List[List[float]]]
+
+app = typer.Typer(add_completion=False)
+
+JINA_EMBEDDINGS_URL = "https://api.jina.ai/v1/embeddings"
+
+
+def get_meilisearch_host() -> str:
+    """Get MeiliSearch host from environment variable or default."""
+    return os.getenv("MEILISEARCH_HOST", "localhost")
+
+def get_meilisearch_port() -> int:
+    """Get MeiliSearch port from environment variable or default."""
+    return int(os.getenv("MEILISEARCH_PORT", "7700"))
+
+def get_meilisearch_key() -> str:
+    """Get MeiliSearch master key from environment variable or default."""
+    return os.getenv("MEILI_MASTER_KEY", "fancy_master_key")
+
+def get_embedding_model() -> str:
+    """Get the embedding model from environment variable or default (same as the RAG server)."""
+    return os.getenv("EMBEDDING_MODEL", "jinaai/jina-embeddings-v3")
+
+def get_state_dir() -> str:
+    """Default folder for the ingestion state and embedding cache."""
+    return os.path.join(os.getenv("TMP_DIR", "tmp"), "meilisearch_ingest")
+
+def embedder_name(model: str) -> str:
+    """Meilisearch embedder name used by MeiliRAG: the last segment of the model id."""
+    return model.replace("\\", "/").split("/")[-1]
+
+
+def chunk_text(text: str, max_chars: int = 3000) -> List[str]:
+    """
+    Split text into chunks of at most max_chars, preferring paragraph boundaries.
+    Paragraphs longer than max_chars are split on whitespace.
+    """
+    chunks: List[str] = []
+    current = ""
+    for paragraph in (p.strip() for p in text.split("\n\n")):
+        if not paragraph:
+            continue
+        while len(paragraph) > max_chars:
+            cut = paragraph.rfind(" ", 0, max_chars)
+            cut = cut if cut > 0 else max_chars
+            if current:
+                chunks.append(current)
+                current = ""
+            chunks.append(paragraph[:cut].strip())
+            paragraph = paragraph[cut:].strip()
+        if current and len(current) + len(paragraph) + 2 > max_chars:
+            chunks.append(current)
+            current = paragraph
+        else:
+            current = f"{current}\n\n{paragraph}" if current else paragraph
+    if current:
+        chunks.append(current)
+    return chunks
+
+def chunk_hash(text: str) -> str:
+    """Content hash of a chunk (md5 of text, like just_semantic_search Document.hash), keys the embedding cache."""
+    return hashlib.md5(text.encode("utf-8")).hexdigest()
+
+def document_id(source: str, text: str) -> str:
+    """Document primary key: md5 of source and text, so identical chunks of different files do not collide."""
+    return hashlib.md5(f"{source}\0{text}".encode("utf-8")).hexdigest()
+
+
+class IngestState:
+    """
+    Sqlite-backed ingestion state: per-file manifest (size, mtime, document ids)
+    and the embedding cache (float32 vectors keyed by model and chunk hash).
+    """
+
+    # manifests written before document ids included the source hold text hashes (user_version 0)
+    KEY_VERSION = 1
+
+    def __init__(self, state_dir: str):
+        os.makedirs(state_dir, exist_ok=True)
+        self.path = os.path.join(state_dir, "ingest_state.sqlite")
+        self.conn = sqlite3.connect(self.path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS files (index_uid TEXT, source TEXT, size INTEGER, mtime_ns INTEGER, "
+            "hashes TEXT, PRIMARY KEY (index_uid, source))"
+        )
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings (model TEXT, hash TEXT, vector BLOB, PRIMARY KEY (model, hash))"
+        )
+        self.conn.commit()
+        version = self.conn.execute("PRAGMA user_version").fetchone()[0]
+        has_files = self.conn.execute("SELECT 1 FROM files LIMIT 1").fetchone() is not None
+        # an old manifest cannot be used to skip files: their documents must be re-keyed once
+        self.legacy_keys = version < self.KEY_VERSION and has_files
+        if not has_files:
+            self.mark_current_keys()
+
+    def mark_current_keys(self) -> None:
+        self.conn.execute(f"PRAGMA user_version = {self.KEY_VERSION}")
+        self.conn.commit()
+        self.legacy_keys = False
+
+    def get_files(self, index_uid: str) -> Dict[str, Tuple[int, int, List[str]]]:
+        rows = self.conn.execute(
+            "SELECT source, size, mtime_ns, hashes FROM files WHERE index_uid = ?", (index_uid,)
+        )
+        return {source: (size, mtime_ns, json.loads(hashes)) for source, size, mtime_ns, hashes in rows}
+
+    def put_files(self, index_uid: str, entries: List[Tuple[str, int, int, List[str]]]) -> None:
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?)",
+            [(index_uid, source, size, mtime_ns, json.dumps(hashes)) for source, size, mtime_ns, hashes in entries]
+        )
+        self.conn.commit()
+
+    def delete_files(self, index_uid: str, sources: List[str]) -> None:
+        self.conn.executemany(
+            "DELETE FROM files WHERE index_uid = ? AND source = ?", [(index_uid, s) for s in sources]
+        )
+        self.conn.commit()
+
+    def get_vectors(self, model: str, hashes: List[str]) -> Dict[str, List[float]]:
+        found: Dict[str, List[float]] = {}
+        for start in range(0, len(hashes), 500):
+            part = hashes[start:start + 500]
+            placeholders = ",".join("?" * len(part))
+            rows = self.conn.execute(
+                f"SELECT hash, vector FROM embeddings WHERE model = ? AND hash IN ({placeholders})", [model, *part]
+            )
+            for h, blob in rows:
+                found[h] = array("f", blob).tolist()
+        return found
+
+    def put_vectors(self, model: str, vectors: Dict[str, List[float]]) -> None:
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO embeddings VALUES (?, ?, ?)",
+            [(model, h, array("f", v).tobytes()) for h, v in vectors.items()]
+        )
+        self.conn.commit()
+
+    def close(self) -> None:
+        self.conn.close()
+
+
+def jina_embed_passages(model: str, api_key: Optional[str] = None, timeout: int = 120) -> EmbedFn:
+    """Build a batched embedding function backed by the Jina embeddings API."""
+    api_key = api_key or os.getenv("JINA_API_KEY")
+    if not api_key:
+        raise ValueError("JINA_API_KEY is required for --embedding jina")
+    session = requests.Session()
+    session.headers.update({"Authorization": f"Bearer {api_key}", "Content-Type": "application/json"})
+
+    def embed(texts: List[str]) -> List[List[float]]:
+        response = session.post(
+            JINA_EMBEDDINGS_URL,
+            json={"model": embedder_name(model), "task": "retrieval.passage", "input": texts},
+            timeout=timeout
+        )
+        response.raise_for_status()
+        data = sorted(response.json()["data"], key=lambda d: d["index"])
+        return [d["embedding"] for d in data]
+
+    return embed
+
+def synthetic_embedder(dimensions: int = 1024, latency_ms: float = 0.0) -> EmbedFn:
+    """Deterministic pseudo-embeddings for benchmarks, with optional simulated per-call latency."""
+    def embed(texts: List[str]) -> List[List[float]]:
+        if latency_ms:
+            time.sleep(latency_ms / 1000)
+        return [[int(chunk_hash(t)[:8], 16) / 0xFFFFFFFF] * dimensions for t in texts]
+    return embed
+
+
+def embed_missing(
+    state: IngestState,
+    model: str,
+    docs: List[Dict],
+    embed: EmbedFn,
+    batch_size: int,
+    executor: ThreadPoolExecutor
+) -> Tuple[int, int]:
+    """
+    Attach `_vectors` to docs, reusing cached vectors and embedding the rest in concurrent batches.
+
+    Returns:
+        Tuple of (cache hits, newly embedded chunks)
+    """
+    name = embedder_name(model)
+    content_hashes = [chunk_hash(doc["text"]) for doc in docs]
+    unique = dict(zip(content_hashes, (doc["text"] for doc in docs)))
+    cached = state.get_vectors(model, list(unique))
+    missing = [(h, t) for h, t in unique.items() if h not in cached]
+    batches = [missing[i:i + batch_size] for i in range(0, len(missing), batch_size)]
+    fresh: Dict[str, List[float]] = {}
+    for batch, vectors in zip(batches, executor.map(lambda b: embed([t for _, t in b]), batches)):
+        fresh.update({h: v for (h, _), v in zip(batch, vectors)})
+    if fresh:
+        state.put_vectors(model, fresh)
+    cached.update(fresh)
+    for doc, h in zip(docs, content_hashes):
+        doc["_vectors"] = {name: cached[h]}
+    return len(unique) - len(missing), len(missing)
+
+
+def iter_files(root: Path, patterns: List[str]) -> Iterator[Path]:
+    """Yield files under root matching any of the glob patterns, in a stable order."""
+    seen = set()
+    for pattern in patterns:
+        for path in sorted(root.glob(pattern)):
+            if path.is_file() and path not in seen:
+                seen.add(path)
+                yield path
+
+def ensure_index(client: Client, index_uid: str, model: Optional[str], dimensions: int) -> None:
+    """Create the index with MeiliRAG-compatible settings if it does not exist yet."""
+    try:
+        client.get_index(index_uid)
+        return
+    except MeilisearchApiError:
+        pass
+    print(f"Creating index '{index_uid}'...")
+    client.wait_for_task(client.create_index(index_uid, {"primaryKey": "hash"}).task_uid)
+    index = client.index(index_uid)
+    index.update_searchable_attributes(["title", "abstract", "text", "content", "source", "authors", "references"])
+    index.update_filterable_attributes(["title", "abstract", "source", "authors", "references", "updated_at"])
+    if model is not None:
+        task = index.update_embedders({embedder_name(model): {"source": "userProvided", "dimensions": dimensions}})
+        client.wait_for_task(task.task_uid)
+
+
+def run_ingest(
+    root: Path,
+    patterns: List[str],
+    index_uid: str,
+    state: IngestState,
+    model: str,
+    embed: Optional[EmbedFn],
+    upload: Callable[[List[Dict]], Optional[TaskInfo]],
+    delete: Callable[[List[str]], Optional[TaskInfo]],
+    wait: Callable[[List[TaskInfo]], bool],
+    max_chars: int = 3000,
+    embed_batch_size: int = 64,
+    embed_workers: int = 4,
+    upload_batch_size: int = 5000
+) -> Dict[str, float]:
+    """
+    Run one ingestion pass and return statistics.
+
+    Upload/delete callbacks enqueue Meilisearch tasks without waiting; `wait` is called once
+    for all tasks and the manifest is only committed when every task succeeded, so a failed
+    run is simply retried on the next invocation. Document ids include the source, so the
+    stale ids of one file never belong to another file.
+    """
+    start = time.time()
+    known = state.get_files(index_uid)
+    stats = {"files": 0, "files_skipped": 0, "docs": 0, "embedded": 0, "embedding_cache_hits": 0, "deleted": 0}
+    manifest_updates: List[Tuple[str, int, int, List[str]]] = []
+    stale_hashes: List[str] = []
+    tasks: List[TaskInfo] = []
+    pending: List[Dict] = []
+    seen_sources = set()
+
+    def flush(executor: ThreadPoolExecutor) -> None:
+        if not pending:
+            return
+        if embed is not None:
+            hits, embedded = embed_missing(state, model, pending, embed, embed_batch_size, executor)
+            stats["embedding_cache_hits"] += hits
+            stats["embedded"] += embedded
+        # Stamp the batch when it is sent, not when the run started: an incremental export that
+        # starts mid-ingest filters on updated_at >= its start and must still see later batches
+        updated_at = time.time()
+        for doc in pending:
+            doc["updated_at"] = updated_at
+        task = upload(list(pending))
+        if task is not None:
+            tasks.append(task)
+        stats["docs"] += len(pending)
+        pending.clear()
+
+    with ThreadPoolExecutor(max_workers=embed_workers) as executor:
+        for path in iter_files(root, patterns):
+            source = path.relative_to(root).as_posix()
+            seen_sources.add(source)
+            stats["files"] += 1
+            st = path.stat()
+            previous = known.get(source)
+            if previous is not None and not state.legacy_keys \
+                    and previous[0] == st.st_size and previous[1] == st.st_mtime_ns:
+                stats["files_skipped"] += 1
+                continue
+
+            chunks = chunk_text(path.read_text(encoding="utf-8", errors="replace"), max_chars)
+            hashes = [document_id(source, c) for c in chunks]
+            manifest_updates.append((source, st.st_size, st.st_mtime_ns, hashes))
+            if previous is not None and previous[2] == hashes:
+                stats["files_skipped"] += 1  # touched but content unchanged
+                continue
+            if previous is not None:
+                stale_hashes.extend(set(previous[2]) - set(hashes))
+
+            for num, (text, h) in enumerate(zip(chunks, hashes)):
+                pending.append({
+                    "hash": h,
+                    "text": text,
+                    "source": source,
+                    "fragment_num": num + 1,
+                    "total_fragments": len(chunks),
+                    "token_count": len(text.split())
+                })
+            if len(pending) >= upload_batch_size:
+                flush(executor)
+        flush(executor)
+
+    removed_sources = [s for s in known if s not in seen_sources]
+    for source in removed_sources:
+        stale_hashes.extend(known[source][2])
+    if stale_hashes:
+        task = delete(stale_hashes)
+        if task is not None:
+            tasks.append(task)
+        stats["deleted"] = len(stale_hashes)
+
+    if wait(tasks):
+        state.put_files(index_uid, manifest_updates)
+        state.delete_files(index_uid, removed_sources)
+        if state.legacy_keys:
+            state.mark_current_keys()
+    else:
+        print("⚠️ Some indexing tasks failed, manifest not updated (next run will retry)")
+
+    stats["seconds"] = time.time() - start
+    stats["docs_per_second"] = stats["docs"] / stats["seconds"] if stats["seconds"] > 0 else 0.0
+    stats["files_per_second"] = stats["files"] / stats["seconds"] if stats["seconds"] > 0 else 0.0
+    return stats
+
+def print_stats(label: str, stats: Dict[str, float]) -> None:
+    print(f"\n{label}:")
+    print(f"  Files scanned: {stats['files']} (skipped unchanged: {stats['files_skipped']})")
+    print(f"  Documents uploaded: {stats['docs']} (deleted: {stats['deleted']})")
+    print(f"  Embeddings: {stats['embedded']} computed, {stats['embedding_cache_hits']} reused from cache")
+    print(f"  Time: {stats['seconds']:.2f} seconds ({stats['docs_per_second']:.0f} docs/s, {stats['files_per_second']:.0f} files/s)")
+
+
+def meilisearch_callbacks(
+    client: Client, index_uid: str, timeout_seconds: int
+) -> Tuple[Callable[[List[Dict]], TaskInfo], Callable[[List[str]], TaskInfo], Callable[[List[TaskInfo]], bool]]:
+    """Upload/delete/wait callbacks that enqueue tasks on a live Meilisearch index."""
+    index = client.index(index_uid)
+
+    def upload(docs: List[Dict]) -> TaskInfo:
+        return index.add_documents(docs, primary_key="hash")
+
+    def delete(hashes: List[str]) -> TaskInfo:
+        return index.delete_documents(hashes)
+
+    def wait(tasks: List[TaskInfo]) -> bool:
+        ok = True
+        for task in tasks:
+            try:
+                done = client.wait_for_task(task.task_uid, timeout_in_ms=timeout_seconds * 1000, interval_in_ms=200)
+            except MeilisearchApiError as e:
+                print(f"Error waiting for task {task.task_uid}: {e}")
+                ok = False
+                continue
+            if done.status != "succeeded":
+                print(f"Task {task.task_uid} finished with status {done.status}: {done.error}")
+                ok = False
+        return ok
+
+    return upload, delete, wait
+
+
+@app.command()
+def ingest(
+    root: Path = typer.Argument(..., help="Folder with files to index (e.g. data/glucose_txt)"),
+    index_uid: str = typer.Option(..., "--index", "-i", help="Target Meilisearch index (e.g. glucosedao)"),
+    patterns: str = typer.Option("**/*.txt,**/*.md", "--patterns", help="Comma-separated glob patterns"),
+    host: Optional[str] = typer.Option(None, "--host", "-h", help="MeiliSearch host (overrides MEILISEARCH_HOST env var)"),
+    port: Optional[int] = typer.Option(None, "--port", "-p", help="MeiliSearch port (overrides MEILISEARCH_PORT env var)"),
+    api_key: Optional[str] = typer.Option(None, "--api-key", "-k", help="MeiliSearch master key (overrides MEILI_MASTER_KEY env var)"),
+    embedding: str = typer.Option("jina", "--embedding", help="Embedding backend: 'jina' (remote API) or 'none' (keyword only)"),
+    model: Optional[str] = typer.Option(None, "--model", help="Embedding model (overrides EMBEDDING_MODEL env var)"),
+    dimensions: int = typer.Option(1024, "--dimensions", help="Embedding dimensions used when creating the index"),
+    state_dir: Optional[str] = typer.Option(None, "--state-dir", help="Folder for manifest and embedding cache (default: $TMP_DIR/meilisearch_ingest)"),
+    max_chars: int = typer.Option(3000, "--max-chars", help="Maximum characters per chunk"),
+    embed_batch_size: int = typer.Option(64, "--embed-batch-size", help="Chunks per embedding API call"),
+    embed_workers: int = typer.Option(4, "--embed-workers", help="Concurrent embedding API calls"),
+    upload_batch_size: int = typer.Option(5000, "--upload-batch-size", help="Documents per Meilisearch add_documents task"),
+    timeout_seconds: int = typer.Option(600, "--timeout", help="Timeout for each indexing task in seconds")
+) -> None:
+    """Chunk, embed and upload files into a Meilisearch index, skipping unchanged content."""
+    host = host or get_meilisearch_host()
+    port = port or get_meilisearch_port()
+    api_key = api_key or get_meilisearch_key()
+    model = model or get_embedding_model()
+    client = Client(f"http://{host}:{port}", api_key=api_key)
+
+    print(f"Using MeiliSearch at: {host}:{port}")
+    print(f"Ingesting {root} into '{index_uid}' (embedding: {embedding}, model: {model})")
+
+    embed = jina_embed_passages(model) if embedding == "jina" else None
+    ensure_index(client, index_uid, model if embed is not None else None, dimensions)
+    upload, delete, wait = meilisearch_callbacks(client, index_uid, timeout_seconds)
+
+    state = IngestState(state_dir or get_state_dir())
+    try:
+        stats = run_ingest(
+            root, [p.strip() for p in patterns.split(",")], index_uid, state, model, embed,
+            upload, delete, wait, max_chars, embed_batch_size, embed_workers, upload_batch_size
+        )
+    finally:
+        state.close()
+    print_stats("INGESTION COMPLETED", stats)
+    print(f"Completed at {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+
+
+def generate_corpus(root: Path, files: int, paragraphs: int = 4, seed: int = 42) -> None:
+    """Write a synthetic corpus of small text files spread over 100 subfolders."""
+    rng = random.Random(seed)
+    vocabulary = [f"w{i}" for i in range(5000)]
+    for i in range(files):
+        folder = root / f"part_{i % 100:03d}"
+        folder.mkdir(parents=True, exist_ok=True)
+        text = "\n\n".join(" ".join(rng.choices(vocabulary, k=rng.randint(40, 200))) for _ in range(paragraphs))
+        (folder / f"doc_{i:06d}.txt").write_text(f"Document {i}\n\n{text}", encoding="utf-8")
+
+
+@app.command()
+def benchmark(
+    files: int = typer.Option(100000, "--files", help="Number of synthetic files"),
+    embed_latency_ms: float = typer.Option(50.0, "--embed-latency-ms", help="Simulated latency per embedding call"),
+    embed_batch_size: int = typer.Option(64, "--embed-batch-size", help="Chunks per embedding call"),
+    embed_workers: int = typer.Option(4, "--embed-workers", help="Concurrent embedding calls"),
+    upload_batch_size: int = typer.Option(5000, "--upload-batch-size", help="Documents per upload batch"),
+    dimensions: int = typer.Option(1024, "--dimensions", help="Synthetic embedding dimensions"),
+    changed_fraction: float = typer.Option(0.01, "--changed-fraction", help="Fraction of files modified before the delta run"),
+    workdir: Optional[str] = typer.Option(None, "--workdir", help="Folder for the synthetic corpus (default: temporary)")
+) -> None:
+    """
+    Measure ingestion throughput on a synthetic corpus: a cold run, an unchanged re-run
+    and a delta run. Embeddings are synthetic with simulated latency and uploads are
+    serialized to JSON instead of being sent, so only the pipeline itself is measured.
+    """
+    base = Path(workdir) if workdir else Path(tempfile.mkdtemp(prefix="ingest_bench_"))
+    corpus = base / "corpus"
+    try:
+        print(f"Generating {files} synthetic files in {corpus}...")
+        gen_start = time.time()
+        generate_corpus(corpus, files)
+        print(f"Generated in {time.time() - gen_start:.2f} seconds")
+
+        uploaded_bytes = [0]
+
+        def upload(docs: List[Dict]) -> None:
+            uploaded_bytes[0] += len(json.dumps(docs))
+
+        state = IngestState(str(base / "state"))
+        embed = synthetic_embedder(dimensions, embed_latency_ms)
+        args = dict(
+            root=corpus, patterns=["**/*.txt"], index_uid="benchmark", state=state, model="synthetic",
+            embed=embed, upload=upload, delete=lambda hashes: None, wait=lambda tasks: True,
+            embed_batch_size=embed_batch_size, embed_workers=embed_workers, upload_batch_size=upload_batch_size
+        )
+        try:
+            print_stats("COLD RUN (all chunks embedded and uploaded)", run_ingest(**args))
+            print_stats("UNCHANGED RE-RUN (manifest skip)", run_ingest(**args))
+            rng = random.Random(7)
+            for path in rng.sample(sorted(corpus.glob("**/*.txt")), max(1, int(files * changed_fraction))):
+                with path.open("a", encoding="utf-8") as f:
+                    f.write("\n\nappended paragraph")
+            print_stats(f"DELTA RUN ({changed_fraction:.1%} files modified)", run_ingest(**args))
+        finally:
+            state.close()
+        print(f"\nSerialized upload payload: {uploaded_bytes[0] / 1e6:.1f} MB")
+    finally:
+        if workdir is None:
+            shutil.rmtree(base, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    app()
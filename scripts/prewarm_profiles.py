@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+
+"""
+Agent Profiles Validation
+
+Checks chat_agent_profiles.yaml without starting the agent server:
+1. Loads every profile from chat_agent_profiles.yaml
+2. Resolves and imports the agent class and every `tools` / `prompt_tools` function
+3. Calls each `prompt_tools` function once with its `call_arguments`
+4. Reports per-profile startup cost and writes it as JSON
+
+The server workers warm themselves with the same steps (agent_tools.prewarm, tools_config.prewarm),
+this script is for checking a profiles file before deploying it. With AGENT_FAILFAST=true (default)
+any broken profile makes the script exit with an error.
+
+Usage:
+  python scripts/prewarm_profiles.py --config chat_agent_profiles.yaml
+"""
+
+import json
+import os
+import sys
+import time
+from typing import Any, Dict, Optional
+
+import typer
+import yaml
+
+
+def main(
+    config: str = typer.Option(
+        os.getenv("AGENT_CONFIG_PATH", "/app/chat_agent_profiles.yaml"),
+        "--config",
+        "-c",
+        help="Agent profiles YAML (AGENT_CONFIG_PATH env var by default)"
+    ),
+    parent_section: str = typer.Option(
+        os.getenv("AGENT_PARENT_SECTION", "agent_profiles") or "agent_profiles",
+        "--parent-section",
+        help="Section holding the profiles (AGENT_PARENT_SECTION env var by default)"
+    ),
+    app_dir: str = typer.Option(
+        os.getenv("APP_DIR", "/app"),
+        "--app-dir",
+        help="Folder added to sys.path so that agent_tools can be imported"
+    ),
+    report_path: Optional[str] = typer.Option(
+        None,
+        "--report",
+        help="Where to write the JSON report (default: $APP_DIR/$TMP_DIR/prewarm_report.json)"
+    ),
+    failfast: bool = typer.Option(
+        os.getenv("AGENT_FAILFAST", "true").lower() == "true",
+        "--failfast/--no-failfast",
+        help="Exit with an error if any profile fails (AGENT_FAILFAST env var by default)"
+    ),
+    skip_prompt_tools: bool = typer.Option(
+        False,
+        "--skip-prompt-tools",
+        help="Only import prompt tools, do not call them"
+    )
+) -> None:
+    """Validate all agent profiles, reporting per-profile startup cost."""
+    tmp_dir = os.path.join(app_dir, os.getenv("TMP_DIR", "tmp"))
+    report_path = report_path or os.path.join(tmp_dir, "prewarm_report.json")
+
+    if app_dir not in sys.path:
+        sys.path.insert(0, app_dir)
+    from agent_tools.prewarm import prewarm_profile
+
+    start = time.perf_counter()
+    with open(config, "r", encoding="utf-8") as f:
+        profiles: Dict[str, Any] = (yaml.safe_load(f) or {}).get(parent_section) or {}
+    print(f"Prewarming {len(profiles)} profiles from {config}")
+
+    reports = [prewarm_profile(name, profile or {}, not skip_prompt_tools) for name, profile in profiles.items()]
+    total_ms = (time.perf_counter() - start) * 1000
+
+    for report in sorted(reports, key=lambda r: r["total_ms"], reverse=True):
+        status = "✅" if report["ok"] else "❌"
+        slowest = max((s for s in report["steps"] if s["ms"] is not None), key=lambda s: s["ms"], default=None)
+        slowest_str = f" (slowest: {slowest['kind']} {slowest['target']} {slowest['ms']:.0f} ms)" if slowest else ""
+        print(f"  {status} {report['profile']}: {report['total_ms']:.0f} ms{slowest_str}")
+        for error in report["errors"]:
+            print(f"      {error}")
+    print(f"Total prewarm time: {total_ms:.0f} ms")
+
+    os.makedirs(os.path.dirname(report_path) or ".", exist_ok=True)
+    with open(report_path, "w", encoding="utf-8") as f:
+        json.dump({"config": config, "total_ms": round(total_ms, 2), "profiles": reports}, f, indent=2)
+
+    failed = [r["profile"] for r in reports if not r["ok"]]
+    if failed and failfast:
+        print(f"Prewarm failed for: {', '.join(failed)}")
+        raise typer.Exit(code=1)
+
+
+if __name__ == "__main__":
+    typer.run(main)
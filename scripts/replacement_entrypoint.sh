@@ -44,50 +44,19 @@ else
 
 fi
 
-# Handle additional dependencies safely via Poetry if requirements.txt is present
+# Install additional dependencies of the mounted tools. Wheels are built once into a wheelhouse keyed by the
+# hash of requirements.txt (and the Python version), later starts install offline from it or skip pip entirely
+# when everything is already installed. docker-compose mounts ./tmp/wheelhouse at /app/tmp/wheelhouse (the default
+# WHEELHOUSE_DIR), so the wheels survive container re-creation.
 REQUIREMENTS_FILE="/app/agent_tools/requirements.txt"
-INSTALL_FLAG="/app/tmp/.requirements_installed"
 
-# Check if the additional requirements file exists
 if [ -f "$REQUIREMENTS_FILE" ]; then
-    # Compute SHA256 hash of the current requirements.txt for comparison
-    CURRENT_HASH=$(sha256sum "$REQUIREMENTS_FILE" | awk '{print $1}')
-
-    # If the flag file exists, read the previously stored hash; otherwise, set an empty string
-    if [ -f "$INSTALL_FLAG" ]; then
-        INSTALLED_HASH=$(cat "$INSTALL_FLAG")
-    else
-        INSTALLED_HASH=""
-    fi
-
-    # Compare the current hash with the stored hash
-    if [ "$CURRENT_HASH" != "$INSTALLED_HASH" ]; then
-        echo "Installing additional dependencies from $REQUIREMENTS_FILE using Poetry..."
-
-        # Display the contents of the requirements file for debugging
-        echo "Contents of $REQUIREMENTS_FILE:"
-        echo "--------------------------------"
-        cat "$REQUIREMENTS_FILE"
-        echo "--------------------------------"
-
-        # Filter out comments and blank lines to obtain the list of dependencies
-        REQS=$(grep -vE '^(#|[[:space:]]*$)' "$REQUIREMENTS_FILE")
-
-        # Print out the full poetry command that will be executed for debugging purposes
-        echo "Executing command: poetry add $REQS"
-
-        # Run poetry add with the filtered dependencies
-        if poetry add "$REQS"; then
-            # On successful installation, update (or create) the flag file with the current hash
-            echo "$CURRENT_HASH" > "$INSTALL_FLAG"
-            echo "Dependencies installation completed successfully"
-        else
-            echo "Dependencies installation failed"
-            exit 1
-        fi
+    echo "Checking additional dependencies from $REQUIREMENTS_FILE..."
+    if python3 /app/agent_tools/tools_for_tools.py --install-only; then
+        echo "Dependencies are ready"
     else
-        echo "Hash of '$REQUIREMENTS_FILE' file exists and has not changed: $CURRENT_HASH"
-        echo "Dependencies already installed, skipping..."
+        echo "Dependencies installation failed"
+        exit 1
     fi
 fi
 
@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+
+"""
+Chat Turn Trace Report
+
+Two commands:
+- summary: reads the OTLP/JSON lines written by agent_tools.tracing (tools_config.tracing with
+  export: file, $LOG_DIR/traces.jsonl by default, rotated files included) and prints per profile
+  the turn p50/p95 and, per stage (prompt tools, admission wait, completions, tool calls,
+  embedding, Meilisearch, agent overhead), calls per turn, p50/p95 and share of the turn time.
+  The slowest stage of each profile is flagged.
+- overhead: measures what the tracing hooks cost per span when tracing is disabled, outside a
+  turn and inside a turn, and the cost of a whole traced turn with export
+
+Usage:
+  python scripts/trace_report.py summary logs/traces.jsonl
+  python scripts/trace_report.py summary logs/traces.jsonl* --profile sugar_genie --json
+  python scripts/trace_report.py overhead
+"""
+
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import typer
+
+REPO_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_DIR))
+import agent_tools.tracing as tracing  # noqa: E402
+
+app = typer.Typer(help="Summarize chat turn traces and measure the tracing overhead")
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=REPO_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def read_spans(paths: List[str]) -> Dict[str, List[Dict[str, Any]]]:
+    """Spans of OTLP/JSON lines files grouped by trace id."""
+    traces: Dict[str, List[Dict[str, Any]]] = {}
+    for path in paths:
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                for resource in json.loads(line).get("resourceSpans", []):
+                    for scope in resource.get("scopeSpans", []):
+                        for span in scope.get("spans", []):
+                            traces.setdefault(span["traceId"], []).append(span)
+    return traces
+
+
+def summarize(traces: Dict[str, List[Dict[str, Any]]]) -> tracing.TraceSummary:
+    summary = tracing.TraceSummary(samples=1_000_000)
+    for spans in traces.values():
+        durations = {s["spanId"]: int(s["endTimeUnixNano"]) - int(s["startTimeUnixNano"]) for s in spans}
+        children = dict.fromkeys(durations, 0)
+        for s in spans:
+            if s.get("parentSpanId") in children:
+                children[s["parentSpanId"]] += durations[s["spanId"]]
+        root = next((s for s in spans if not s.get("parentSpanId")), None)
+        if root is None:
+            continue  # incomplete trace (rotated away)
+        profile = next((a["value"].get("stringValue") for a in root.get("attributes", []) if a["key"] == "profile"), "unknown")
+        stages = [(s["name"], durations[s["spanId"]] / 1e6, (durations[s["spanId"]] - children[s["spanId"]]) / 1e6)
+                  for s in spans if s is not root]
+        stages.append(("agent", durations[root["spanId"]] / 1e6, (durations[root["spanId"]] - children[root["spanId"]]) / 1e6))
+        summary.add(profile, durations[root["spanId"]] / 1e6, stages)
+    return summary
+
+
+@app.command("summary")
+def summary_command(
+    paths: List[str] = typer.Argument(..., help="traces.jsonl files written by agent_tools.tracing"),
+    profile: Optional[str] = typer.Option(None, "--profile", help="Only this profile"),
+    as_json: bool = typer.Option(False, "--json", help="Print the summary as JSON")
+) -> None:
+    """Per-profile stage breakdown of traced turns, flagging the slowest stage."""
+    report = summarize(read_spans(paths)).report()
+    if profile:
+        report = {name: value for name, value in report.items() if name == profile}
+    if as_json:
+        print(json.dumps(report, indent=2))
+        return
+    for name, entry in report.items():
+        print(f"\n{name}: {entry['turns']} turns, p50 {entry['turn_p50_ms']:.0f} ms, p95 {entry['turn_p95_ms']:.0f} ms")
+        print(f"  {'stage':<34} {'per turn':>8} {'p50 ms':>10} {'p95 ms':>10} {'share':>7}")
+        for stage, stats in entry["stages"].items():
+            flag = "  <- slowest" if stage == entry["slowest_stage"] else ""
+            print(f"  {stage:<34} {stats['per_turn']:>8.2f} {stats['p50_ms']:>10.1f} {stats['p95_ms']:>10.1f} {stats['share']:>6.1f}%{flag}")
+
+
+def per_call_ns(fn: Any, iterations: int) -> float:
+    start = time.perf_counter_ns()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter_ns() - start) / iterations
+
+
+@app.command("overhead")
+def overhead_command(
+    iterations: int = typer.Option(200_000, "--iterations", help="Calls per measurement"),
+    spans_per_turn: int = typer.Option(8, "--spans-per-turn", help="Spans of a synthetic traced turn"),
+    output: Optional[str] = typer.Option(None, "--output", "-o", help="Result JSON path (default: tmp/benchmarks/tracing-<time>-<commit>.json)")
+) -> None:
+    """Per-span cost of the tracing hooks, disabled and enabled."""
+    def empty_span() -> None:
+        with tracing.span("tool:noop"):
+            pass
+
+    results: Dict[str, float] = {}
+    results["baseline_ns"] = per_call_ns(lambda: None, iterations)
+    tracing._tracer, tracing._tracer_loaded = None, True
+    results["disabled_get_tracer_ns"] = per_call_ns(tracing.get_tracer, iterations)
+    results["disabled_span_ns"] = per_call_ns(empty_span, iterations)
+
+    workdir = tempfile.mkdtemp(prefix="tracing_bench_")
+    exporter = tracing.TraceExporter(path=os.path.join(workdir, "traces.jsonl"), flush_interval=0.5)
+    tracer = tracing._tracer = tracing.Tracer(exporter)
+    results["enabled_span_outside_turn_ns"] = per_call_ns(empty_span, iterations)
+    turn = tracer.start_turn("benchmark")
+    token = tracing._current.set(turn)
+    results["enabled_span_ns"] = per_call_ns(empty_span, min(iterations, 50_000))
+    tracing._current.reset(token)
+    tracer.end(turn)
+
+    def traced_turn() -> None:
+        root = tracer.start_turn("benchmark")
+        token = tracing._current.set(root)
+        for i in range(spans_per_turn):
+            with tracing.span(f"tool:stage_{i % 4}", index=i):
+                pass
+        tracing._current.reset(token)
+        tracer.end(root)
+
+    turns = max(1, iterations // (10 * spans_per_turn))
+    results["enabled_turn_us"] = per_call_ns(traced_turn, turns) / 1000
+    exporter.close()
+    results["exported_spans"] = exporter.exported
+
+    print(f"  no-op call                        {results['baseline_ns']:>9.0f} ns")
+    print(f"  disabled: get_tracer()            {results['disabled_get_tracer_ns']:>9.0f} ns")
+    print(f"  disabled: span()                  {results['disabled_span_ns']:>9.0f} ns")
+    print(f"  enabled, outside a turn: span()   {results['enabled_span_outside_turn_ns']:>9.0f} ns")
+    print(f"  enabled, inside a turn: span()    {results['enabled_span_ns']:>9.0f} ns")
+    print(f"  traced turn of {spans_per_turn} spans + export   {results['enabled_turn_us']:>9.1f} us")
+
+    commit = git_commit()
+    report = {
+        "commit": commit,
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "parameters": {"iterations": iterations, "spans_per_turn": spans_per_turn},
+        "results": results,
+    }
+    if output is None:
+        output = str(REPO_DIR / "tmp" / "benchmarks" / f"tracing-{datetime.now():%Y%m%d-%H%M%S}-{commit or 'nogit'}.json")
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResults written to {output}")
+
+
+if __name__ == "__main__":
+    app()
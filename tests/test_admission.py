@@ -0,0 +1,120 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from agent_tools.admission import AdmissionRejected, ModelScheduler, TokenBucket, _on_event_loop
+
+
+def test_token_bucket_refills_at_rate_up_to_capacity():
+    bucket = TokenBucket(rate=10.0, capacity=5.0)
+    now = bucket.updated
+    bucket.take(5)
+    assert bucket.wait_time(1, now) == pytest.approx(0.1)
+    assert bucket.wait_time(1, now + 0.1) == 0.0
+    bucket.refill(now + 60)
+    assert bucket.tokens == 5.0
+
+
+def test_token_bucket_debt_and_oversized_requests():
+    bucket = TokenBucket(rate=10.0, capacity=5.0)
+    now = bucket.updated
+    # a request above the capacity only waits for a full bucket, then leaves a debt
+    assert bucket.wait_time(20, now) == 0.0
+    bucket.take(20)
+    assert bucket.wait_time(1, now) == pytest.approx(1.6)
+    # usage below the estimate gives tokens back, never above the capacity
+    bucket.adjust(-100)
+    assert bucket.tokens == 5.0
+
+
+def test_rpm_bucket_sheds_when_it_cannot_refill_before_the_deadline():
+    scheduler = ModelScheduler("m", rpm=60, burst=0.0)  # one request per second, bucket of one
+    scheduler.release(scheduler.acquire(10, max_wait=1.0))
+    start = time.monotonic()
+    with pytest.raises(AdmissionRejected) as error:
+        scheduler.acquire(10, max_wait=0.2)
+    assert error.value.reason == "timeout"
+    assert time.monotonic() - start < 0.1  # shed at once, not after waiting out max_wait
+    assert scheduler.stats()["shed"]["timeout"] == 1
+
+
+def hold_and_queue(scheduler, priorities):
+    """Occupy the only parallel slot, queue one waiter per priority (in order), then free the slot."""
+    ticket = scheduler.acquire(1)
+    admitted = []
+    threads = []
+    for priority in priorities:
+        def wait(priority=priority):
+            scheduler.release(scheduler.acquire(1, priority=priority, max_wait=5.0))
+            admitted.append(priority)
+        thread = threading.Thread(target=wait)
+        thread.start()
+        threads.append(thread)
+        while scheduler.stats()["queued"] < len(threads):
+            time.sleep(0.001)
+    scheduler.release(ticket)
+    for thread in threads:
+        thread.join(5.0)
+    return admitted
+
+
+def test_priority_queue_admits_lower_values_first_and_fifo_within_a_priority():
+    scheduler = ModelScheduler("m", max_parallel=1)
+    assert hold_and_queue(scheduler, [10, 0, 10, 0]) == [0, 0, 10, 10]
+    by_priority = scheduler.stats()["by_priority"]
+    assert by_priority[0]["admitted"] == 3 and by_priority[10]["admitted"] == 2
+
+
+def test_full_queue_sheds_newcomers_and_evicts_the_worst_waiter():
+    scheduler = ModelScheduler("m", max_parallel=1, max_queue=1)
+    ticket = scheduler.acquire(1)
+    outcome = {}
+
+    def wait():
+        try:
+            scheduler.acquire(1, priority=10, max_wait=5.0)
+            outcome["naming"] = "admitted"
+        except AdmissionRejected as e:
+            outcome["naming"] = e.reason
+
+    thread = threading.Thread(target=wait)
+    thread.start()
+    while scheduler.stats()["queued"] < 1:
+        time.sleep(0.001)
+    with pytest.raises(AdmissionRejected) as error:
+        scheduler.acquire(1, priority=10, max_wait=5.0)
+    assert error.value.reason == "queue_full"
+
+    def user():
+        scheduler.release(scheduler.acquire(1, priority=0, max_wait=5.0))
+        outcome["user"] = "admitted"
+
+    user_thread = threading.Thread(target=user)
+    user_thread.start()
+    thread.join(5.0)
+    scheduler.release(ticket)
+    user_thread.join(5.0)
+    assert outcome == {"naming": "evicted", "user": "admitted"}
+    assert scheduler.stats()["shed"] == {"queue_full": 1, "evicted": 1, "timeout": 0, "busy": 0}
+
+
+def test_zero_max_wait_never_blocks():
+    scheduler = ModelScheduler("m", max_parallel=1)
+    ticket = scheduler.acquire(1, max_wait=0.0)
+    start = time.monotonic()
+    with pytest.raises(AdmissionRejected) as error:
+        scheduler.acquire(1, max_wait=0.0)
+    assert error.value.reason == "busy"
+    assert time.monotonic() - start < 0.05
+    scheduler.release(ticket)
+    scheduler.release(scheduler.acquire(1, max_wait=0.0))
+
+
+def test_event_loop_detection():
+    async def inline_call():
+        return _on_event_loop()
+
+    assert not _on_event_loop()
+    assert asyncio.run(inline_call())
@@ -0,0 +1,50 @@
+import numpy as np
+import pytest
+
+from agent_tools.glucose_metrics import GlucoseAccumulator, glucose_metrics
+
+
+def sine_series(noise_sd: float, cycles: int = 40, points_per_cycle: int = 72, seed: int = 0) -> np.ndarray:
+    """Glucose oscillating 120 +/- 40 mg/dL (MAGE 80), with Gaussian sensor noise."""
+    t = np.arange(cycles * points_per_cycle)
+    clean = 120 + 40 * np.sin(2 * np.pi * t / points_per_cycle)
+    return clean + np.random.default_rng(seed).normal(0, noise_sd, t.size)
+
+
+# peaks and nadirs land on noise extremes, so strong noise widens the measured excursions a little
+@pytest.mark.parametrize("noise_sd,tolerance", [(0.0, 0.01), (1.0, 0.1), (2.0, 0.1), (5.0, 0.25)])
+def test_mage_is_robust_to_sensor_noise(noise_sd, tolerance):
+    result = glucose_metrics(readings=sine_series(noise_sd).tolist())
+    assert result["mage"] == pytest.approx(80, rel=tolerance)
+
+
+@pytest.mark.parametrize("chunk", [1, 7, 100, 5000])
+def test_mage_does_not_depend_on_chunking(chunk):
+    series = sine_series(2.0)
+    whole = GlucoseAccumulator()
+    whole.update(series)
+    chunked = GlucoseAccumulator()
+    for start in range(0, series.size, chunk):
+        chunked.update(series[start:start + chunk])
+    sd = whole.mean_sd()[1]
+    assert chunked.mage(sd) == pytest.approx(whole.mage(sd))
+
+
+def test_mage_ignores_noise_only_series():
+    series = 120 + np.random.default_rng(1).normal(0, 1.0, 2000)
+    accumulator = GlucoseAccumulator()
+    accumulator.update(series)
+    # excursions must exceed 1 SD of the series, which pure noise rarely sustains
+    assert accumulator.mage(accumulator.mean_sd()[1]) < 5
+
+
+def test_sub_second_timestamps(tmp_path, monkeypatch):
+    monkeypatch.setenv("APP_DIR", str(tmp_path))
+    (tmp_path / "data").mkdir()
+    (tmp_path / "data" / "cgm.csv").write_text(
+        "time,glucose\n2024-01-01 00:00:00.5,100\n2024-01-01 00:05:00.25,110\n2024-01-02 00:00:00,120\n"
+    )
+    result = glucose_metrics(file_path="cgm.csv", time_column="time")
+    assert result["readings"] == 3
+    assert [w["readings"] for w in result["windows"]] == [2, 1]
+    assert result["windows"][0]["start"] == "2024-01-01T00:00:00"
@@ -0,0 +1,116 @@
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "scripts"))
+from meilisearch_ingest import IngestState, chunk_hash, run_ingest, synthetic_embedder  # noqa: E402
+
+SHARED = "Dawn phenomenon raises fasting glucose in the early morning."
+
+
+class FakeIndex:
+    """In-memory stand-in for the upload/delete/wait callbacks of a Meilisearch index."""
+
+    def __init__(self):
+        self.docs = {}
+
+    def upload(self, docs):
+        self.docs.update({doc["hash"]: doc for doc in docs})
+
+    def delete(self, ids):
+        for doc_id in ids:
+            self.docs.pop(doc_id, None)
+
+    def wait(self, tasks):
+        return True
+
+    def by_source(self):
+        result = {}
+        for doc in self.docs.values():
+            result.setdefault(doc["source"], set()).add(doc["text"])
+        return result
+
+
+def ingest(root, state, index):
+    return run_ingest(root, ["*.txt"], "test", state, "model", synthetic_embedder(8),
+                      index.upload, index.delete, index.wait, max_chars=80)
+
+
+def test_shared_chunk_survives_edit_of_other_file(tmp_path):
+    root = tmp_path / "docs"
+    root.mkdir()
+    (root / "a.txt").write_text(f"{SHARED}\n\nFile a keeps this paragraph.", encoding="utf-8")
+    (root / "b.txt").write_text(f"{SHARED}\n\nFile b starts with this paragraph.", encoding="utf-8")
+    state = IngestState(str(tmp_path / "state"))
+    index = FakeIndex()
+
+    ingest(root, state, index)
+    assert index.by_source() == {
+        "a.txt": {SHARED, "File a keeps this paragraph."},
+        "b.txt": {SHARED, "File b starts with this paragraph."},
+    }
+
+    (root / "b.txt").write_text("File b was rewritten without the shared paragraph.", encoding="utf-8")
+    stats = ingest(root, state, index)
+    assert stats["files_skipped"] == 1
+    assert index.by_source() == {
+        "a.txt": {SHARED, "File a keeps this paragraph."},
+        "b.txt": {"File b was rewritten without the shared paragraph."},
+    }
+
+    (root / "b.txt").unlink()
+    ingest(root, state, index)
+    assert index.by_source() == {"a.txt": {SHARED, "File a keeps this paragraph."}}
+
+
+def test_shared_chunk_is_embedded_once(tmp_path):
+    root = tmp_path / "docs"
+    root.mkdir()
+    for name in ("a.txt", "b.txt"):
+        (root / name).write_text(SHARED, encoding="utf-8")
+    state = IngestState(str(tmp_path / "state"))
+    index = FakeIndex()
+
+    stats = ingest(root, state, index)
+    assert stats["docs"] == 2 and stats["embedded"] == 1
+    assert {doc["source"] for doc in index.docs.values()} == {"a.txt", "b.txt"}
+
+
+def test_legacy_text_hash_manifest_is_rekeyed(tmp_path):
+    root = tmp_path / "docs"
+    root.mkdir()
+    (root / "a.txt").write_text(SHARED, encoding="utf-8")
+    state = IngestState(str(tmp_path / "state"))
+    index = FakeIndex()
+    ingest(root, state, index)
+
+    # simulate a manifest and index written when documents were keyed by the text hash only
+    legacy_id = chunk_hash(SHARED)
+    index.docs = {legacy_id: {**next(iter(index.docs.values())), "hash": legacy_id}}
+    st = (root / "a.txt").stat()
+    state.put_files("test", [("a.txt", st.st_size, st.st_mtime_ns, [legacy_id])])
+    state.conn.execute("PRAGMA user_version = 0")
+    state.conn.commit()
+
+    state = IngestState(str(tmp_path / "state"))
+    assert state.legacy_keys
+    stats = ingest(root, state, index)
+    assert stats["files_skipped"] == 0 and stats["deleted"] == 1
+    assert legacy_id not in index.docs and len(index.docs) == 1
+    assert not IngestState(str(tmp_path / "state")).legacy_keys
+
+
+def test_each_upload_batch_is_stamped_when_sent(tmp_path, monkeypatch):
+    root = tmp_path / "docs"
+    root.mkdir()
+    for name in ("a.txt", "b.txt"):
+        (root / name).write_text(f"Paragraph of {name}.", encoding="utf-8")
+    state = IngestState(str(tmp_path / "state"))
+    batches = []
+    clock = iter(range(100, 200))
+    monkeypatch.setattr("meilisearch_ingest.time.time", lambda: float(next(clock)))
+
+    run_ingest(root, ["*.txt"], "test", state, "model", synthetic_embedder(8),
+               lambda docs: batches.append([doc["updated_at"] for doc in docs]),
+               lambda ids: None, lambda tasks: True, max_chars=80, upload_batch_size=1)
+    assert len(batches) == 2
+    assert len(set(batches[0])) == 1 and batches[1][0] > batches[0][0]